@@ -0,0 +1,168 @@
+import logging
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import and_, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from config import Config
+from extensions import db
+from action_log_writer import action_log_writer
+from models import DailyActionBudget
+
+logger = logging.getLogger(__name__)
+
+# Successful actions allowed per user and UTC day (the Automation Limits in config.py), shared by every worker and the scheduler
+DAILY_LIMITS = {
+    'connections': Config.DAILY_CONNECTION_LIMIT,
+    'follows': Config.DAILY_FOLLOW_LIMIT,
+    'likes': Config.DAILY_LIKE_LIMIT,
+    'comments': Config.DAILY_COMMENT_LIMIT,
+    'messages': Config.DAILY_MESSAGE_LIMIT,
+    'posts': Config.DAILY_POST_LIMIT
+}
+
+# Compare-and-set retries for a partial grant before giving up under heavy contention
+MAX_ATTEMPTS = 5
+
+class BudgetReservation:
+    """Units reserved from a daily budget; those not marked used are given back when the reservation closes"""
+    
+    def __init__(self, budget: 'ActionBudget', user_id: int, action_type: str, day: date, granted: int):
+        self.budget = budget
+        self.user_id = user_id
+        self.action_type = action_type
+        self.day = day
+        self.granted = granted
+        self.used = 0
+        self.closed = False
+    
+    @property
+    def remaining(self) -> int:
+        return self.granted - self.used
+    
+    def use(self, count: int = 1):
+        """Keep units for actions that succeeded"""
+        self.used = min(self.granted, self.used + count)
+    
+    def close(self):
+        """Release the units that were not used"""
+        if not self.closed:
+            self.closed = True
+            if self.remaining:
+                self.budget.release(self.user_id, self.action_type, self.remaining, self.day)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
+
+class ActionBudget:
+    """Atomic reservations against per-day action limits, committed on their own connection so every worker sees them"""
+    
+    def __init__(self, limits: dict = None):
+        self.limits = DAILY_LIMITS if limits is None else limits
+    
+    def limit(self, action_type: str, limit: int = None) -> int:
+        return limit if limit is not None else self.limits.get(action_type, 0)
+    
+    def _key(self, user_id: int, action_type: str, day: date):
+        return and_(
+            DailyActionBudget.user_id == user_id,
+            DailyActionBudget.action_type == action_type,
+            DailyActionBudget.date == day
+        )
+    
+    def _used(self, connection, user_id: int, action_type: str, day: date) -> Optional[int]:
+        return connection.execute(select(DailyActionBudget.used).where(self._key(user_id, action_type, day))).scalar()
+    
+    def _ensure_row(self, user_id: int, action_type: str, day: date):
+        """Create the day's row, seeded with successes already logged (e.g. before budgets existed)"""
+        with db.engine.connect() as connection:
+            if self._used(connection, user_id, action_type, day) is not None:
+                return
+        
+        values = {
+            'user_id': user_id,
+            'action_type': action_type,
+            'date': day,
+            'used': action_log_writer.daily_count(user_id, action_type, day=day)
+        }
+        with db.engine.begin() as connection:
+            dialect = connection.dialect.name
+            if dialect in ('sqlite', 'postgresql'):
+                statement = (sqlite if dialect == 'sqlite' else postgresql).insert(DailyActionBudget)
+                connection.execute(statement.on_conflict_do_nothing(), values)
+                return
+            try:
+                with connection.begin_nested():
+                    connection.execute(insert(DailyActionBudget), values)
+            except IntegrityError:
+                pass  # Another worker created it first
+    
+    def reserve(self, user_id: int, action_type: str, count: int = 1, limit: int = None,
+                day: date = None) -> BudgetReservation:
+        """Reserve up to count units; the reservation's granted may be smaller, or 0 once the limit is reached"""
+        day = day or datetime.utcnow().date()
+        limit = self.limit(action_type, limit)
+        granted = 0
+        
+        if count > 0 and limit > 0:
+            self._ensure_row(user_id, action_type, day)
+            granted = self._take(user_id, action_type, day, count, limit)
+        
+        return BudgetReservation(self, user_id, action_type, day, granted)
+    
+    def _take(self, user_id: int, action_type: str, day: date, count: int, limit: int) -> int:
+        key = self._key(user_id, action_type, day)
+        for _ in range(MAX_ATTEMPTS):
+            with db.engine.begin() as connection:
+                # All or nothing in one statement: the common case
+                taken = connection.execute(
+                    update(DailyActionBudget)
+                    .where(key, DailyActionBudget.used + count <= limit)
+                    .values(used=DailyActionBudget.used + count)
+                ).rowcount
+                if taken:
+                    return count
+                
+                # Fewer units left than asked for: take the rest only if nobody moved the row meanwhile
+                used = self._used(connection, user_id, action_type, day) or 0
+                available = min(count, limit - used)
+                if available <= 0:
+                    return 0
+                taken = connection.execute(
+                    update(DailyActionBudget)
+                    .where(key, DailyActionBudget.used == used)
+                    .values(used=used + available)
+                ).rowcount
+                if taken:
+                    return available
+        
+        logger.warning(f"Could not reserve {action_type} budget after {MAX_ATTEMPTS} attempts")
+        return 0
+    
+    def release(self, user_id: int, action_type: str, count: int, day: date = None):
+        """Give back reserved units that did not turn into successful actions"""
+        if count <= 0:
+            return
+        day = day or datetime.utcnow().date()
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(DailyActionBudget)
+                .where(self._key(user_id, action_type, day), DailyActionBudget.used >= count)
+                .values(used=DailyActionBudget.used - count)
+            )
+    
+    def available(self, user_id: int, action_type: str, limit: int = None, day: date = None) -> int:
+        """Units still free today, for early exits and batch sizing; only reserve() guarantees them"""
+        day = day or datetime.utcnow().date()
+        with db.engine.connect() as connection:
+            used = self._used(connection, user_id, action_type, day)
+        if used is None:
+            used = action_log_writer.daily_count(user_id, action_type, day=day)
+        return max(0, self.limit(action_type, limit) - used)
+
+# Global daily action budget instance
+action_budget = ActionBudget()
@@ -0,0 +1,203 @@
+import os
+import time
+import atexit
+import logging
+import threading
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from flask import current_app, has_app_context
+from sqlalchemy import insert, select, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import ActionLog, DailyActionCounter
+
+logger = logging.getLogger(__name__)
+
+# Rows buffered before a flush is forced
+FLUSH_SIZE = int(os.environ.get('ACTION_LOG_FLUSH_SIZE', 50))
+
+# Seconds between background flushes; at most this much logging is lost if the process is killed
+FLUSH_INTERVAL = float(os.environ.get('ACTION_LOG_FLUSH_INTERVAL', 2.0))
+
+COUNTER_KEY = ('user_id', 'action_type', 'date', 'status')
+
+# Rows kept for retry when the database is unavailable; older rows are dropped beyond this
+MAX_PENDING = 10000
+
+def _upsert_counters(rows: List[Dict]):
+    """Add flushed rows to their DailyActionCounter rows with one INSERT ... ON CONFLICT DO UPDATE"""
+    totals = Counter(
+        (row['user_id'], row['action_type'], row['created_at'].date(), row['status'] or 'unknown')
+        for row in rows
+    )
+    values = [dict(zip(COUNTER_KEY, key), count=count) for key, count in totals.items()]
+    
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        statement = (sqlite if dialect == 'sqlite' else postgresql).insert(DailyActionCounter)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(COUNTER_KEY),
+            set_={'count': DailyActionCounter.count + statement.excluded['count']}
+        )
+        db.session.execute(statement, values)
+        return
+    
+    # Other databases: increment existing days, insert new ones
+    for value in values:
+        key = {column: value[column] for column in COUNTER_KEY}
+        updated = DailyActionCounter.query.filter_by(**key).update(
+            {'count': DailyActionCounter.count + value['count']}, synchronize_session=False
+        )
+        if not updated:
+            db.session.add(DailyActionCounter(**value))
+
+class ActionLogWriter:
+    """Buffers ActionLog rows in memory and writes them with one bulk INSERT per flush, keeping daily counters in step"""
+    
+    def __init__(self, flush_size: int = FLUSH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.app = None
+        self.pending: List[Dict] = []
+        self.flushing: List[Dict] = []  # Rows being written; still counted until committed
+        self.version = 0  # Bumped on every write, so readers can cache derived figures
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()  # One flush at a time, so rows are written in order
+        self.thread = None
+    
+    def init_app(self, app):
+        """Bind the writer to an application; buffered rows are flushed when the process exits"""
+        self.app = app
+        atexit.register(self.flush)
+        with app.app_context():
+            self.backfill_counters()
+    
+    def backfill_counters(self) -> bool:
+        """Build daily counters from existing action logs the first time the counter table is used"""
+        try:
+            if DailyActionCounter.query.first() is not None or ActionLog.query.first() is None:
+                return False
+            
+            day = func.date(ActionLog.created_at)
+            status = func.coalesce(ActionLog.status, 'unknown')
+            db.session.execute(
+                insert(DailyActionCounter).from_select(
+                    list(COUNTER_KEY) + ['count'],
+                    select(ActionLog.user_id, ActionLog.action_type, day, status, func.count())
+                    .group_by(ActionLog.user_id, ActionLog.action_type, day, status)
+                )
+            )
+            db.session.commit()
+            logger.info("Backfilled daily action counters from action logs")
+            return True
+        
+        except IntegrityError:
+            db.session.rollback()  # Another process backfilled first
+            return False
+    
+    def record(self, user_id: int, action_type: str, target_profile_id: str = None,
+               target_profile_name: str = None, status: str = 'success', error_message: str = None,
+               automation_rule_id: int = None, action_data: Dict = None):
+        """Buffer one action; flushes inline once flush_size rows are waiting"""
+        row = {
+            'user_id': user_id,
+            'automation_rule_id': automation_rule_id,
+            'action_type': action_type,
+            'target_profile_id': target_profile_id,
+            'target_profile_name': target_profile_name,
+            'action_data': action_data,
+            'status': status,
+            'error_message': error_message,
+            'created_at': datetime.utcnow()
+        }
+        
+        if self.app is None and has_app_context():
+            self.app = current_app._get_current_object()
+        
+        with self.lock:
+            self.pending.append(row)
+            self.version += 1
+            full = len(self.pending) >= self.flush_size
+        self._ensure_started()
+        
+        if full:
+            self.flush()
+    
+    def pending_count(self, user_id: int, action_type: str, since: datetime, status: Optional[str] = 'success') -> int:
+        """Buffered rows matching a count query, so limit checks see actions not yet flushed"""
+        with self.lock:
+            return sum(
+                1 for row in self.flushing + self.pending
+                if row['user_id'] == user_id
+                and row['action_type'] == action_type
+                and row['created_at'] >= since
+                and (status is None or row['status'] == status)
+            )
+    
+    def pending_targets(self, user_id: int, action_types) -> set:
+        """Target profile ids of buffered rows, for already-actioned checks before they are written"""
+        with self.lock:
+            return {
+                row['target_profile_id'] for row in self.flushing + self.pending
+                if row['user_id'] == user_id and row['action_type'] in action_types
+            }
+    
+    def daily_count(self, user_id: int, action_type: str, status: Optional[str] = 'success', day: date = None) -> int:
+        """Actions of one type on a UTC day (today by default): the stored counter plus rows not yet flushed"""
+        day = day or datetime.utcnow().date()
+        query = db.session.query(func.coalesce(func.sum(DailyActionCounter.count), 0)).filter(
+            DailyActionCounter.user_id == user_id,
+            DailyActionCounter.action_type == action_type,
+            DailyActionCounter.date == day
+        )
+        if status is not None:
+            query = query.filter(DailyActionCounter.status == status)
+        
+        return query.scalar() + self.pending_count(user_id, action_type, datetime.combine(day, datetime.min.time()), status)
+    
+    def flush(self) -> int:
+        """Write all buffered rows in one transaction; returns the number written"""
+        with self.flush_lock:
+            with self.lock:
+                rows, self.pending = self.pending, []
+                self.flushing = rows
+            if not rows:
+                return 0
+            
+            try:
+                # Own app context, hence own session: the caller's pending changes are not committed with the log.
+                # Logs and counters commit together, so counters never drift from the table
+                with self.app.app_context():
+                    db.session.execute(insert(ActionLog), rows)
+                    _upsert_counters(rows)
+                    db.session.commit()
+                written = len(rows)
+            
+            except Exception as e:
+                logger.error(f"Error flushing {len(rows)} action logs: {str(e)}")
+                with self.lock:
+                    self.pending = (rows + self.pending)[-MAX_PENDING:]
+                written = 0
+            
+            with self.lock:
+                self.flushing = []
+                self.version += 1
+            return written
+    
+    def _ensure_started(self):
+        """Start the background flush thread on first use"""
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='action-log-writer', daemon=True)
+                self.thread.start()
+    
+    def _run(self):
+        """Flush loop"""
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+# Global action log writer instance
+action_log_writer = ActionLogWriter()
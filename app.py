@@ -6,6 +6,11 @@ from config import config_dict
 from dotenv import load_dotenv
 from extensions import db, limiter
 from routes import register_routes
+from ingestion_service import ingestion_worker
+from automation_jobs import automation_executor
+from action_log_writer import action_log_writer
+from target_filter import actioned_targets
+from search_service import init_search_index
 
 load_dotenv()
 
@@ -48,11 +53,14 @@ def create_app(config_name=None):
             # Import all models to ensure they are registered with SQLAlchemy
             from models import (
                 User, Post, UploadedFile, AutomationRule, 
-                MarketingCampaign, LinkedInProfile, ActionLog
+                MarketingCampaign, LinkedInProfile, ActionLog,
+                upgrade_schema
             )
             
             # Create all tables
             db.create_all()
+            upgrade_schema()
+            init_search_index()
             
             # Create default user if it doesn't exist
             default_user = User.get_default_user()
@@ -62,6 +70,14 @@ def create_app(config_name=None):
             print(f"❌ Error initializing database: {str(e)}")
             logging.error(f"Database initialization error: {str(e)}")
     
+    # Background processing of uploaded documents
+    ingestion_worker.init_app(app)
+    
+    # Buffered action logging, the already-actioned target filter and background execution of automation jobs
+    action_log_writer.init_app(app)
+    actioned_targets.init_app(app)
+    automation_executor.init_app(app)
+    
     return app
 
 def register_error_handlers(app):
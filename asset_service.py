@@ -0,0 +1,96 @@
+import os
+import re
+import hashlib
+import logging
+import mimetypes
+from functools import lru_cache
+from flask import current_app, request, send_from_directory, abort
+from werkzeug.security import safe_join
+
+logger = logging.getLogger(__name__)
+
+# One year, the conventional ceiling for immutable assets
+IMMUTABLE_MAX_AGE = 31536000
+
+# A 16-64 character hex token delimited by '_', '-', '.' or the name boundaries,
+# e.g. "3f2a9c0d51e8b7a4_brochure.pdf" or "banner.3f2a9c0d51e8b7a4.png"
+CONTENT_HASH_PATTERN = re.compile(r'(?:^|[._-])([0-9a-f]{16,64})(?=[._-]|$)')
+
+OFFLOAD_MODES = {'', 'x-accel-redirect', 'x-sendfile'}
+
+def content_hash_from_filename(filename: str):
+    """Return the content hash embedded in an asset name, if any"""
+    match = CONTENT_HASH_PATTERN.search(os.path.basename(filename).lower())
+    return match.group(1) if match else None
+
+@lru_cache(maxsize=1024)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    """Hash file contents; cached per (path, mtime, size) so unchanged files are hashed once"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_content_hash(path: str) -> str:
+    """SHA-256 of a file, hashed in chunks and cached while the file is unchanged"""
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_mtime_ns, stat.st_size)
+
+def compute_file_etag(path: str) -> str:
+    """Strong ETag derived from the file contents"""
+    hashed = content_hash_from_filename(path)
+    if hashed:
+        return hashed
+    return file_content_hash(path)[:32]
+
+def send_upload(upload_folder: str, filename: str):
+    """Serve a file from the upload folder with caching, ETag, range and offload support"""
+    path = safe_join(os.path.abspath(upload_folder), filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    config = current_app.config
+    etag = compute_file_etag(path)
+
+    # Content-hashed names never change, everything else is revalidated via ETag
+    if content_hash_from_filename(filename):
+        max_age = config.get('UPLOADS_IMMUTABLE_MAX_AGE', IMMUTABLE_MAX_AGE)
+        immutable = True
+    else:
+        max_age = config.get('UPLOADS_MAX_AGE', 0)
+        immutable = False
+
+    offload_mode = (config.get('UPLOADS_OFFLOAD_MODE') or '').lower()
+    if offload_mode not in OFFLOAD_MODES:
+        logger.warning(f"Unknown UPLOADS_OFFLOAD_MODE '{offload_mode}', serving directly")
+        offload_mode = ''
+
+    if offload_mode == 'x-accel-redirect':
+        # nginx serves the bytes (including ranges) from an internal location
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = current_app.response_class(mimetype=mimetype)
+        prefix = config.get('UPLOADS_ACCEL_PREFIX', '/protected-uploads/')
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + filename
+        response.set_etag(etag)
+        response.last_modified = os.path.getmtime(path)
+        response.cache_control.max_age = max_age
+        if max_age > 0:
+            response.cache_control.public = True
+        else:
+            response.cache_control.no_cache = True
+        response = response.make_conditional(request)
+    else:
+        # With USE_X_SENDFILE (set for 'x-sendfile' mode) Flask emits only the header
+        response = send_from_directory(
+            os.path.abspath(upload_folder),
+            filename,
+            etag=etag,
+            max_age=max_age,
+            conditional=True
+        )
+
+    if immutable:
+        response.cache_control.immutable = True
+
+    return response
@@ -2,16 +2,22 @@ import os
 import logging
 import asyncio
 import random
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, asdict
 from enum import Enum
 import json
 from extensions import db
-from models import User, Post, MarketingCampaign, AutomationRule, ActionLog
+from models import User, Post, MarketingCampaign, AutomationRule
 from gemini_service import generate_linkedin_post
 from image_generation_service import image_service
 from linkedin_service import linkedin_service
+from linkedin_automation import linkedin_automation
+from action_log_writer import action_log_writer
+from action_budget import action_budget, DAILY_LIMITS
+from target_filter import actioned_targets, CONNECTION_ACTIONS
+from rule_criteria import rule_criteria, CompiledCriteria
 
 logger = logging.getLogger(__name__)
 
@@ -50,14 +56,7 @@ class LinkedInAutomationEngine:
     """Advanced LinkedIn automation engine with AI-powered campaign generation and optimization"""
     
     def __init__(self):
-        self.daily_limits = {
-            'connections': 100,
-            'follows': 150,
-            'likes': 300,
-            'comments': 50,
-            'messages': 20,
-            'posts': 5
-        }
+        self.daily_limits = DAILY_LIMITS  # Shared with LinkedInAutomation, enforced by action_budget reservations
         self.active_campaigns = {}
         self.automation_rules = {}
         
@@ -404,44 +403,63 @@ class LinkedInAutomationEngine:
                 if not rule or not rule.is_active:
                     break
                 
-                # Check daily limits
-                today_actions = self._get_today_action_count(user_id, 'auto_follow')
-                if today_actions >= rule.daily_limit:
+                # Check daily limits; the rule's budget and the account's invitation budget are shared with every other worker
+                available = min(
+                    action_budget.available(user_id, 'auto_follow', rule.daily_limit),
+                    action_budget.available(user_id, 'connections')
+                )
+                if available <= 0:
                     # Wait until next day
                     await asyncio.sleep(3600)  # Check every hour
                     continue
                 
-                # Find target profiles
-                target_profiles = await self._find_target_profiles(rule.target_criteria)
+                # Find target profiles; criteria are compiled once per rule version
+                criteria = rule_criteria.get(rule)
+                target_profiles = await self._find_target_profiles(criteria)
+                target_profiles = actioned_targets.filter_new(
+                    user_id, CONNECTION_ACTIONS, target_profiles, key=lambda profile: profile['id']
+                )
+                
+                # Best matches for the rule's titles, industries, company sizes and keywords
+                target_profiles = criteria.rank_profiles(target_profiles, min(10, available))
                 
-                # Send connection requests
-                for profile in target_profiles[:min(10, rule.daily_limit - today_actions)]:
+                # Send connection requests, one reserved unit each; failed requests give their units back.
+                # Every request is also an invitation, so it is charged to the same 'connections' budget as manual sends
+                for profile in target_profiles:
                     try:
-                        # Personalize connection message
-                        message = self._personalize_connection_message(
-                            rule.action_template, profile
-                        )
-                        
-                        # Send connection request
-                        result = await linkedin_service.send_connection_request(
-                            profile['id'], message
-                        )
-                        
-                        # Log action
-                        self._log_automation_action(
-                            user_id, rule_id, 'auto_follow', profile['id'], 
-                            result['success'], result.get('error')
-                        )
-                        
-                        if result['success']:
-                            rule.successful_actions += 1
-                        else:
-                            rule.failed_actions += 1
-                        
-                        rule.total_actions += 1
-                        
-                        # Rate limiting
-                        await asyncio.sleep(random.randint(30, 120))  # 30-120 seconds between requests
+                        with action_budget.reserve(user_id, 'connections') as invitation, \
+                                action_budget.reserve(user_id, 'auto_follow', limit=rule.daily_limit) as reservation:
+                            if not (invitation.granted and reservation.granted):
+                                break
+                            
+                            # Personalize connection message
+                            message = self._personalize_connection_message(
+                                rule.action_template, profile
+                            )
+                            
+                            # Send connection request
+                            result = await linkedin_service.send_connection_request(
+                                profile['id'], message
+                            )
+                            if result.get('rate_limited'):
+                                # Throttled, not rejected: nothing is logged, so the profile is tried again next batch
+                                logger.info(f"Auto-follow rule {rule_id} paused by rate limit: {result.get('error')}")
+                                break
+                            
+                            # Log action
+                            self._log_automation_action(
+                                user_id, rule_id, 'auto_follow', profile['id'], 
+                                result['success'], result.get('error')
+                            )
+                            
+                            if result['success']:
+                                invitation.use()
+                                reservation.use()
+                                rule.successful_actions += 1
+                            else:
+                                rule.failed_actions += 1
+                            
+                            rule.total_actions += 1
                         
                     except Exception as e:
                         logger.error(f"Auto-follow action failed: {str(e)}")
@@ -455,6 +473,10 @@ class LinkedInAutomationEngine:
         except Exception as e:
             logger.error(f"Auto-follow automation error: {str(e)}")
     
+    async def _find_target_profiles(self, criteria: CompiledCriteria) -> List[Dict]:
+        """Search LinkedIn for profiles matching a rule's compiled criteria"""
+        return await asyncio.to_thread(linkedin_automation._search_profiles, criteria.source)
+    
     # Helper methods for content optimization and analysis
     async def _analyze_post_performance(self, user_id: int) -> Dict[str, Any]:
         """Analyze recent post performance"""
@@ -498,43 +520,35 @@ class LinkedInAutomationEngine:
             logger.error(f"Performance analysis failed: {str(e)}")
             return {'overall_score': 0, 'low_performing_posts': []}
     
+    def _personalize_connection_message(self, template: Optional[str], profile: Dict) -> Optional[str]:
+        """Fill {first_name}, {name}, {headline}, {company}, {industry} and {location} from the profile"""
+        if not template:
+            return None
+        
+        name = profile.get('name') or ''
+        fields = {key: str(value) for key, value in profile.items() if value is not None}
+        fields.setdefault('first_name', name.split()[0] if name.split() else 'there')
+        try:
+            return template.format_map(defaultdict(str, fields))
+        except (ValueError, IndexError):
+            return template  # Braces that are not placeholders: send the template as written
+    
     def _log_automation_action(self, user_id: int, rule_id: int, action_type: str, 
                              target_id: str, success: bool, error: str = None):
         """Log automation action for audit trail"""
         try:
-            action_log = ActionLog(
-                user_id=user_id,
-                automation_rule_id=rule_id,
-                action_type=action_type,
+            action_log_writer.record(
+                user_id,
+                action_type,
                 target_profile_id=target_id,
                 status='success' if success else 'failed',
-                error_message=error
+                error_message=error,
+                automation_rule_id=rule_id
             )
             
-            db.session.add(action_log)
-            db.session.commit()
-            
         except Exception as e:
             logger.error(f"Failed to log automation action: {str(e)}")
     
-    def _get_today_action_count(self, user_id: int, action_type: str) -> int:
-        """Get count of actions performed today"""
-        try:
-            today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            
-            count = ActionLog.query.filter_by(
-                user_id=user_id,
-                action_type=action_type
-            ).filter(
-                ActionLog.created_at >= today_start
-            ).count()
-            
-            return count
-            
-        except Exception as e:
-            logger.error(f"Failed to get today's action count: {str(e)}")
-            return 0
-    
     async def _create_content_prompt(self, theme: str, target_audience: Dict, user_media: List) -> str:
         """Create AI prompt for content generation"""
         audience_desc = f"{target_audience.get('industries', ['Business'])[0]} professionals"
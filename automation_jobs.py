@@ -0,0 +1,257 @@
+import os
+import time
+import queue
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from extensions import db
+from models import AutomationJob
+
+logger = logging.getLogger(__name__)
+
+# A 'running' job whose last checkpoint is older than this belonged to a worker that died
+STALE_AFTER = timedelta(seconds=int(os.environ.get('AUTOMATION_JOB_STALE_SECONDS', 900)))
+
+# Seconds a job stopped by a rate limit stays paused when LinkedIn gave no Retry-After
+RATE_LIMIT_PAUSE = float(os.environ.get('AUTOMATION_JOB_RATE_LIMIT_PAUSE_SECONDS', 60))
+
+JOB_TYPES = ('accept_connections', 'send_connections', 'follow_successful', 'engage_posts')
+
+class JobRun:
+    """Checkpointing handle passed to LinkedInAutomation methods while a job runs"""
+    
+    def __init__(self, job: AutomationJob):
+        self.job = job
+        self.position = (job.cursor or {}).get('position', 0)
+        self.cancelled = False
+    
+    def targets(self, loader: Callable[[], List]) -> List:
+        """Targets saved by an earlier run of this job, or freshly loaded and saved so a resume sees the same list"""
+        cursor = self.job.cursor or {}
+        if 'targets' in cursor:
+            return cursor['targets']
+        
+        targets = loader()
+        self.job.cursor = {'targets': targets, 'position': 0}
+        self.job.progress = {'processed': 0, 'total': len(targets)}
+        db.session.commit()
+        return targets
+    
+    def items(self, targets: List):
+        """Yield the targets not yet processed, checkpointing after each one and stopping on cancellation"""
+        for index in range(self.position, len(targets)):
+            yield targets[index]
+            self.position = index + 1
+            if not self.checkpoint(len(targets)):
+                return
+    
+    def checkpoint(self, total: int) -> bool:
+        """Persist the cursor and progress; returns False once cancellation was requested"""
+        self.job.cursor = dict(self.job.cursor or {}, position=self.position)
+        self.job.progress = {'processed': self.position, 'total': total}
+        self.job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+        
+        self.cancelled = bool(
+            db.session.query(AutomationJob.cancel_requested).filter_by(id=self.job.id).scalar()
+        )
+        return not self.cancelled
+
+def _run_automation(job: AutomationJob, run: JobRun) -> Dict:
+    """Call the LinkedInAutomation method for a job"""
+    from linkedin_automation import linkedin_automation
+    
+    params = job.params or {}
+    rule_id = params.get('automation_rule_id')
+    
+    if job.job_type == 'accept_connections':
+        return linkedin_automation.auto_accept_connections(job=run)
+    if job.job_type == 'send_connections':
+        return linkedin_automation.auto_send_connections(
+            params.get('target_profiles', []), params.get('message'), rule_id, job=run
+        )
+    if job.job_type == 'follow_successful':
+        return linkedin_automation.auto_follow_successful_people(params.get('criteria', {}), rule_id, job=run)
+    if job.job_type == 'engage_posts':
+        return linkedin_automation.auto_engage_with_posts(params.get('keywords', []), rule_id, job=run)
+    raise ValueError(f"Unknown job type: {job.job_type}")
+
+class AutomationJobExecutor:
+    """Background worker that runs queued automation jobs outside the request cycle"""
+    
+    def __init__(self, num_threads: int = None):
+        # One thread by default: actions for a single LinkedIn account are paced by the rate governor anyway
+        self.num_threads = num_threads or int(os.environ.get('AUTOMATION_WORKER_THREADS', 1))
+        self.app = None
+        self.jobs = queue.Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+    
+    def init_app(self, app):
+        """Bind the executor to an application and pick up queued and paused jobs and jobs orphaned by a dead worker"""
+        self.app = app
+        with app.app_context():
+            try:
+                stale_before = datetime.utcnow() - STALE_AFTER
+                AutomationJob.query.filter(
+                    AutomationJob.status == 'running',
+                    db.or_(AutomationJob.heartbeat_at.is_(None), AutomationJob.heartbeat_at < stale_before)
+                ).update({'status': 'queued'}, synchronize_session=False)
+                # A paused job's timer died with the previous process; the governor makes it wait again if still throttled
+                AutomationJob.query.filter_by(status='paused').update({'status': 'queued', 'error': None}, synchronize_session=False)
+                db.session.commit()
+                
+                queued_ids = [row.id for row in AutomationJob.query.filter_by(status='queued').order_by(AutomationJob.id).all()]
+                for job_id in queued_ids:
+                    self.enqueue(job_id)
+            except Exception as e:
+                logger.error(f"Error resuming automation jobs: {str(e)}")
+    
+    def submit(self, user_id: int, job_type: str, params: Dict = None) -> AutomationJob:
+        """Create a queued job and hand it to the worker"""
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Unknown job type: {job_type}")
+        
+        job = AutomationJob(user_id=user_id, job_type=job_type, params=params or {}, status='queued')
+        db.session.add(job)
+        db.session.commit()
+        self.enqueue(job.id)
+        return job
+    
+    def cancel(self, job: AutomationJob) -> AutomationJob:
+        """Cancel a queued or paused job immediately, or ask a running one to stop at its next checkpoint"""
+        if job.status in ('queued', 'paused'):
+            AutomationJob.query.filter_by(id=job.id, status=job.status).update(
+                {'status': 'cancelled', 'cancel_requested': True, 'finished_at': datetime.utcnow()},
+                synchronize_session=False
+            )
+        elif job.status == 'running':
+            job.cancel_requested = True
+        db.session.commit()
+        db.session.refresh(job)
+        return job
+    
+    def resume(self, job: AutomationJob) -> AutomationJob:
+        """Requeue a cancelled, failed or paused job; it continues from its saved cursor"""
+        if job.status in ('cancelled', 'failed', 'paused'):
+            job.status = 'queued'
+            job.cancel_requested = False
+            job.error = None
+            job.finished_at = None
+            db.session.commit()
+            self.enqueue(job.id)
+        return job
+    
+    def enqueue(self, job_id: int):
+        self._ensure_started()
+        self.jobs.put(job_id)
+    
+    def _resume_later(self, job_id: int, delay: float):
+        """Requeue a paused job once its rate-limit pause is over"""
+        def resume():
+            with self.app.app_context():
+                requeued = AutomationJob.query.filter_by(id=job_id, status='paused').update(
+                    {'status': 'queued', 'error': None}, synchronize_session=False
+                )
+                db.session.commit()
+            if requeued:
+                self.enqueue(job_id)
+        
+        timer = threading.Timer(delay, resume)
+        timer.daemon = True
+        timer.start()
+    
+    def _ensure_started(self):
+        """Start worker threads on first use"""
+        with self.lock:
+            self.threads = [thread for thread in self.threads if thread.is_alive()]
+            while len(self.threads) < self.num_threads:
+                thread = threading.Thread(target=self._run, name='automation-worker', daemon=True)
+                thread.start()
+                self.threads.append(thread)
+    
+    def _run(self):
+        """Worker loop"""
+        while True:
+            job_id = self.jobs.get()
+            try:
+                with self.app.app_context():
+                    self.process(job_id)
+            except Exception as e:
+                logger.error(f"Automation worker error for job {job_id}: {str(e)}")
+            finally:
+                self.jobs.task_done()
+    
+    def _claim(self, job_id: int) -> bool:
+        """Atomically move a job from 'queued' to 'running' so only one worker/process runs it"""
+        now = datetime.utcnow()
+        claimed = AutomationJob.query.filter_by(id=job_id, status='queued').update(
+            {'status': 'running', 'started_at': now, 'heartbeat_at': now},
+            synchronize_session=False
+        )
+        db.session.commit()
+        return claimed == 1
+    
+    def process(self, job_id: int):
+        """Run one job to completion, cancellation or failure"""
+        if not self._claim(job_id):
+            logger.info(f"Automation job {job_id} already claimed or not queued, skipping")
+            return
+        
+        job = AutomationJob.query.get(job_id)
+        run = JobRun(job)
+        
+        try:
+            result = _run_automation(job, run)
+            rate_limited, retry_after = result.pop('rate_limited', False), result.pop('retry_after', None)
+            
+            # Counts from earlier (cancelled, failed or paused) runs of the same job are carried forward
+            totals = dict(job.result or {})
+            for key, value in result.items():
+                if isinstance(value, int) and not isinstance(value, bool):
+                    totals[key] = totals.get(key, 0) + value
+                else:
+                    totals[key] = value
+            job.result = totals
+            
+            pause = None
+            if run.cancelled:
+                job.status = 'cancelled'
+            elif rate_limited:
+                # Stopped before the throttled target; the cursor still points at it
+                job.status = 'paused'
+                job.error = result.get('message')
+                pause = retry_after or RATE_LIMIT_PAUSE
+            elif result.get('success') is False:
+                job.status = 'failed'
+                job.error = result.get('error') or result.get('message')
+            else:
+                job.status = 'completed'
+            job.finished_at = None if pause else datetime.utcnow()
+            db.session.commit()
+            if pause:
+                self._resume_later(job_id, pause)
+            
+            logger.info(f"Automation job {job_id} ({job.job_type}) {job.status}: {job.progress}")
+        
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Automation job {job_id} failed: {str(e)}")
+            
+            job.status = 'failed'
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the queue is drained (used by tests and CLI tools)"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while self.jobs.unfinished_tasks:
+            if deadline and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+# Global automation job executor instance
+automation_executor = AutomationJobExecutor()
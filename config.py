@@ -23,6 +23,13 @@ class Config:
     UPLOAD_FOLDER = config('UPLOAD_FOLDER', default='static/uploads')
     ALLOWED_EXTENSIONS = {'pdf', 'txt', 'docx', 'xlsx', 'png', 'jpg', 'jpeg', 'gif'}
     
+    # Upload Delivery Configuration
+    UPLOADS_MAX_AGE = config('UPLOADS_MAX_AGE', default=0, cast=int)  # Non-hashed names revalidate via ETag
+    UPLOADS_IMMUTABLE_MAX_AGE = config('UPLOADS_IMMUTABLE_MAX_AGE', default=31536000, cast=int)  # Content-hashed names
+    UPLOADS_OFFLOAD_MODE = config('UPLOADS_OFFLOAD_MODE', default='')  # '', 'x-accel-redirect' or 'x-sendfile'
+    UPLOADS_ACCEL_PREFIX = config('UPLOADS_ACCEL_PREFIX', default='/protected-uploads/')
+    USE_X_SENDFILE = UPLOADS_OFFLOAD_MODE.lower() == 'x-sendfile'
+    
     # LinkedIn API Configuration
     LINKEDIN_CLIENT_ID = config('LINKEDIN_CLIENT_ID', default='')
     LINKEDIN_CLIENT_SECRET = config('LINKEDIN_CLIENT_SECRET', default='')
@@ -60,6 +67,7 @@ class Config:
     DAILY_LIKE_LIMIT = config('DAILY_LIKE_LIMIT', default=300, cast=int)
     DAILY_COMMENT_LIMIT = config('DAILY_COMMENT_LIMIT', default=50, cast=int)
     DAILY_MESSAGE_LIMIT = config('DAILY_MESSAGE_LIMIT', default=20, cast=int)
+    DAILY_POST_LIMIT = config('DAILY_POST_LIMIT', default=5, cast=int)
     
     # Monitoring
     SENTRY_DSN = config('SENTRY_DSN', default='')
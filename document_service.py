@@ -0,0 +1,352 @@
+import os
+import uuid
+import hashlib
+import logging
+import zipfile
+import posixpath
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from xml.etree import ElementTree
+from werkzeug.utils import secure_filename
+from gemini_service import summarize_text
+from pdf_service import iter_pdf_text, count_pdf_pages, PDF_MAX_PAGES
+
+# Document types the ingestion pipeline can extract text from
+DOCUMENT_EXTENSIONS = {'pdf', 'docx', 'xlsx', 'txt'}
+
+MIME_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'txt': 'text/plain'
+}
+
+# Extraction stops once this many characters have been collected
+DOCUMENT_MAX_CHARS = int(os.environ.get('DOCUMENT_MAX_CHARS', 2_000_000))
+
+# Summarization starts as soon as this much text has been extracted
+SUMMARY_INPUT_CHARS = int(os.environ.get('DOCUMENT_SUMMARY_INPUT_CHARS', 50_000))
+
+# Extractors group paragraphs/rows into chunks of roughly this many characters
+CHUNK_CHARS = 8000
+
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+SHEET_NAMESPACE = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+RELATIONSHIPS_NAMESPACE = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PACKAGE_RELATIONSHIPS_NAMESPACE = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+def get_file_type(filename: str) -> str:
+    """Return the lower-case extension of a filename"""
+    return filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+
+def iter_pdf_chunks(file_path: str) -> Iterator[str]:
+    """Yield PDF text one page at a time"""
+    for _, text in iter_pdf_text(file_path, max_pages=PDF_MAX_PAGES):
+        yield text
+
+def iter_docx_chunks(file_path: str) -> Iterator[str]:
+    """Yield DOCX text in paragraph blocks, parsing document.xml incrementally"""
+    paragraph_tag = WORD_NAMESPACE + 'p'
+    text_tag = WORD_NAMESPACE + 't'
+    block = []
+    block_chars = 0
+    
+    with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as document_xml:
+        stack = []
+        for event, element in ElementTree.iterparse(document_xml, events=('start', 'end')):
+            if event == 'start':
+                stack.append(element)
+                continue
+            
+            stack.pop()
+            if element.tag == paragraph_tag:
+                text = ''.join(node.text or '' for node in element.iter(text_tag))
+                element.clear()
+                if text:
+                    block.append(text)
+                    block_chars += len(text)
+                    if block_chars >= CHUNK_CHARS:
+                        yield "\n".join(block)
+                        block = []
+                        block_chars = 0
+            
+            # Drop finished top-level body elements so the tree never grows with the document
+            if len(stack) == 2:
+                stack[-1].remove(element)
+    
+    if block:
+        yield "\n".join(block)
+
+def _iter_xml_elements(xml_file, tag: str) -> Iterator[ElementTree.Element]:
+    """Yield each finished element with the given tag, then detach it so the parsed tree never grows with the file"""
+    stack = []
+    for event, element in ElementTree.iterparse(xml_file, events=('start', 'end')):
+        if event == 'start':
+            stack.append(element)
+            continue
+        
+        stack.pop()
+        if element.tag == tag:
+            yield element
+            if stack:
+                stack[-1].remove(element)
+
+def _xlsx_worksheets(archive: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """(sheet name, archive path) for each worksheet, in workbook order"""
+    with archive.open('xl/_rels/workbook.xml.rels') as rels_xml:
+        targets = {
+            relationship.get('Id'): relationship.get('Target')
+            for relationship in ElementTree.parse(rels_xml).getroot().iter(PACKAGE_RELATIONSHIPS_NAMESPACE + 'Relationship')
+        }
+    with archive.open('xl/workbook.xml') as workbook_xml:
+        sheets = ElementTree.parse(workbook_xml).getroot().iter(SHEET_NAMESPACE + 'sheet')
+        worksheets = []
+        for sheet in sheets:
+            target = targets.get(sheet.get(RELATIONSHIPS_NAMESPACE + 'id'), '')
+            path = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+            if path in archive.namelist():
+                worksheets.append((sheet.get('name'), path))
+    return worksheets
+
+def _xlsx_shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    with archive.open('xl/sharedStrings.xml') as strings_xml:
+        return [
+            ''.join(node.text or '' for node in item.iter(SHEET_NAMESPACE + 't'))
+            for item in _iter_xml_elements(strings_xml, SHEET_NAMESPACE + 'si')
+        ]
+
+def _xlsx_date_styles(archive: zipfile.ZipFile) -> Set[int]:
+    """Indexes of cell styles whose number format displays a date"""
+    from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+    
+    if 'xl/styles.xml' not in archive.namelist():
+        return set()
+    with archive.open('xl/styles.xml') as styles_xml:
+        root = ElementTree.parse(styles_xml).getroot()
+    
+    formats = dict(BUILTIN_FORMATS)
+    for number_format in root.iter(SHEET_NAMESPACE + 'numFmt'):
+        formats[int(number_format.get('numFmtId'))] = number_format.get('formatCode')
+    
+    cell_formats = root.find(SHEET_NAMESPACE + 'cellXfs')
+    if cell_formats is None:
+        return set()
+    return {
+        index for index, cell_format in enumerate(cell_formats)
+        if is_date_format(formats.get(int(cell_format.get('numFmtId', 0)), ''))
+    }
+
+def _xlsx_cell_text(cell: ElementTree.Element, shared_strings: List[str], date_styles: Set[int], epoch) -> str:
+    """Displayed value of a cell as text, matching openpyxl's data_only values"""
+    cell_type = cell.get('t', 'n')
+    if cell_type == 'inlineStr':
+        return ''.join(node.text or '' for node in cell.iter(SHEET_NAMESPACE + 't'))
+    
+    value = cell.findtext(SHEET_NAMESPACE + 'v')
+    if not value:
+        return ''  # Formulas never calculated have no cached value
+    if cell_type == 's':
+        return shared_strings[int(value)]
+    if cell_type == 'b':
+        return str(value == '1')
+    if cell_type == 'n':
+        number = float(value) if any(mark in value for mark in '.eE') else int(value)
+        if int(cell.get('s', 0)) in date_styles:
+            from openpyxl.utils.datetime import from_excel
+            return str(from_excel(number, epoch))
+        return str(number)
+    return value
+
+def iter_xlsx_chunks(file_path: str) -> Iterator[str]:
+    """Yield spreadsheet rows in blocks, parsing each sheet's XML incrementally"""
+    from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+    
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open('xl/workbook.xml') as workbook_xml:
+            properties = ElementTree.parse(workbook_xml).getroot().find(SHEET_NAMESPACE + 'workbookPr')
+        date1904 = properties is not None and properties.get('date1904') in ('1', 'true')
+        epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+        
+        # Shared strings are the one part held in memory; rows are dropped as soon as they are read
+        shared_strings = _xlsx_shared_strings(archive)
+        date_styles = _xlsx_date_styles(archive)
+        
+        for title, path in _xlsx_worksheets(archive):
+            block = [f"Sheet: {title}"]
+            block_chars = len(block[0])
+            
+            with archive.open(path) as sheet_xml:
+                for row in _iter_xml_elements(sheet_xml, SHEET_NAMESPACE + 'row'):
+                    values = (_xlsx_cell_text(cell, shared_strings, date_styles, epoch) for cell in row.iter(SHEET_NAMESPACE + 'c'))
+                    line = "\t".join(value for value in values if value)
+                    if not line:
+                        continue
+                    
+                    block.append(line)
+                    block_chars += len(line)
+                    if block_chars >= CHUNK_CHARS:
+                        yield "\n".join(block)
+                        block = []
+                        block_chars = 0
+            
+            if block:
+                yield "\n".join(block)
+
+def iter_txt_chunks(file_path: str) -> Iterator[str]:
+    """Yield plain text in chunks of at most CHUNK_CHARS, split on line boundaries where possible"""
+    carry = ""
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as text_file:
+        for data in iter(lambda: text_file.read(CHUNK_CHARS), ''):
+            data = carry + data
+            while len(data) > CHUNK_CHARS:
+                cut = data.rfind("\n", 0, CHUNK_CHARS)
+                if cut == -1:
+                    cut = CHUNK_CHARS - 1
+                yield data[:cut + 1]
+                data = data[cut + 1:]
+            carry = data
+    
+    if carry:
+        yield carry
+
+# Extractor per file type: each yields text chunks without loading the whole document
+EXTRACTORS: Dict[str, Callable[[str], Iterator[str]]] = {
+    'pdf': iter_pdf_chunks,
+    'docx': iter_docx_chunks,
+    'xlsx': iter_xlsx_chunks,
+    'txt': iter_txt_chunks
+}
+
+CHUNK_UNITS = {
+    'pdf': 'page',
+    'docx': 'paragraph block',
+    'xlsx': 'row block',
+    'txt': 'text block'
+}
+
+def count_chunks(file_path: str, file_type: str) -> Optional[int]:
+    """Number of chunks the extractor will yield, when it is cheap to know up front"""
+    if file_type == 'pdf':
+        return min(count_pdf_pages(file_path), PDF_MAX_PAGES)
+    return None
+
+def stream_document_text(file_path: str, file_type: str, text_file: IO[str],
+                         max_chars: int = DOCUMENT_MAX_CHARS) -> Iterator[str]:
+    """Extract chunks into text_file as they are read, yielding each chunk and stopping at max_chars"""
+    extractor = EXTRACTORS.get(file_type)
+    if not extractor:
+        raise Exception(f"Unsupported document type: {file_type}")
+    
+    chunks = extractor(file_path)
+    total_chars = 0
+    try:
+        for text in chunks:
+            text = text[:max_chars - total_chars]
+            total_chars += len(text)
+            text_file.write(text if text.endswith("\n") else text + "\n")
+            yield text
+            
+            if total_chars >= max_chars:
+                break
+    finally:
+        # Stops extraction early (and shuts down any PDF worker pool)
+        chunks.close()
+
+def extract_and_summarize(file_path: str, file_type: str, on_chunk: Optional[Callable[[int], None]] = None) -> dict:
+    """Stream text out of a document, summarizing the opening chunks while extraction continues"""
+    summary_future = None
+    head_parts = []
+    head_chars = 0
+    chunk_count = 0
+    total_chars = 0
+    
+    # Extracted text is spooled to an anonymous temp file, never next to the public upload, and is gone once closed
+    with ThreadPoolExecutor(max_workers=1) as summarizer, \
+            tempfile.TemporaryFile('w+', encoding='utf-8', suffix='.txt') as text_file:
+        try:
+            for text in stream_document_text(file_path, file_type, text_file):
+                chunk_count += 1
+                total_chars += len(text.strip())
+                if on_chunk:
+                    on_chunk(chunk_count)
+                
+                if summary_future is None and text:
+                    head_parts.append(text)
+                    head_chars += len(text)
+                    if head_chars >= SUMMARY_INPUT_CHARS:
+                        head = "\n".join(head_parts)[:SUMMARY_INPUT_CHARS]
+                        summary_future = summarizer.submit(summarize_text, head)
+                        head_parts = []
+        except Exception as e:
+            logging.error(f"Error extracting text from {file_type.upper()}: {str(e)}")
+            raise Exception(f"Failed to extract text from {file_type.upper()}: {str(e)}")
+        
+        if not total_chars:
+            raise Exception(f"No text content found in the {file_type.upper()}")
+        
+        if summary_future is None:
+            summary_future = summarizer.submit(summarize_text, "\n".join(head_parts))
+        
+        # Read back in CHUNK_CHARS blocks; the total is bounded by DOCUMENT_MAX_CHARS
+        text_file.seek(0)
+        extracted_text = ''.join(iter(lambda: text_file.read(CHUNK_CHARS), '')).strip()
+        
+        summary = summary_future.result()
+    
+    return {
+        'extracted_text': extracted_text,
+        'summary': summary,
+        'chunk_count': chunk_count
+    }
+
+def save_uploaded_document(file, upload_folder: str, allowed_extensions=DOCUMENT_EXTENSIONS) -> dict:
+    """Validate and save an uploaded document without processing it, hashing the content while streaming to disk"""
+    if not file or file.filename == '':
+        raise Exception("No file selected")
+    
+    file_type = get_file_type(file.filename)
+    if file_type not in allowed_extensions:
+        raise Exception(f"Invalid file type. Allowed types: {', '.join(sorted(allowed_extensions))}")
+    
+    # Secure the filename
+    filename = secure_filename(file.filename)
+    if not filename or get_file_type(filename) != file_type:
+        filename = f"upload.{file_type}"
+    
+    # Stream to a temporary name, hashing as we go
+    digest = hashlib.sha256()
+    temp_path = os.path.join(upload_folder, f".upload-{uuid.uuid4().hex}.part")
+    try:
+        with open(temp_path, 'wb') as out:
+            for chunk in iter(lambda: file.stream.read(UPLOAD_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                out.write(chunk)
+        
+        # Content-addressed name: identical uploads share a file, different ones never overwrite
+        content_hash = digest.hexdigest()
+        filename = f"{content_hash[:16]}_{filename}"
+        file_path = os.path.join(upload_folder, filename)
+        
+        if os.path.exists(file_path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    
+    return {
+        'filename': filename,
+        'original_filename': file.filename,
+        'file_path': file_path,
+        'file_size': os.path.getsize(file_path),
+        'file_type': file_type,
+        'mime_type': MIME_TYPES.get(file_type, 'application/octet-stream'),
+        'content_hash': content_hash
+    }
@@ -0,0 +1,245 @@
+import os
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+import weakref
+from collections import deque
+from typing import Dict, Optional
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from rate_governor import RateLimitGovernor, member_key, rate_governor
+
+logger = logging.getLogger(__name__)
+
+# Requests are timed and counted in EndpointMetrics; httpx's own per-request INFO lines are noise
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+# (connect, read) timeouts in seconds; no outbound call may block a worker indefinitely
+CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 20))
+
+# Keep-alive connections kept per host
+POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 20))
+
+# Retries for idempotent requests; POST is only retried when the connection was never established
+RETRY_TOTAL = int(os.environ.get('HTTP_RETRY_TOTAL', 3))
+RETRY_BACKOFF = float(os.environ.get('HTTP_RETRY_BACKOFF', 0.5))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# The shared session retries server errors only; a 429 goes back to the caller once the governor has recorded its Retry-After
+SESSION_RETRY_STATUSES = (500, 502, 503, 504)
+
+# Concurrent in-flight requests per event loop for the async client
+ASYNC_CONCURRENCY = int(os.environ.get('HTTP_ASYNC_CONCURRENCY', 10))
+
+IDEMPOTENT_METHODS = frozenset(Retry.DEFAULT_ALLOWED_METHODS)
+
+# Latency samples kept per endpoint for percentiles
+LATENCY_SAMPLES = 200
+
+ID_SEGMENT = re.compile(r'^(?:\d+|urn:.*|[0-9a-f-]{16,}|[A-Za-z0-9_-]{20,})$')
+
+def endpoint_name(method: str, url: str) -> str:
+    """Metrics label for a request: method plus URL path with ids and projections collapsed"""
+    path = requests.utils.urlparse(url).path
+    path = path.split(':(', 1)[0]
+    segments = ['{id}' if ID_SEGMENT.match(requests.utils.unquote(segment)) else segment
+                for segment in path.split('/')]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+class EndpointMetrics:
+    """Thread-safe per-endpoint request counts and latency"""
+    
+    def __init__(self, samples: int = LATENCY_SAMPLES):
+        self.samples = samples
+        self.lock = threading.Lock()
+        self.endpoints: Dict[str, Dict] = {}
+    
+    def record(self, endpoint: str, elapsed_ms: float, status: Optional[int]):
+        with self.lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = {
+                    'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'statuses': {}, 'latencies': deque(maxlen=self.samples)
+                }
+            stats['count'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['latencies'].append(elapsed_ms)
+            key = str(status) if status is not None else 'error'
+            stats['statuses'][key] = stats['statuses'].get(key, 0) + 1
+            if status is None or status >= 400:
+                stats['errors'] += 1
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """Summary per endpoint: count, errors, mean/p50/p95/max latency in ms"""
+        with self.lock:
+            summary = {}
+            for endpoint, stats in self.endpoints.items():
+                latencies = sorted(stats['latencies'])
+                summary[endpoint] = {
+                    'count': stats['count'],
+                    'errors': stats['errors'],
+                    'statuses': dict(stats['statuses']),
+                    'mean_ms': round(stats['total_ms'] / stats['count'], 2),
+                    'p50_ms': round(latencies[len(latencies) // 2], 2),
+                    'p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+                    'max_ms': round(stats['max_ms'], 2)
+                }
+            return summary
+    
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+
+class HTTPClient:
+    """Shared requests.Session with pooled keep-alive connections, timeouts, retries, rate limiting and latency metrics"""
+    
+    def __init__(self, pool_maxsize: int = POOL_MAXSIZE, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 retries: int = RETRY_TOTAL, backoff_factor: float = RETRY_BACKOFF,
+                 governor: Optional[RateLimitGovernor] = None):
+        self.timeout = timeout
+        self.governor = governor
+        self.metrics = EndpointMetrics()
+        
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=SESSION_RETRY_STATUSES,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,  # idempotent methods only
+            respect_retry_after_header=False,  # never sleep inside the session; the governor bounds every wait
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry)
+        
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def request(self, method: str, url: str, endpoint: str = None, **kwargs) -> requests.Response:
+        """Send a request through the shared session once the governor grants a permit, recording latency under its endpoint name"""
+        kwargs.setdefault('timeout', self.timeout)
+        endpoint = endpoint or endpoint_name(method, url)
+        member = member_key(kwargs.get('headers'))
+        if self.governor:
+            self.governor.acquire(endpoint, member=member)
+        
+        started = time.perf_counter()
+        status = None
+        
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status = response.status_code
+            if self.governor:
+                self.governor.observe(endpoint, status, response.headers, member=member)
+            return response
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.metrics.record(endpoint, elapsed_ms, status)
+            logger.debug(f"{endpoint} -> {status} in {elapsed_ms:.1f}ms")
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+    
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
+    
+    def get_metrics(self) -> Dict[str, Dict]:
+        return self.metrics.snapshot()
+
+class AsyncHTTPClient:
+    """httpx.AsyncClient pool with bounded concurrency, one client per event loop, sharing HTTPClient's metrics"""
+    
+    def __init__(self, metrics: EndpointMetrics, concurrency: int = ASYNC_CONCURRENCY, pool_maxsize: int = POOL_MAXSIZE,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), retries: int = RETRY_TOTAL, backoff_factor: float = RETRY_BACKOFF,
+                 governor: Optional[RateLimitGovernor] = None):
+        self.metrics = metrics
+        self.governor = governor
+        self.concurrency = concurrency
+        self.pool_maxsize = pool_maxsize
+        self.timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._loops = weakref.WeakKeyDictionary()  # event loop -> (client, semaphore)
+    
+    def _for_current_loop(self):
+        """AsyncClient and semaphore bound to the running loop (asyncio objects cannot cross loops)"""
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize),
+                transport=httpx.AsyncHTTPTransport(retries=self.retries)  # connect failures only
+            )
+            state = self._loops[loop] = (client, asyncio.Semaphore(self.concurrency))
+        return state
+    
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if self.governor and response is not None and response.status_code == 429:
+            return 0.0  # acquire_async waits out the Retry-After the governor just recorded, within its wait limit
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_factor * (2 ** attempt) * (0.5 + random.random())
+    
+    async def request(self, method: str, url: str, endpoint: str = None, **kwargs) -> httpx.Response:
+        """Send a request on the loop's pooled client; idempotent methods are retried on 429/5xx and transport errors"""
+        client, semaphore = self._for_current_loop()
+        endpoint = endpoint or endpoint_name(method, url)
+        retryable = method.upper() in IDEMPOTENT_METHODS
+        member = member_key(kwargs.get('headers'))
+        
+        for attempt in range(self.retries + 1):
+            response = None
+            if self.governor:
+                await self.governor.acquire_async(endpoint, member=member)  # before taking a slot, so waiting holds no connection
+            
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                except httpx.TransportError:
+                    if not retryable or attempt == self.retries:
+                        raise
+                finally:
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    self.metrics.record(endpoint, elapsed_ms, response.status_code if response is not None else None)
+            
+            if response is not None and self.governor:
+                self.governor.observe(endpoint, response.status_code, response.headers, member=member)
+            
+            if response is not None and not (retryable and response.status_code in RETRY_STATUSES and attempt < self.retries):
+                return response
+            
+            await asyncio.sleep(self._retry_delay(attempt, response))
+        
+        return response
+    
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+    
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+    
+    async def aclose(self):
+        """Close the running loop's client (call before the loop shuts down)"""
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state:
+            await state[0].aclose()
+
+# Global HTTP clients shared by all outbound API calls
+http_client = HTTPClient(governor=rate_governor)
+async_http_client = AsyncHTTPClient(http_client.metrics, governor=rate_governor)
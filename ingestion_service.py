@@ -0,0 +1,180 @@
+import os
+import time
+import queue
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+from extensions import db
+from models import UploadedFile
+from document_service import extract_and_summarize, count_chunks, CHUNK_UNITS
+from keyword_service import extract_keywords
+
+logger = logging.getLogger(__name__)
+
+# A 'processing' upload whose last progress commit is older than this belonged to a worker that died
+STALE_AFTER = timedelta(seconds=int(os.environ.get('INGESTION_STALE_SECONDS', 900)))
+
+class IngestionWorker:
+    """Background worker that drives UploadedFile.processing_status from 'pending' to 'completed' or 'failed'"""
+    
+    def __init__(self, num_threads: int = None, progress_interval: float = 1.0):
+        self.num_threads = num_threads or int(os.environ.get('INGESTION_WORKER_THREADS', 2))
+        self.progress_interval = progress_interval  # Seconds between progress commits
+        self.app = None
+        self.jobs = queue.Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+    
+    def init_app(self, app):
+        """Bind the worker to an application and pick up uploads left pending or orphaned by a dead worker"""
+        self.app = app
+        with app.app_context():
+            try:
+                stale_before = datetime.utcnow() - STALE_AFTER
+                UploadedFile.query.filter(
+                    UploadedFile.processing_status == 'processing',
+                    db.or_(UploadedFile.heartbeat_at.is_(None), UploadedFile.heartbeat_at < stale_before)
+                ).update({'processing_status': 'pending'}, synchronize_session=False)
+                db.session.commit()
+                
+                pending_ids = [row.id for row in UploadedFile.query.filter_by(processing_status='pending').all()]
+                for file_id in pending_ids:
+                    self.enqueue(file_id)
+            except Exception as e:
+                logger.error(f"Error resuming pending uploads: {str(e)}")
+    
+    def enqueue(self, file_id: int):
+        """Queue an uploaded file for processing"""
+        self._ensure_started()
+        self.jobs.put(file_id)
+    
+    def _ensure_started(self):
+        """Start worker threads on first use"""
+        with self.lock:
+            self.threads = [thread for thread in self.threads if thread.is_alive()]
+            while len(self.threads) < self.num_threads:
+                thread = threading.Thread(target=self._run, name='ingestion-worker', daemon=True)
+                thread.start()
+                self.threads.append(thread)
+    
+    def _run(self):
+        """Worker loop"""
+        while True:
+            file_id = self.jobs.get()
+            try:
+                with self.app.app_context():
+                    self.process(file_id)
+            except Exception as e:
+                logger.error(f"Ingestion worker error for file {file_id}: {str(e)}")
+            finally:
+                self.jobs.task_done()
+    
+    def _claim(self, file_id: int) -> bool:
+        """Atomically move a file from 'pending' to 'processing' so only one worker/process handles it"""
+        claimed = UploadedFile.query.filter_by(id=file_id, processing_status='pending').update(
+            {
+                'processing_status': 'processing',
+                'processing_error': None,
+                'processing_progress': {'stage': 'extracting', 'chunks_processed': 0},
+                'heartbeat_at': datetime.utcnow()
+            },
+            synchronize_session=False
+        )
+        db.session.commit()
+        return claimed == 1
+    
+    def process(self, file_id: int):
+        """Extract and summarize one uploaded file"""
+        if not self._claim(file_id):
+            logger.info(f"Upload {file_id} already claimed or not pending, skipping")
+            return
+        
+        uploaded_file = UploadedFile.query.get(file_id)
+        file_type = uploaded_file.file_type or 'pdf'
+        progress = {
+            'stage': 'extracting',
+            'unit': CHUNK_UNITS.get(file_type, 'chunk'),
+            'chunks_processed': 0,
+            'total_chunks': None
+        }
+        last_commit = 0.0
+        
+        def on_chunk(chunks_processed: int):
+            nonlocal last_commit
+            progress['chunks_processed'] = chunks_processed
+            now = time.monotonic()
+            if now - last_commit >= self.progress_interval:
+                uploaded_file.processing_progress = dict(progress)
+                uploaded_file.heartbeat_at = datetime.utcnow()
+                db.session.commit()
+                last_commit = now
+        
+        try:
+            if self._reuse_existing_results(uploaded_file):
+                logger.info(f"Upload {file_id} matches an already processed file, reused its results")
+                return
+            
+            progress['total_chunks'] = count_chunks(uploaded_file.file_path, file_type)
+            uploaded_file.processing_progress = dict(progress)
+            uploaded_file.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+            
+            result = extract_and_summarize(uploaded_file.file_path, file_type, on_chunk=on_chunk)
+            
+            progress.update({'stage': 'completed', 'chunks_processed': result['chunk_count']})
+            uploaded_file.extracted_text = result['extracted_text']
+            uploaded_file.summary = result['summary']
+            uploaded_file.keywords = extract_keywords(result['extracted_text'])
+            uploaded_file.processed = True
+            uploaded_file.processing_status = 'completed'
+            uploaded_file.processing_progress = dict(progress)
+            db.session.commit()
+            
+            logger.info(f"Processed upload {file_id} ({result['chunk_count']} {progress['unit']}s)")
+        
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error processing upload {file_id}: {str(e)}")
+            
+            progress['stage'] = 'failed'
+            uploaded_file.processing_status = 'failed'
+            uploaded_file.processing_error = str(e)
+            uploaded_file.processing_progress = dict(progress)
+            db.session.commit()
+    
+    def _reuse_existing_results(self, uploaded_file: UploadedFile) -> bool:
+        """Copy results from the same user's completed upload with the same content hash, if there is one"""
+        if not uploaded_file.content_hash:
+            return False
+        
+        original = UploadedFile.query.filter(
+            UploadedFile.user_id == uploaded_file.user_id,
+            UploadedFile.content_hash == uploaded_file.content_hash,
+            UploadedFile.processing_status == 'completed',
+            UploadedFile.id != uploaded_file.id
+        ).order_by(UploadedFile.id).first()
+        
+        if not original:
+            return False
+        
+        uploaded_file.extracted_text = original.extracted_text
+        uploaded_file.summary = original.summary
+        uploaded_file.keywords = original.keywords
+        uploaded_file.processed = True
+        uploaded_file.processing_status = 'completed'
+        uploaded_file.processing_progress = dict(original.processing_progress or {}, stage='completed', reused_from=original.id)
+        db.session.commit()
+        return True
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the queue is drained (used by tests and CLI tools)"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while self.jobs.unfinished_tasks:
+            if deadline and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+# Global ingestion worker instance
+ingestion_worker = IngestionWorker()
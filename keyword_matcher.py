@@ -0,0 +1,95 @@
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# Words (with an optional leading '#') after lower-casing; keywords and post text are tokenized alike, so matches
+# always fall on word boundaries. A keyword written as a hashtag ('#AI') only matches the hashtag; a plain one matches both
+TOKEN_PATTERN = re.compile(r'(#?)(\w+)')
+
+# Post fields searched for keywords
+POST_TEXT_FIELDS = ('content', 'commentary', 'text', 'title')
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over word tokens: one pass per text finds every keyword, overlapping ones included"""
+    
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords: List[str] = []
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[Tuple[int, int, bool]]] = [[]]  # (keyword index, token count, hashtag only)
+        
+        seen = set()
+        for keyword in keywords:
+            tokens = tuple(TOKEN_PATTERN.findall(keyword.lower()))
+            if not tokens or tokens in seen:
+                continue
+            seen.add(tokens)
+            state = 0
+            for _, word in tokens:
+                state = self._child(state, word)
+            self.outputs[state].append((len(self.keywords), len(tokens), bool(tokens[0][0])))
+            self.keywords.append(keyword)
+        
+        self._link_failures()
+    
+    def _child(self, state: int, word: str) -> int:
+        if word not in self.goto[state]:
+            self.goto.append({})
+            self.fail.append(0)
+            self.outputs.append([])
+            self.goto[state][word] = len(self.goto) - 1
+        return self.goto[state][word]
+    
+    def _link_failures(self):
+        """Breadth-first failure links (depth-one states fail to the root); each state inherits its failure state's outputs"""
+        pending = deque(self.goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for word, child in self.goto[state].items():
+                pending.append(child)
+                fallback = self.fail[state]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(word, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+    
+    def find(self, text: str) -> List[str]:
+        """Distinct keywords in the text, in keyword order"""
+        if not self.keywords or not text:
+            return []
+        
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        found = set()
+        state = 0
+        for position, (_, word) in enumerate(tokens):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            if state and outputs[state]:
+                for index, length, hashtag_only in outputs[state]:
+                    if not hashtag_only or tokens[position - length + 1][0]:
+                        found.add(index)
+        return [self.keywords[index] for index in sorted(found)]
+    
+    def matches(self, posts: Iterable[Dict]) -> Iterator[Tuple[Dict, List[str]]]:
+        """Stream (post, matched keywords) for every post with at least one match; consumes posts lazily"""
+        for post in posts:
+            text = ' '.join(str(post.get(field) or '') for field in POST_TEXT_FIELDS)
+            matched = self.find(text)
+            if matched:
+                yield post, matched
+    
+    def rank(self, posts: Iterable[Dict], k: int = None) -> List[Dict]:
+        """Matching posts, most keywords matched first (ties keep their order), each with 'matched_keywords' set"""
+        ranked = sorted(self.matches(posts), key=lambda match: -len(match[1]))
+        return [dict(post, matched_keywords=matched) for post, matched in ranked[:k]]
+
+@lru_cache(maxsize=128)
+def _cached_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+def keyword_matcher(keywords: Iterable[str]) -> KeywordMatcher:
+    """Matcher for a keyword set, built once and shared by every caller using the same set"""
+    return _cached_matcher(tuple(sorted({keyword.strip() for keyword in keywords if keyword and keyword.strip()})))
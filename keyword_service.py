@@ -0,0 +1,164 @@
+import re
+import numpy as np
+from typing import Dict, List, Optional
+
+# Default number of keyphrases stored per document
+TOP_KEYWORDS = 15
+
+# Longest keyphrase, in words; longer runs of content words are split into windows
+MAX_PHRASE_WORDS = 3
+
+# Document-frequency statistics are computed over blocks of this many tokens
+IDF_BLOCK_TOKENS = 400
+
+# Upper bound on the document brief sent to the model instead of the full text
+BRIEF_MAX_CHARS = 1500
+
+# Words and punctuation, after lower-casing; punctuation tokens act as phrase delimiters
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#'&-]*|[^\sa-z0-9]")
+
+STOPWORDS = frozenset("""
+a about above across after again against all almost also although always am among an and another any anyone
+anything are around as at be because been before being below between both but by can cannot could did do
+does doing done down during each either else enough etc even ever every few for from further get gets got
+had has have having he her here hers herself him himself his how however i if in into is it its itself
+just least less let like made make makes many may me might more most much must my myself neither no nor not
+now of off often on once one only or other others our ours ourselves out over own per perhaps rather really
+same see seen several shall she should since so some such than that the their theirs them themselves then
+there therefore these they this those though through thus to too toward towards under until up upon us use
+used uses using very via was we well were what whatever when where whether which while who whom whose why
+will with within without would yet you your yours yourself yourselves
+""".split())
+
+def _count_phrases(windows: np.ndarray, base: int):
+    """First index and count of each distinct phrase row, in the rows' lexicographic order"""
+    if base ** windows.shape[1] <= np.iinfo(np.int64).max:
+        # Each row as one integer in base vocab_size + 1: a fast 1-D unique for all but huge vocabularies
+        keys = windows @ (base ** np.arange(windows.shape[1] - 1, -1, -1, dtype=np.int64))
+        _, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    else:
+        _, first, counts = np.unique(windows, axis=0, return_index=True, return_counts=True)
+    return first, counts
+
+def extract_keywords(text: str, top_k: int = TOP_KEYWORDS) -> List[str]:
+    """Rank keyphrases with RAKE word scores weighted by TF-IDF, computed in one vectorized pass"""
+    tokens = TOKEN_PATTERN.findall((text or '').lower())
+    if not tokens:
+        return []
+    
+    # Integer-encode tokens; vocab order is first appearance
+    vocab_index: Dict[str, int] = {}
+    ids = np.fromiter((vocab_index.setdefault(token, len(vocab_index)) for token in tokens), dtype=np.int64, count=len(tokens))
+    vocab = list(vocab_index)
+    vocab_size = len(vocab)
+    
+    is_delimiter = np.fromiter(
+        (not word[0].isalpha() or len(word) < 3 or word in STOPWORDS for word in vocab),
+        dtype=bool, count=vocab_size
+    )
+    content = ~is_delimiter[ids]
+    if not content.any():
+        return []
+    
+    # Candidate phrases are maximal runs of content words
+    starts = content & np.concatenate(([True], ~content[:-1]))
+    phrase_of_token = np.cumsum(starts) - 1
+    content_positions = np.flatnonzero(content)
+    content_ids = ids[content]
+    content_phrases = phrase_of_token[content]
+    phrase_lengths = np.bincount(content_phrases)
+    
+    # RAKE: word score = degree / frequency
+    frequency = np.bincount(content_ids, minlength=vocab_size).astype(np.float64)
+    degree = np.bincount(content_ids, weights=phrase_lengths[content_phrases], minlength=vocab_size)
+    rake = np.divide(degree, frequency, out=np.zeros(vocab_size), where=frequency > 0)
+    
+    # TF-IDF with token blocks standing in for documents
+    blocks = content_positions // IDF_BLOCK_TOKENS
+    block_count = int(blocks[-1]) + 1
+    pairs = np.unique(blocks * vocab_size + content_ids)
+    document_frequency = np.bincount(pairs % vocab_size, minlength=vocab_size)
+    idf = np.log((1 + block_count) / (1 + document_frequency)) + 1
+    tf = frequency / len(content_ids)
+    word_scores = rake * tf * idf
+    
+    # Candidate keyphrases: every 1..MAX_PHRASE_WORDS-word window inside a run, as a row of word ids + 1
+    # padded with zeros, so identical phrases can be counted without Python loops
+    windows, scores, peak_frequencies, window_starts, window_lengths = [], [], [], [], []
+    for length in range(1, MAX_PHRASE_WORDS + 1):
+        count = len(content_ids) - length + 1
+        if count <= 0:
+            break
+        valid = content_phrases[:count] == content_phrases[length - 1:]
+        window = np.zeros((count, MAX_PHRASE_WORDS), dtype=np.int64)
+        score = np.zeros(count)
+        peak_frequency = np.zeros(count)
+        for offset in range(length):
+            window_ids = content_ids[offset:offset + count]
+            window[:, offset] = window_ids + 1
+            score += word_scores[window_ids]
+            peak_frequency = np.maximum(peak_frequency, frequency[window_ids])
+        windows.append(window[valid])
+        scores.append(score[valid])
+        peak_frequencies.append(peak_frequency[valid])
+        window_starts.append(np.flatnonzero(valid))
+        window_lengths.append(np.full(np.count_nonzero(valid), length))
+    
+    scores = np.concatenate(scores)
+    peak_frequencies = np.concatenate(peak_frequencies)
+    window_starts = np.concatenate(window_starts)
+    window_lengths = np.concatenate(window_lengths)
+    
+    first, counts = _count_phrases(np.concatenate(windows), vocab_size + 1)
+    
+    # Cohesion (phrase count over its most frequent word's count) keeps incidental word sequences
+    # from outranking real collocations
+    cohesion = counts / peak_frequencies[first]
+    ranking = scores[first] * np.log1p(counts) * cohesion
+    
+    # Prefer repeated phrases when there are enough of them
+    if np.count_nonzero(counts > 1) >= top_k:
+        ranking = np.where(counts > 1, ranking, 0.0)
+    
+    keywords: List[str] = []
+    kept_words = []
+    for window in first[np.argsort(-ranking, kind='stable')]:
+        words = content_ids[window_starts[window]:window_starts[window] + window_lengths[window]]
+        phrase = ' '.join(vocab[word] for word in words)
+        
+        # Skip phrases mostly covered by a higher-ranked one
+        word_set = set(words.tolist())
+        if any(2 * len(word_set & kept) > len(word_set) for kept in kept_words):
+            continue
+        keywords.append(phrase)
+        kept_words.append(word_set)
+        if len(keywords) >= top_k:
+            break
+    
+    return keywords
+
+def build_document_brief(summary: Optional[str], keywords: Optional[List[str]],
+                         max_chars: int = BRIEF_MAX_CHARS) -> str:
+    """Compact stand-in for a document in prompts: top keyphrases plus the start of the summary"""
+    parts = []
+    if keywords:
+        parts.append(f"Key topics: {', '.join(keywords)}.")
+    if summary:
+        parts.append(f"Summary: {summary.strip()}")
+    
+    brief = "\n".join(parts)
+    if len(brief) > max_chars:
+        brief = brief[:max_chars - 3].rstrip() + "..."
+    return brief
+
+def brief_for_upload(uploaded_file) -> str:
+    """Prompt brief for an UploadedFile, extracting keywords for rows ingested before they were stored"""
+    if uploaded_file.keywords is None and uploaded_file.extracted_text:
+        uploaded_file.keywords = extract_keywords(uploaded_file.extracted_text)
+    return build_document_brief(uploaded_file.summary, uploaded_file.keywords)
+
+def brief_for_text(text: str) -> str:
+    """Prompt brief for raw document text supplied by a client"""
+    if len(text) <= BRIEF_MAX_CHARS:
+        return text
+    return build_document_brief(text[:BRIEF_MAX_CHARS], extract_keywords(text))
@@ -1,14 +1,28 @@
 import os
-import logging
-import requests
 import time
+import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from urllib.parse import quote
 from dataclasses import dataclass
-from linkedin_service import linkedin_service
-from models import User, AutomationRule, ActionLog, MarketingCampaign, Post
+from linkedin_service import linkedin_service, API_BASE
+from http_client import http_client
+from rate_governor import RateLimitExceeded, rate_limited_result, retry_after_seconds
+from action_log_writer import action_log_writer
+from action_budget import action_budget, DAILY_LIMITS
+from target_filter import actioned_targets, CONNECTION_ACTIONS, FOLLOW_ACTIONS
+from profile_scoring import SUCCESS_TITLES
+from rule_criteria import compile_criteria
+from keyword_matcher import keyword_matcher
+from sqlalchemy import and_, case, func, select
+from models import User, AutomationRule, DailyActionCounter, MarketingCampaign, Post
 from extensions import db
 
+# Seconds automation statistics are served from memory when no action was logged meanwhile
+STATS_TTL = float(os.environ.get('AUTOMATION_STATS_TTL', 30))
+
+STATS_ACTION_TYPES = ('connections', 'follows', 'likes', 'comments')
+
 @dataclass
 class LinkedInProfile:
     """Profile information for LinkedIn automation"""
@@ -21,8 +35,8 @@ class LinkedInProfile:
     last_activity: Optional[datetime] = None
 
 @dataclass
-class AutomationRule:
-    """Automation rule configuration"""
+class AutomationRuleConfig:
+    """Automation rule configuration (named apart from the AutomationRule model it describes)"""
     rule_type: str  # 'auto_connect', 'auto_follow', 'auto_like', 'auto_comment'
     target_criteria: Dict  # criteria for targeting
     action_limit: int  # max actions per day
@@ -31,30 +45,24 @@ class AutomationRule:
 class LinkedInAutomation:
     def __init__(self):
         self.access_token = os.environ.get("LINKEDIN_ACCESS_TOKEN")
-        self.api_base = "https://api.linkedin.com/v2"
+        self.api_base = API_BASE
+        self.http = http_client  # API calls are paced by the shared rate governor
+        self._actor = (None, None)  # (access token, member URN)
+        self._default_user_id = None
+        self._stats_cache = None  # (key, expires_at, statistics)
         self.logger = logging.getLogger(__name__)
-        self.daily_limits = {
-            'connections': 100,  # LinkedIn daily limit
-            'follows': 150,
-            'likes': 300,
-            'comments': 50,
-            'messages': 20
-        }
+        self.daily_limits = DAILY_LIMITS  # Enforced across workers by action_budget reservations
         
+    def _user_id(self) -> int:
+        """Default user's id, looked up once"""
+        if self._default_user_id is None:
+            self._default_user_id = User.get_default_user().id
+        return self._default_user_id
+    
     def get_daily_action_count(self, action_type: str) -> int:
-        """Get today's action count from database"""
+        """Get today's successful action count from the daily counters, including actions still buffered for writing"""
         try:
-            user = User.get_default_user()
-            today = datetime.utcnow().date()
-            
-            count = ActionLog.query.filter(
-                ActionLog.user_id == user.id,
-                ActionLog.action_type == action_type,
-                ActionLog.created_at >= today,
-                ActionLog.status == 'success'
-            ).count()
-            
-            return count
+            return action_log_writer.daily_count(self._user_id(), action_type)
         except Exception as e:
             self.logger.error(f"Error getting daily action count: {str(e)}")
             return 0
@@ -62,85 +70,85 @@ class LinkedInAutomation:
     def log_action(self, action_type: str, target_profile_id: str = None, 
                    target_profile_name: str = None, status: str = 'success', 
                    error_message: str = None, automation_rule_id: int = None) -> None:
-        """Log automation action to database"""
+        """Log automation action; rows are buffered and bulk-inserted by action_log_writer"""
         try:
-            user = User.get_default_user()
-            
-            action_log = ActionLog(
-                user_id=user.id,
-                automation_rule_id=automation_rule_id,
-                action_type=action_type,
+            action_log_writer.record(
+                self._user_id(),
+                action_type,
                 target_profile_id=target_profile_id,
                 target_profile_name=target_profile_name,
                 status=status,
-                error_message=error_message
+                error_message=error_message,
+                automation_rule_id=automation_rule_id
             )
             
-            db.session.add(action_log)
-            db.session.commit()
-            
         except Exception as e:
             self.logger.error(f"Error logging action: {str(e)}")
     
-    def auto_accept_connections(self) -> Dict:
+    def auto_accept_connections(self, job=None) -> Dict:
         """Accept all pending connection requests"""
         try:
             if not self.access_token:
                 return {'success': False, 'message': 'LinkedIn access token required'}
             
-            current_count = self.get_daily_action_count('connections')
-            if current_count >= self.daily_limits['connections']:
+            if action_budget.available(self._user_id(), 'connections') <= 0:
                 return {
                     'success': False,
                     'message': f'Daily connection limit reached ({self.daily_limits["connections"]})'
                 }
             
             # Get pending invitations from LinkedIn API
-            pending_invitations = self._get_pending_invitations()
+            pending_invitations = job.targets(self._get_pending_invitations) if job else self._get_pending_invitations()
             accepted_count = 0
+            throttled = None
             
-            for invitation in pending_invitations:
-                if current_count + accepted_count >= self.daily_limits['connections']:
-                    break
+            for invitation in (job.items(pending_invitations) if job else pending_invitations):
+                # One unit per action, reserved atomically across workers and given back if the action fails
+                with action_budget.reserve(self._user_id(), 'connections') as reservation:
+                    if not reservation.granted:
+                        break
                     
-                result = self._accept_invitation(invitation['id'])
-                if result['success']:
-                    accepted_count += 1
-                    self.log_action(
-                        'connections',
-                        invitation.get('from_profile'),
-                        invitation.get('from_name', 'Unknown'),
-                        'success'
-                    )
-                    time.sleep(2)  # Rate limiting
-                else:
-                    self.log_action(
-                        'connections',
-                        invitation.get('from_profile'),
-                        invitation.get('from_name', 'Unknown'),
-                        'failed',
-                        result.get('error', 'Unknown error')
-                    )
+                    result = self._accept_invitation(invitation['id'])
+                    if result.get('rate_limited'):
+                        # Our own throttling, not a rejection: stop here and retry this invitation later
+                        throttled = result
+                        break
+                    if result['success']:
+                        reservation.use()
+                        accepted_count += 1
+                        self.log_action(
+                            'connections',
+                            invitation.get('from_profile'),
+                            invitation.get('from_name', 'Unknown'),
+                            'success'
+                        )
+                    else:
+                        self.log_action(
+                            'connections',
+                            invitation.get('from_profile'),
+                            invitation.get('from_name', 'Unknown'),
+                            'failed',
+                            result.get('error', 'Unknown error')
+                        )
             
-            return {
+            return self._with_throttle({
                 'success': True,
                 'accepted_count': accepted_count,
                 'message': f'Accepted {accepted_count} connection requests'
-            }
+            }, throttled)
             
         except Exception as e:
             self.logger.error(f"Error in auto_accept_connections: {str(e)}")
             return {'success': False, 'error': str(e)}
     
     def auto_send_connections(self, target_profiles: List[str], message: str = None, 
-                             automation_rule_id: int = None) -> Dict:
+                             automation_rule_id: int = None, job=None) -> Dict:
         """Send connection requests to target profiles"""
         try:
             if not self.access_token:
                 return {'success': False, 'message': 'LinkedIn access token required'}
             
-            current_count = self.get_daily_action_count('connections')
-            if current_count >= self.daily_limits['connections']:
+            if action_budget.available(self._user_id(), 'connections') <= 0:
                 return {
                     'success': False,
                     'message': f'Daily connection limit reached ({self.daily_limits["connections"]})'
@@ -148,33 +156,41 @@ class LinkedInAutomation:
             
             sent_count = 0
             failed_count = 0
+            throttled = None
             
-            for profile_id in target_profiles:
-                if current_count + sent_count >= self.daily_limits['connections']:
-                    break
-                
-                result = self._send_connection_request(profile_id, message)
-                if result['success']:
-                    sent_count += 1
-                    self.log_action(
-                        'connections',
-                        profile_id,
-                        result.get('profile_name', 'Unknown'),
-                        'success',
-                        automation_rule_id=automation_rule_id
-                    )
-                else:
-                    failed_count += 1
-                    self.log_action(
-                        'connections',
-                        profile_id,
-                        result.get('profile_name', 'Unknown'),
-                        'failed',
-                        result.get('error', 'Unknown error'),
-                        automation_rule_id=automation_rule_id
-                    )
-                
-                time.sleep(3)  # Rate limiting
+            # Profiles already sent a request (successfully or not) are dropped before any API call
+            load_targets = lambda: actioned_targets.filter_new(self._user_id(), CONNECTION_ACTIONS, list(target_profiles))
+            target_profiles = job.targets(load_targets) if job else load_targets()
+            
+            for profile_id in (job.items(target_profiles) if job else target_profiles):
+                with action_budget.reserve(self._user_id(), 'connections') as reservation:
+                    if not reservation.granted:
+                        break
+                    
+                    result = self._send_connection_request(profile_id, message)
+                    if result.get('rate_limited'):
+                        throttled = result
+                        break
+                    if result['success']:
+                        reservation.use()
+                        sent_count += 1
+                        self.log_action(
+                            'connections',
+                            profile_id,
+                            result.get('profile_name', 'Unknown'),
+                            'success',
+                            automation_rule_id=automation_rule_id
+                        )
+                    else:
+                        failed_count += 1
+                        self.log_action(
+                            'connections',
+                            profile_id,
+                            result.get('profile_name', 'Unknown'),
+                            'failed',
+                            result.get('error', 'Unknown error'),
+                            automation_rule_id=automation_rule_id
+                        )
             
             # Update automation rule statistics
             if automation_rule_id:
@@ -186,39 +202,51 @@ class LinkedInAutomation:
                     rule.last_run = datetime.utcnow()
                     db.session.commit()
             
-            return {
+            return self._with_throttle({
                 'success': True,
                 'sent_count': sent_count,
                 'failed_count': failed_count,
                 'message': f'Sent {sent_count} connection requests, {failed_count} failed'
-            }
+            }, throttled)
             
         except Exception as e:
             self.logger.error(f"Error in auto_send_connections: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def auto_follow_successful_people(self, criteria: Dict, automation_rule_id: int = None) -> Dict:
+    def auto_follow_successful_people(self, criteria: Dict, automation_rule_id: int = None, job=None) -> Dict:
         """Auto-follow profiles based on success criteria"""
         try:
-            current_count = self.get_daily_action_count('follows')
-            if current_count >= self.daily_limits['follows']:
+            available = action_budget.available(self._user_id(), 'follows')
+            if available <= 0:
                 return {
                     'success': False,
                     'message': f'Daily follow limit reached ({self.daily_limits["follows"]})'
                 }
             
-            # Search for profiles matching criteria
-            target_profiles = self._search_profiles(criteria)
+            def load_targets():
+                # Profiles matching the search, minus those already followed or tried
+                profiles = actioned_targets.filter_new(
+                    self._user_id(), FOLLOW_ACTIONS, self._search_profiles(criteria), key=lambda profile: profile['id']
+                )
+                # Decision makers only, best matches for the remaining criteria first
+                compiled = compile_criteria({'job_titles': list(SUCCESS_TITLES), **criteria})
+                return compiled.rank_profiles(profiles, available, require=('title',))
+            
+            target_profiles = job.targets(load_targets) if job else load_targets()
             followed_count = 0
+            throttled = None
             
-            for profile in target_profiles:
-                if current_count + followed_count >= self.daily_limits['follows']:
-                    break
-                
-                # Check if person meets "successful" criteria
-                if self._is_successful_profile(profile):
+            for profile in (job.items(target_profiles) if job else target_profiles):
+                with action_budget.reserve(self._user_id(), 'follows') as reservation:
+                    if not reservation.granted:
+                        break
+                    
                     result = self._follow_profile(profile['id'])
+                    if result.get('rate_limited'):
+                        throttled = result
+                        break
                     if result['success']:
+                        reservation.use()
                         followed_count += 1
                         self.log_action(
                             'follows',
@@ -227,7 +255,6 @@ class LinkedInAutomation:
                             'success',
                             automation_rule_id=automation_rule_id
                         )
-                        time.sleep(2)
                     else:
                         self.log_action(
                             'follows',
@@ -247,41 +274,47 @@ class LinkedInAutomation:
                     rule.last_run = datetime.utcnow()
                     db.session.commit()
             
-            return {
+            return self._with_throttle({
                 'success': True,
                 'followed_count': followed_count,
                 'message': f'Followed {followed_count} successful profiles'
-            }
+            }, throttled)
             
         except Exception as e:
             self.logger.error(f"Error in auto_follow_successful_people: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def auto_engage_with_posts(self, keywords: List[str], automation_rule_id: int = None) -> Dict:
+    def auto_engage_with_posts(self, keywords: List[str], automation_rule_id: int = None, job=None) -> Dict:
         """Auto-like and comment on posts with specific keywords"""
         try:
-            likes_count = self.get_daily_action_count('likes')
-            comments_count = self.get_daily_action_count('comments')
-            
-            if likes_count >= self.daily_limits['likes']:
+            if action_budget.available(self._user_id(), 'likes') <= 0:
                 return {
                     'success': False,
                     'message': f'Daily like limit reached ({self.daily_limits["likes"]})'
                 }
             
             engaged_posts = 0
-            
-            # Search for posts with keywords
-            relevant_posts = self._search_posts(keywords)
-            
-            for post in relevant_posts:
-                if likes_count >= self.daily_limits['likes']:
-                    break
-                
-                # Like the post
-                like_result = self._like_post(post['id'])
-                if like_result['success']:
-                    likes_count += 1
+            throttled = None
+            commenting = True  # off once the comment budget is spent or the comment endpoint is throttled
+            
+            # Search for posts with keywords; keep those that mention them, most keywords matched first
+            matcher = keyword_matcher(keywords)
+            load_targets = lambda: matcher.rank(self._search_posts(keywords)) if matcher.keywords else self._search_posts(keywords)
+            relevant_posts = job.targets(load_targets) if job else load_targets()
+            
+            for post in (job.items(relevant_posts) if job else relevant_posts):
+                with action_budget.reserve(self._user_id(), 'likes') as like_reservation:
+                    if not like_reservation.granted:
+                        break
+                    
+                    # Like the post
+                    like_result = self._like_post(post['id'])
+                    if like_result.get('rate_limited'):
+                        throttled = like_result
+                        break
+                    if not like_result['success']:
+                        continue
+                    like_reservation.use()
                     engaged_posts += 1
                     
                     self.log_action(
@@ -291,23 +324,31 @@ class LinkedInAutomation:
                         'success',
                         automation_rule_id=automation_rule_id
                     )
-                    
-                    # Add intelligent comment if appropriate
-                    if comments_count < self.daily_limits['comments']:
-                        comment = self._generate_intelligent_comment(post['content'])
-                        if comment:
-                            comment_result = self._comment_on_post(post['id'], comment)
-                            if comment_result['success']:
-                                comments_count += 1
-                                self.log_action(
-                                    'comments',
-                                    post['id'],
-                                    f"Post by {post.get('author', 'Unknown')}",
-                                    'success',
-                                    automation_rule_id=automation_rule_id
-                                )
                 
-                time.sleep(3)
+                # Add intelligent comment if appropriate; the budget is reserved before the comment is generated
+                if not commenting:
+                    continue
+                with action_budget.reserve(self._user_id(), 'comments') as comment_reservation:
+                    if not comment_reservation.granted:
+                        commenting = False
+                        continue
+                    
+                    comment = self._generate_intelligent_comment(post['content'])
+                    if not comment:
+                        continue
+                    comment_result = self._comment_on_post(post['id'], comment)
+                    if comment_result.get('rate_limited'):
+                        commenting = False
+                        continue
+                    if comment_result['success']:
+                        comment_reservation.use()
+                        self.log_action(
+                            'comments',
+                            post['id'],
+                            f"Post by {post.get('author', 'Unknown')}",
+                            'success',
+                            automation_rule_id=automation_rule_id
+                        )
             
             # Update automation rule statistics
             if automation_rule_id:
@@ -318,24 +359,28 @@ class LinkedInAutomation:
                     rule.last_run = datetime.utcnow()
                     db.session.commit()
             
-            return {
+            return self._with_throttle({
                 'success': True,
                 'engaged_posts': engaged_posts,
                 'message': f'Engaged with {engaged_posts} relevant posts'
-            }
+            }, throttled)
             
         except Exception as e:
             self.logger.error(f"Error in auto_engage_with_posts: {str(e)}")
             return {'success': False, 'error': str(e)}
     
     def schedule_marketing_campaign(self, pdf_content: str, product_info: Dict, 
-                                   campaign_id: int = None) -> Dict:
+                                   campaign_id: int = None, keywords: Optional[List[str]] = None) -> Dict:
         """Create multiple marketing posts from PDF content"""
         try:
             from gemini_service import generate_linkedin_post
+            from keyword_service import brief_for_text
+            
+            # Keep prompts small even if a caller passes a whole document
+            pdf_content = brief_for_text(pdf_content or '')
             
             # Extract marketing angles from PDF
-            marketing_angles = self._extract_marketing_angles(pdf_content, product_info)
+            marketing_angles = self._extract_marketing_angles(pdf_content, product_info, keywords)
             
             scheduled_posts = []
             base_time = datetime.utcnow()
@@ -348,6 +393,8 @@ class LinkedInAutomation:
                     f"focusing on: {angle}. Include benefits and call-to-action. "
                     f"Make it engaging and professional for LinkedIn."
                 )
+                if pdf_content:
+                    post_prompt += f"\n\nSource material:\n{pdf_content}"
                 
                 post_content = generate_linkedin_post(post_prompt)
                 
@@ -393,73 +440,121 @@ class LinkedInAutomation:
             return {'success': False, 'error': str(e)}
     
     def get_automation_statistics(self) -> Dict:
-        """Get real automation statistics from database"""
+        """Today's and this week's successful actions and active rules, from one query over the daily counters"""
         try:
-            user = User.get_default_user()
-            today = datetime.utcnow().date()
-            week_ago = datetime.utcnow() - timedelta(days=7)
-            
-            # Today's statistics
-            today_stats = {}
-            for action_type in ['connections', 'follows', 'likes', 'comments']:
-                count = ActionLog.query.filter(
-                    ActionLog.user_id == user.id,
-                    ActionLog.action_type == action_type,
-                    ActionLog.created_at >= today,
-                    ActionLog.status == 'success'
-                ).count()
-                today_stats[action_type] = count
-            
-            # Weekly statistics
-            weekly_stats = {}
-            for action_type in ['connections', 'follows', 'likes', 'comments']:
-                count = ActionLog.query.filter(
-                    ActionLog.user_id == user.id,
-                    ActionLog.action_type == action_type,
-                    ActionLog.created_at >= week_ago,
-                    ActionLog.status == 'success'
-                ).count()
-                weekly_stats[action_type] = count
-            
-            # Active automation rules
-            active_rules = AutomationRule.query.filter_by(
-                user_id=user.id,
-                is_active=True
-            ).count()
+            user_id = self._user_id()
+            key = (user_id, action_log_writer.version, datetime.utcnow().date())
+            cached = self._stats_cache
+            if cached and cached[0] == key and cached[1] > time.monotonic():
+                return cached[2]
+            
+            today = key[2]
+            week_start = today - timedelta(days=6)
+            counter = DailyActionCounter
+            
+            # One row: SUM(CASE ...) per action type and period, plus the active rule count as a scalar subquery
+            columns = []
+            for action_type in STATS_ACTION_TYPES:
+                is_type = counter.action_type == action_type
+                columns.append(func.sum(case((and_(is_type, counter.date == today), counter.count), else_=0)))
+                columns.append(func.sum(case((is_type, counter.count), else_=0)))
+            active_rules = select(func.count(AutomationRule.id)).where(
+                AutomationRule.user_id == user_id,
+                AutomationRule.is_active.is_(True)
+            ).scalar_subquery()
+            
+            row = db.session.execute(
+                select(*columns, active_rules).where(
+                    counter.user_id == user_id,
+                    counter.status == 'success',
+                    counter.date >= week_start
+                )
+            ).one()
             
-            return {
+            today_start = datetime.combine(today, datetime.min.time())
+            week_start = datetime.combine(week_start, datetime.min.time())
+            today_stats, weekly_stats = {}, {}
+            for index, action_type in enumerate(STATS_ACTION_TYPES):
+                today_stats[action_type] = (row[2 * index] or 0) + action_log_writer.pending_count(user_id, action_type, today_start)
+                weekly_stats[action_type] = (row[2 * index + 1] or 0) + action_log_writer.pending_count(user_id, action_type, week_start)
+            
+            statistics = {
                 'success': True,
                 'today': today_stats,
                 'weekly': weekly_stats,
-                'active_rules': active_rules,
+                'active_rules': row[-1] or 0,
                 'daily_limits': self.daily_limits
             }
+            self._stats_cache = (key, time.monotonic() + STATS_TTL, statistics)
+            return statistics
             
         except Exception as e:
             self.logger.error(f"Error getting automation statistics: {str(e)}")
             return {'success': False, 'error': str(e)}
     
+    def invalidate_statistics(self):
+        """Drop cached statistics, e.g. after automation rules change"""
+        self._stats_cache = None
+    
+    def _with_throttle(self, result: Dict, throttled: Optional[Dict]) -> Dict:
+        """Mark a run that stopped early on a rate limit, so a job pauses and resumes from the throttled target"""
+        if throttled:
+            result.update(rate_limited=True, retry_after=throttled.get('retry_after'))
+            result['message'] += f" (paused by rate limit: {throttled.get('error')})"
+        return result
+    
+    def _api_headers(self) -> Dict:
+        return {
+            'Authorization': f'Bearer {self.access_token}',
+            'Content-Type': 'application/json',
+            'X-Restli-Protocol-Version': '2.0.0'
+        }
+    
+    def _api_result(self, response, message: str) -> Dict:
+        """Standard result dict for a write call against the LinkedIn API"""
+        if response.status_code in (200, 201):
+            return {'success': True, 'message': message}
+        
+        error_data = response.json() if response.content else {}
+        error = error_data.get('message', f'LinkedIn API error: {response.status_code}')
+        if response.status_code == 429:
+            return rate_limited_result(retry_after_seconds(response.headers, time.time()), error)
+        return {
+            'success': False,
+            'status_code': response.status_code,
+            'error': error
+        }
+    
+    def _actor_urn(self) -> Optional[str]:
+        """Member URN of the automation token, looked up once per token; None if the lookup fails"""
+        if self._actor[0] != self.access_token:
+            response = self.http.get(
+                f"{self.api_base}/people/~:(id)",
+                headers=self._api_headers(),
+                endpoint='GET /v2/people/~'
+            )
+            if response.status_code != 200:
+                return None
+            self._actor = (self.access_token, f"urn:li:person:{response.json()['id']}")
+        return self._actor[1]
+    
     def _get_pending_invitations(self) -> List[Dict]:
         """Get pending connection invitations from LinkedIn API"""
         try:
             if not self.access_token:
                 return []
             
-            headers = {
-                'Authorization': f'Bearer {self.access_token}',
-                'Content-Type': 'application/json'
-            }
+            response = self.http.get(
+                f"{self.api_base}/invitations",
+                params={'q': 'invitee', 'count': 20},
+                headers=self._api_headers(),
+                endpoint='GET /v2/invitations'
+            )
+            if response.status_code != 200:
+                self.logger.warning(f"Pending invitations request failed: {response.status_code}")
+                return []
             
-            # This is a placeholder - LinkedIn API for invitations requires special permissions
-            # For now, return mock data for testing
-            return [
-                {
-                    'id': f'inv_{int(time.time())}',
-                    'from_profile': 'profile_123',
-                    'from_name': 'John Doe',
-                    'message': 'Hello! Let\'s connect'
-                }
-            ]
+            return response.json().get('elements', [])
             
         except Exception as e:
             self.logger.error(f"Error getting pending invitations: {str(e)}")
@@ -468,10 +563,20 @@ class LinkedInAutomation:
     def _accept_invitation(self, invitation_id: str) -> Dict:
         """Accept a connection invitation"""
         try:
-            # This would be a real LinkedIn API call
             self.logger.info(f"Accepting invitation: {invitation_id}")
-            return {'success': True, 'message': 'Invitation accepted'}
+            if not self.access_token:
+                return {'success': True, 'message': 'Invitation accepted'}
             
+            response = self.http.post(
+                f"{self.api_base}/invitations/{invitation_id}",
+                params={'action': 'accept'},
+                headers=self._api_headers(),
+                endpoint='POST /v2/invitations/{id}'
+            )
+            return self._api_result(response, 'Invitation accepted')
+            
+        except RateLimitExceeded as e:
+            return rate_limited_result(e.wait, str(e))
         except Exception as e:
             self.logger.error(f"Error accepting invitation: {str(e)}")
             return {'success': False, 'error': str(e)}
@@ -479,14 +584,26 @@ class LinkedInAutomation:
     def _send_connection_request(self, profile_id: str, message: str = None) -> Dict:
         """Send connection request to profile"""
         try:
-            # This would be a real LinkedIn API call
             self.logger.info(f"Sending connection request to: {profile_id}")
-            return {
-                'success': True,
-                'message': 'Connection request sent',
-                'profile_name': f'Profile {profile_id}'
-            }
+            if not self.access_token:
+                return {'success': True, 'message': 'Connection request sent', 'profile_name': f'Profile {profile_id}'}
+            
+            invitation = {'invitee': profile_id if profile_id.startswith('urn:') else f"urn:li:person:{profile_id}"}
+            if message:
+                invitation['message'] = message[:300]  # LinkedIn caps invitation notes at 300 characters
+            
+            response = self.http.post(
+                f"{self.api_base}/invitations",
+                headers=self._api_headers(),
+                json=invitation,
+                endpoint='POST /v2/invitations'
+            )
+            result = self._api_result(response, 'Connection request sent')
+            result['profile_name'] = f'Profile {profile_id}'
+            return result
             
+        except RateLimitExceeded as e:
+            return rate_limited_result(e.wait, str(e))
         except Exception as e:
             self.logger.error(f"Error sending connection request: {str(e)}")
             return {'success': False, 'error': str(e)}
@@ -494,44 +611,60 @@ class LinkedInAutomation:
     def _search_profiles(self, criteria: Dict) -> List[Dict]:
         """Search for profiles based on criteria"""
         try:
-            # This would use LinkedIn Search API
-            # For now, return mock data
-            return [
-                {
-                    'id': 'prof_1',
-                    'name': 'John Doe',
-                    'headline': 'CEO at TechCorp',
-                    'industry': 'Technology',
-                    'location': 'San Francisco'
-                },
-                {
-                    'id': 'prof_2',
-                    'name': 'Jane Smith',
-                    'headline': 'Founder of StartupXYZ',
-                    'industry': 'Software',
-                    'location': 'New York'
-                }
-            ]
+            if not self.access_token:
+                # Demo mode: sample profiles
+                return [
+                    {
+                        'id': 'prof_1',
+                        'name': 'John Doe',
+                        'headline': 'CEO at TechCorp',
+                        'industry': 'Technology',
+                        'location': 'San Francisco'
+                    },
+                    {
+                        'id': 'prof_2',
+                        'name': 'Jane Smith',
+                        'headline': 'Founder of StartupXYZ',
+                        'industry': 'Software',
+                        'location': 'New York'
+                    }
+                ]
+            
+            params = dict(compile_criteria(criteria).search_params, count=criteria.get('count', 25))
+            
+            response = self.http.get(
+                f"{self.api_base}/search/people",
+                params=params,
+                headers=self._api_headers(),
+                endpoint='GET /v2/search/people'
+            )
+            if response.status_code != 200:
+                self.logger.warning(f"Profile search failed: {response.status_code}")
+                return []
+            
+            return response.json().get('elements', [])
             
         except Exception as e:
             self.logger.error(f"Error searching profiles: {str(e)}")
             return []
     
-    def _is_successful_profile(self, profile: Dict) -> bool:
-        """Determine if profile meets success criteria"""
-        success_indicators = [
-            'CEO', 'Founder', 'CTO', 'VP', 'Director', 'Partner',
-            'President', 'Owner', 'Chief', 'Head of', 'Lead'
-        ]
-        headline = profile.get('headline', '').lower()
-        return any(indicator.lower() in headline for indicator in success_indicators)
-    
     def _follow_profile(self, profile_id: str) -> Dict:
         """Follow a profile"""
         try:
             self.logger.info(f"Following profile: {profile_id}")
-            return {'success': True, 'message': 'Profile followed'}
+            if not self.access_token:
+                return {'success': True, 'message': 'Profile followed'}
+            
+            response = self.http.post(
+                f"{self.api_base}/follows",
+                headers=self._api_headers(),
+                json={'followee': profile_id if profile_id.startswith('urn:') else f"urn:li:person:{profile_id}"},
+                endpoint='POST /v2/follows'
+            )
+            return self._api_result(response, 'Profile followed')
             
+        except RateLimitExceeded as e:
+            return rate_limited_result(e.wait, str(e))
         except Exception as e:
             self.logger.error(f"Error following profile: {str(e)}")
             return {'success': False, 'error': str(e)}
@@ -539,20 +672,32 @@ class LinkedInAutomation:
     def _search_posts(self, keywords: List[str]) -> List[Dict]:
         """Search for posts containing keywords"""
         try:
-            # This would use LinkedIn Search API
-            # For now, return mock data
-            return [
-                {
-                    'id': 'post_1',
-                    'content': 'AI is transforming business operations...',
-                    'author': 'Tech Leader'
-                },
-                {
-                    'id': 'post_2',
-                    'content': 'Machine learning in marketing is revolutionary...',
-                    'author': 'Marketing Expert'
-                }
-            ]
+            if not self.access_token:
+                # Demo mode: sample posts
+                return [
+                    {
+                        'id': 'post_1',
+                        'content': 'AI is transforming business operations...',
+                        'author': 'Tech Leader'
+                    },
+                    {
+                        'id': 'post_2',
+                        'content': 'Machine learning in marketing is revolutionary...',
+                        'author': 'Marketing Expert'
+                    }
+                ]
+            
+            response = self.http.get(
+                f"{self.api_base}/search/posts",
+                params={'keywords': ','.join(keywords), 'count': 25},
+                headers=self._api_headers(),
+                endpoint='GET /v2/search/posts'
+            )
+            if response.status_code != 200:
+                self.logger.warning(f"Post search failed: {response.status_code}")
+                return []
+            
+            return response.json().get('elements', [])
             
         except Exception as e:
             self.logger.error(f"Error searching posts: {str(e)}")
@@ -562,8 +707,24 @@ class LinkedInAutomation:
         """Like a post"""
         try:
             self.logger.info(f"Liking post: {post_id}")
-            return {'success': True, 'message': 'Post liked'}
+            if not self.access_token:
+                return {'success': True, 'message': 'Post liked'}
+            
+            actor_urn = self._actor_urn()
+            if not actor_urn:
+                return {'success': False, 'error': 'Could not resolve the LinkedIn member for the access token'}
+            
+            post_urn = linkedin_service.post_urn(post_id)
+            response = self.http.post(
+                f"{self.api_base}/socialActions/{quote(post_urn, safe='')}/likes",
+                headers=self._api_headers(),
+                json={'actor': actor_urn, 'object': post_urn},
+                endpoint='POST /v2/socialActions/{id}/likes'
+            )
+            return self._api_result(response, 'Post liked')
             
+        except RateLimitExceeded as e:
+            return rate_limited_result(e.wait, str(e))
         except Exception as e:
             self.logger.error(f"Error liking post: {str(e)}")
             return {'success': False, 'error': str(e)}
@@ -572,8 +733,24 @@ class LinkedInAutomation:
         """Comment on a post"""
         try:
             self.logger.info(f"Commenting on post {post_id}: {comment}")
-            return {'success': True, 'message': 'Comment added'}
+            if not self.access_token:
+                return {'success': True, 'message': 'Comment added'}
+            
+            actor_urn = self._actor_urn()
+            if not actor_urn:
+                return {'success': False, 'error': 'Could not resolve the LinkedIn member for the access token'}
+            
+            post_urn = linkedin_service.post_urn(post_id)
+            response = self.http.post(
+                f"{self.api_base}/socialActions/{quote(post_urn, safe='')}/comments",
+                headers=self._api_headers(),
+                json={'actor': actor_urn, 'object': post_urn, 'message': {'text': comment}},
+                endpoint='POST /v2/socialActions/{id}/comments'
+            )
+            return self._api_result(response, 'Comment added')
             
+        except RateLimitExceeded as e:
+            return rate_limited_result(e.wait, str(e))
         except Exception as e:
             self.logger.error(f"Error commenting on post: {str(e)}")
             return {'success': False, 'error': str(e)}
@@ -600,7 +777,8 @@ class LinkedInAutomation:
             self.logger.error(f"Error generating comment: {str(e)}")
             return None
     
-    def _extract_marketing_angles(self, pdf_content: str, product_info: Dict) -> List[str]:
+    def _extract_marketing_angles(self, pdf_content: str, product_info: Dict,
+                                  keywords: Optional[List[str]] = None) -> List[str]:
         """Extract different marketing angles from PDF content"""
         base_angles = [
             "Product benefits and unique features",
@@ -611,12 +789,20 @@ class LinkedInAutomation:
             "Use cases and practical applications"
         ]
         
-        # Could use AI to extract more specific angles from PDF content
-        # For now, customize based on product info
+        # Lead with the document's own top keyphrases
+        if keywords is None and pdf_content:
+            from keyword_service import extract_keywords
+            keywords = extract_keywords(pdf_content, top_k=2)
+        document_angles = [
+            f"How {product_info.get('name', 'our product')} delivers on {keyword}"
+            for keyword in (keywords or [])[:2]
+        ]
+        
+        # Customize based on product info
         if product_info.get('industry'):
             base_angles.append(f"{product_info['industry']} industry applications")
         
-        return base_angles[:4]  # Limit to 4 posts initially
+        return (document_angles + base_angles)[:4]  # Limit to 4 posts initially
 
 # Global automation instance
 linkedin_automation = LinkedInAutomation()
\ No newline at end of file
@@ -1,9 +1,39 @@
 import os
+import re
+import time
+import hashlib
+import asyncio
 import logging
-from datetime import datetime
-import requests
+import threading
+import weakref
+import mimetypes
+from datetime import datetime, timedelta
 import json
-from urllib.parse import urlencode
+from typing import Dict, List, Optional
+from urllib.parse import urlencode, quote, unquote
+from werkzeug.security import safe_join
+from http_client import http_client, async_http_client
+from rate_governor import RateLimitExceeded, rate_limited_result, retry_after_seconds
+from asset_service import file_content_hash
+
+# Seconds a connection status is served from memory before it is refreshed
+STATUS_TTL = float(os.environ.get('LINKEDIN_STATUS_TTL', 60))
+
+# Seconds an expired status may still be served while a background refresh runs
+STATUS_STALE_TTL = float(os.environ.get('LINKEDIN_STATUS_STALE_TTL', 600))
+
+# Seconds a disconnected or failed status is cached; it is never served stale, so a fixed token shows up quickly
+STATUS_ERROR_TTL = float(os.environ.get('LINKEDIN_STATUS_ERROR_TTL', 5))
+
+# API roots; point these at linkedin_simulator.py for local benchmarks and integration tests
+API_BASE = os.environ.get('LINKEDIN_API_BASE', 'https://api.linkedin.com/v2').rstrip('/')
+OAUTH_BASE = os.environ.get('LINKEDIN_OAUTH_BASE', 'https://www.linkedin.com/oauth/v2').rstrip('/')
+
+# Images attached to posts are uploaded from here when referenced as /static/uploads/<name>
+LOCAL_IMAGE_PATTERN = re.compile(r'^(?:https?://[^/]+)?/static/uploads/([^/?#]+)')
+
+IMAGE_RECIPE = 'urn:li:digitalmediaRecipe:feedshare-image'
+UPLOAD_MECHANISM = 'com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest'
 
 class LinkedInService:
     def __init__(self):
@@ -11,8 +41,117 @@ class LinkedInService:
         self.client_secret = os.environ.get("LINKEDIN_CLIENT_SECRET")
         self.redirect_uri = os.environ.get("LINKEDIN_REDIRECT_URI", "http://localhost:5000/auth/linkedin/callback")
         self.access_token = os.environ.get("LINKEDIN_ACCESS_TOKEN")
-        self.api_base = "https://api.linkedin.com/v2"
+        self.api_base = API_BASE
+        self.oauth_base = OAUTH_BASE
+        self.http = http_client
+        self.async_http = async_http_client
         self.logger = logging.getLogger(__name__)
+        self._author_urns = {}  # token fingerprint -> author URN
+        self._author_urn_lock = threading.Lock()
+        self._author_urn_lookups = weakref.WeakKeyDictionary()  # event loop -> in-flight profile request
+        self._status_cache = {}  # token fingerprint -> (status, fetched_at)
+        self._status_refreshing = set()
+        self._status_lock = threading.Lock()
+    
+    @staticmethod
+    def _token_fingerprint(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+    
+    def _remember_author_urn(self, member_id: str) -> str:
+        """Cache the author URN for the current token in memory and on the user row"""
+        author_urn = f"urn:li:person:{member_id}"
+        fingerprint = self._token_fingerprint(self.access_token)
+        with self._author_urn_lock:
+            self._author_urns = {fingerprint: author_urn}  # Only the current token's URN is worth keeping
+        
+        from models import User
+        from extensions import db
+        user = User.get_default_user()
+        if user.linkedin_member_urn != author_urn or user.linkedin_urn_token_hash != fingerprint:
+            user.linkedin_member_urn = author_urn
+            user.linkedin_urn_token_hash = fingerprint
+            db.session.commit()
+        
+        return author_urn
+    
+    def _cached_author_urn(self):
+        """Author URN for the current token from memory or the user row, without calling the API"""
+        fingerprint = self._token_fingerprint(self.access_token)
+        author_urn = self._author_urns.get(fingerprint)
+        if author_urn:
+            return author_urn
+        
+        from models import User
+        user = User.get_default_user()
+        if user.linkedin_member_urn and user.linkedin_urn_token_hash == fingerprint:
+            with self._author_urn_lock:
+                self._author_urns = {fingerprint: user.linkedin_member_urn}
+            return user.linkedin_member_urn
+        
+        return None
+    
+    def _author_urn_result(self, profile_response) -> dict:
+        """Turn a /people/~:(id) response into get_author_urn's result"""
+        if profile_response.status_code != 200:
+            if profile_response.status_code == 401:
+                self.invalidate_author_urn()
+            return {'success': False, 'status_code': profile_response.status_code}
+        
+        return {'success': True, 'author_urn': self._remember_author_urn(profile_response.json()['id'])}
+    
+    def get_author_urn(self) -> dict:
+        """Author URN for the current token: memory, then the user row, then one /people/~ call"""
+        author_urn = self._cached_author_urn()
+        if author_urn:
+            return {'success': True, 'author_urn': author_urn}
+        
+        profile_response = self.http.get(
+            f"{self.api_base}/people/~:(id)",
+            headers=self._auth_headers(),
+            endpoint='GET /v2/people/~'
+        )
+        return self._author_urn_result(profile_response)
+    
+    async def get_author_urn_async(self) -> dict:
+        """Async variant of get_author_urn"""
+        author_urn = self._cached_author_urn()
+        if author_urn:
+            return {'success': True, 'author_urn': author_urn}
+        
+        # Single flight: concurrent publishes on a cold cache share one profile request
+        loop = asyncio.get_running_loop()
+        lookup = self._author_urn_lookups.get(loop)
+        if lookup is None or lookup.done():
+            lookup = self._author_urn_lookups[loop] = loop.create_task(self.async_http.get(
+                f"{self.api_base}/people/~:(id)",
+                headers=self._auth_headers(),
+                endpoint='GET /v2/people/~'
+            ))
+        
+        profile_response = await asyncio.shield(lookup)
+        return self._author_urn_result(profile_response)
+    
+    def _auth_headers(self) -> dict:
+        return {
+            'Authorization': f'Bearer {self.access_token}',
+            'Content-Type': 'application/json',
+            'X-Restli-Protocol-Version': '2.0.0'
+        }
+    
+    def invalidate_author_urn(self):
+        """Forget the cached author URN (token changed or was rejected)"""
+        with self._author_urn_lock:
+            self._author_urns = {}
+        with self._status_lock:
+            self._status_cache = {}
+        
+        from models import User
+        from extensions import db
+        user = User.get_default_user()
+        if user.linkedin_member_urn or user.linkedin_urn_token_hash:
+            user.linkedin_member_urn = None
+            user.linkedin_urn_token_hash = None
+            db.session.commit()
         
     def get_authorization_url(self):
         """Generate LinkedIn OAuth authorization URL"""
@@ -23,13 +162,13 @@ class LinkedInService:
             'scope': 'openid profile email w_member_social'
         }
         
-        auth_url = f"https://www.linkedin.com/oauth/v2/authorization?{urlencode(params)}"
+        auth_url = f"{self.oauth_base}/authorization?{urlencode(params)}"
         return auth_url
     
     def exchange_code_for_token(self, code: str) -> dict:
         """Exchange authorization code for access token"""
         try:
-            token_url = "https://www.linkedin.com/oauth/v2/accessToken"
+            token_url = f"{self.oauth_base}/accessToken"
             
             data = {
                 'grant_type': 'authorization_code',
@@ -39,7 +178,7 @@ class LinkedInService:
                 'client_secret': self.client_secret
             }
             
-            response = requests.post(token_url, data=data)
+            response = self.http.post(token_url, data=data, endpoint='POST /oauth/v2/accessToken')
             
             if response.status_code == 200:
                 token_data = response.json()
@@ -50,7 +189,9 @@ class LinkedInService:
                 from extensions import db
                 user = User.get_default_user()
                 user.linkedin_access_token = self.access_token
-                user.linkedin_token_expires_at = datetime.utcnow() + datetime.timedelta(seconds=token_data.get('expires_in', 3600))
+                user.linkedin_member_urn = None
+                user.linkedin_urn_token_hash = None
+                user.linkedin_token_expires_at = datetime.utcnow() + timedelta(seconds=token_data.get('expires_in', 3600))
                 db.session.commit()
                 
                 return {
@@ -86,18 +227,23 @@ class LinkedInService:
             }
             
             # Get basic profile
-            profile_response = requests.get(
+            profile_response = self.http.get(
                 f"{self.api_base}/people/~:(id,firstName,lastName,headline,summary,industry,location,pictureUrls::(original),publicProfileUrl)",
-                headers=headers
+                headers=headers,
+                endpoint='GET /v2/people/~'
             )
             
             if profile_response.status_code != 200:
+                if profile_response.status_code == 401:
+                    self.invalidate_author_urn()
                 return {
                     'success': False,
                     'error': 'Failed to fetch profile'
                 }
             
             profile_data = profile_response.json()
+            self._remember_author_urn(profile_data['id'])
+            payload_hash = hashlib.sha256(json.dumps(profile_data, sort_keys=True).encode()).hexdigest()
             
             # Store/update profile in database
             from models import LinkedInProfile, User
@@ -106,6 +252,13 @@ class LinkedInService:
             user = User.get_default_user()
             linkedin_profile = LinkedInProfile.query.filter_by(user_id=user.id).first()
             
+            # Nothing changed since the last sync: skip the write
+            if linkedin_profile and linkedin_profile.payload_hash == payload_hash:
+                return {
+                    'success': True,
+                    'profile': linkedin_profile.to_dict()
+                }
+            
             if not linkedin_profile:
                 linkedin_profile = LinkedInProfile(
                     user_id=user.id,
@@ -121,6 +274,7 @@ class LinkedInService:
             linkedin_profile.location = profile_data.get('location', {}).get('name', '')
             linkedin_profile.public_profile_url = profile_data.get('publicProfileUrl', '')
             linkedin_profile.last_sync = datetime.utcnow()
+            linkedin_profile.payload_hash = payload_hash
             
             if 'pictureUrls' in profile_data:
                 linkedin_profile.profile_picture_url = profile_data['pictureUrls']['values'][0] if profile_data['pictureUrls']['values'] else None
@@ -139,6 +293,174 @@ class LinkedInService:
                 'error': str(e)
             }
     
+    def _local_image_path(self, image_url: str) -> Optional[str]:
+        """Filesystem path of an image served from the upload folder"""
+        from flask import current_app, has_app_context
+        
+        match = LOCAL_IMAGE_PATTERN.match(image_url or '')
+        if not match:
+            return None
+        
+        upload_folder = current_app.config['UPLOAD_FOLDER'] if has_app_context() else 'static/uploads'
+        path = safe_join(os.path.abspath(upload_folder), unquote(match.group(1)))
+        return path if path and os.path.isfile(path) else None
+    
+    def _cached_media_asset(self, owner_urn: str, content_hash: str) -> Optional[str]:
+        from models import LinkedInMediaAsset
+        
+        asset = LinkedInMediaAsset.query.filter_by(owner_urn=owner_urn, content_hash=content_hash).first()
+        return asset.asset_urn if asset else None
+    
+    def _remember_media_asset(self, owner_urn: str, content_hash: str, asset_urn: str, file_size: int):
+        from models import LinkedInMediaAsset
+        from extensions import db
+        from sqlalchemy.exc import IntegrityError
+        
+        try:
+            # Savepoint: a concurrent upload of the same image may have stored it first
+            with db.session.begin_nested():
+                db.session.add(LinkedInMediaAsset(
+                    owner_urn=owner_urn,
+                    content_hash=content_hash,
+                    asset_urn=asset_urn,
+                    file_size=file_size
+                ))
+            db.session.commit()
+        except IntegrityError:
+            self.logger.debug(f"Media asset for {content_hash[:12]} already stored")
+    
+    def _upload_image(self, owner_urn: str, path: str) -> str:
+        """Register an image upload and stream the file to LinkedIn; returns the asset URN"""
+        register_response = self.http.post(
+            f"{self.api_base}/assets",
+            params={'action': 'registerUpload'},
+            headers=self._auth_headers(),
+            json={
+                'registerUploadRequest': {
+                    'recipes': [IMAGE_RECIPE],
+                    'owner': owner_urn,
+                    'serviceRelationships': [
+                        {'relationshipType': 'OWNER', 'identifier': 'urn:li:userGeneratedContent'}
+                    ]
+                }
+            },
+            endpoint='POST /v2/assets'
+        )
+        if register_response.status_code not in (200, 201):
+            if register_response.status_code == 401:
+                self.invalidate_author_urn()
+            raise RuntimeError(f"Image upload registration failed: {register_response.status_code}")
+        
+        registration = register_response.json()['value']
+        mechanism = registration['uploadMechanism'][UPLOAD_MECHANISM]
+        headers = {
+            'Authorization': f'Bearer {self.access_token}',
+            'Content-Type': mimetypes.guess_type(path)[0] or 'application/octet-stream',
+            'Content-Length': str(os.path.getsize(path)),
+            **mechanism.get('headers', {})
+        }
+        
+        # Passing the open file streams it in blocks; it is rewound if the PUT is retried
+        with open(path, 'rb') as image_file:
+            upload_response = self.http.request(
+                'PUT',
+                mechanism['uploadUrl'],
+                data=image_file,
+                headers=headers,
+                endpoint='PUT /mediaUpload'
+            )
+        if upload_response.status_code not in (200, 201):
+            raise RuntimeError(f"Image upload failed: {upload_response.status_code}")
+        
+        return registration['asset']
+    
+    def get_image_asset(self, author_urn: str, image_url: str) -> dict:
+        """Asset URN for a post image, uploading it unless the same file was uploaded before"""
+        path = self._local_image_path(image_url)
+        if not path:
+            self.logger.warning(f"Image {image_url} is not in the upload folder; posting without it")
+            return {'success': True, 'asset_urn': None}
+        
+        content_hash = file_content_hash(path)
+        asset_urn = self._cached_media_asset(author_urn, content_hash)
+        if not asset_urn:
+            asset_urn = self._upload_image(author_urn, path)
+            self._remember_media_asset(author_urn, content_hash, asset_urn, os.path.getsize(path))
+        return {'success': True, 'asset_urn': asset_urn}
+    
+    async def get_image_asset_async(self, author_urn: str, image_url: str) -> dict:
+        """get_image_asset with hashing and the upload run off the event loop; database access stays on it"""
+        path = self._local_image_path(image_url)
+        if not path:
+            self.logger.warning(f"Image {image_url} is not in the upload folder; posting without it")
+            return {'success': True, 'asset_urn': None}
+        
+        content_hash = await asyncio.to_thread(file_content_hash, path)
+        asset_urn = self._cached_media_asset(author_urn, content_hash)
+        if not asset_urn:
+            asset_urn = await asyncio.to_thread(self._upload_image, author_urn, path)
+            self._remember_media_asset(author_urn, content_hash, asset_urn, os.path.getsize(path))
+        return {'success': True, 'asset_urn': asset_urn}
+    
+    def _build_post_data(self, author_urn: str, content: str, asset_urn: str = None) -> dict:
+        """ugcPosts request body"""
+        post_data = {
+            "author": author_urn,
+            "lifecycleState": "PUBLISHED",
+            "specificContent": {
+                "com.linkedin.ugc.ShareContent": {
+                    "shareCommentary": {
+                        "text": content
+                    },
+                    "shareMediaCategory": "NONE"
+                }
+            },
+            "visibility": {
+                "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
+            }
+        }
+        
+        # Attach an uploaded image asset
+        if asset_urn:
+            post_data["specificContent"]["com.linkedin.ugc.ShareContent"]["shareMediaCategory"] = "IMAGE"
+            post_data["specificContent"]["com.linkedin.ugc.ShareContent"]["media"] = [
+                {
+                    "status": "READY",
+                    "description": {
+                        "text": "LinkedIn post image"
+                    },
+                    "media": asset_urn,
+                    "title": {
+                        "text": "Image"
+                    }
+                }
+            ]
+        
+        return post_data
+    
+    def _post_result(self, post_response) -> dict:
+        """Turn a ugcPosts response into create_post's result"""
+        if post_response.status_code == 201:
+            post_id = post_response.headers.get('x-linkedin-id', 'unknown')
+            post_url = f"https://www.linkedin.com/feed/update/{post_id}/"
+            
+            return {
+                'success': True,
+                'post_id': post_id,
+                'post_url': post_url,
+                'message': 'Post published successfully to LinkedIn!'
+            }
+        
+        if post_response.status_code == 401:
+            self.invalidate_author_urn()
+        
+        error_data = post_response.json() if post_response.content else {}
+        return {
+            'success': False,
+            'error': error_data.get('message', 'Unknown error'),
+            'message': f'Failed to post to LinkedIn: {post_response.status_code}'
+        }
+    
     def create_post(self, content: str, image_url: str = None, video_url: str = None) -> dict:
         """Create a LinkedIn post"""
         try:
@@ -149,86 +471,66 @@ class LinkedInService:
                     'message': 'Please authenticate with LinkedIn first'
                 }
             
-            headers = {
-                'Authorization': f'Bearer {self.access_token}',
-                'Content-Type': 'application/json',
-                'X-Restli-Protocol-Version': '2.0.0'
-            }
-            
-            # Get user profile ID
-            profile_response = requests.get(
-                f"{self.api_base}/people/~:(id)",
-                headers=headers
-            )
-            
-            if profile_response.status_code != 200:
+            # Author URN is cached per token, so publishing is normally a single request
+            author = self.get_author_urn()
+            if not author['success']:
                 return {
                     'success': False,
                     'error': 'Failed to get user profile',
                     'message': 'LinkedIn authentication may have expired'
                 }
             
-            profile_data = profile_response.json()
-            author_urn = f"urn:li:person:{profile_data['id']}"
-            
-            # Prepare post data
-            post_data = {
-                "author": author_urn,
-                "lifecycleState": "PUBLISHED",
-                "specificContent": {
-                    "com.linkedin.ugc.ShareContent": {
-                        "shareCommentary": {
-                            "text": content
-                        },
-                        "shareMediaCategory": "NONE"
-                    }
-                },
-                "visibility": {
-                    "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
-                }
-            }
-            
-            # Add media if provided
-            if image_url:
-                post_data["specificContent"]["com.linkedin.ugc.ShareContent"]["shareMediaCategory"] = "IMAGE"
-                post_data["specificContent"]["com.linkedin.ugc.ShareContent"]["media"] = [
-                    {
-                        "status": "READY",
-                        "description": {
-                            "text": "LinkedIn post image"
-                        },
-                        "media": image_url,
-                        "title": {
-                            "text": "Image"
-                        }
-                    }
-                ]
+            asset_urn = self.get_image_asset(author['author_urn'], image_url)['asset_urn'] if image_url else None
             
             # Create the post
-            post_response = requests.post(
+            post_response = self.http.post(
                 f"{self.api_base}/ugcPosts",
-                headers=headers,
-                json=post_data
+                headers=self._auth_headers(),
+                json=self._build_post_data(author['author_urn'], content, asset_urn),
+                endpoint='POST /v2/ugcPosts'
             )
             
-            if post_response.status_code == 201:
-                post_id = post_response.headers.get('x-linkedin-id', 'unknown')
-                post_url = f"https://www.linkedin.com/feed/update/{post_id}/"
-                
+            return self._post_result(post_response)
+            
+        except Exception as e:
+            self.logger.error(f"Error creating LinkedIn post: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'message': f'Failed to post to LinkedIn: {str(e)}'
+            }
+    
+    async def create_post_async(self, content: str, image_url: str = None, video_url: str = None) -> dict:
+        """Create a LinkedIn post without blocking the event loop"""
+        try:
+            if not self.access_token:
                 return {
-                    'success': True,
-                    'post_id': post_id,
-                    'post_url': post_url,
-                    'message': 'Post published successfully to LinkedIn!'
+                    'success': False,
+                    'error': 'Not authenticated',
+                    'message': 'Please authenticate with LinkedIn first'
                 }
-            else:
-                error_data = post_response.json() if post_response.content else {}
+            
+            author = await self.get_author_urn_async()
+            if not author['success']:
                 return {
                     'success': False,
-                    'error': error_data.get('message', 'Unknown error'),
-                    'message': f'Failed to post to LinkedIn: {post_response.status_code}'
+                    'error': 'Failed to get user profile',
+                    'message': 'LinkedIn authentication may have expired'
                 }
             
+            asset_urn = None
+            if image_url:
+                asset_urn = (await self.get_image_asset_async(author['author_urn'], image_url))['asset_urn']
+            
+            post_response = await self.async_http.post(
+                f"{self.api_base}/ugcPosts",
+                headers=self._auth_headers(),
+                json=self._build_post_data(author['author_urn'], content, asset_urn),
+                endpoint='POST /v2/ugcPosts'
+            )
+            
+            return self._post_result(post_response)
+            
         except Exception as e:
             self.logger.error(f"Error creating LinkedIn post: {str(e)}")
             return {
@@ -237,6 +539,89 @@ class LinkedInService:
                 'message': f'Failed to post to LinkedIn: {str(e)}'
             }
     
+    @staticmethod
+    def post_urn(post_ref: str) -> str:
+        """Post URN from a URN or a feed/update URL"""
+        match = re.search(r'(urn:li:[A-Za-z]+:[^/?#]+)', unquote(post_ref or ''))
+        return match.group(1) if match else post_ref
+    
+    async def get_post_metrics(self, post_ref: str) -> Optional[dict]:
+        """Like and comment totals for one post (URN or feed URL) through the batch call, or None if unavailable"""
+        try:
+            if not post_ref:
+                return None
+            post_urn = self.post_urn(post_ref)
+            return (await self.get_posts_metrics_batch([post_urn])).get(post_urn)
+            
+        except Exception as e:
+            self.logger.error(f"Error fetching post metrics: {str(e)}")
+            return None
+    
+    async def get_posts_metrics_batch(self, post_urns: List[str]) -> Dict[str, dict]:
+        """Like and comment totals for many posts in one BATCH_GET; posts LinkedIn could not return are omitted"""
+        if not self.access_token or not post_urns:
+            return {}
+        
+        ids = ','.join(quote(urn, safe='') for urn in post_urns)
+        response = await self.async_http.get(
+            f"{self.api_base}/socialActions?ids=List({ids})",
+            headers=self._auth_headers(),
+            endpoint='GET /v2/socialActions?ids'
+        )
+        
+        if response.status_code != 200:
+            if response.status_code == 401:
+                self.invalidate_author_urn()
+            raise Exception(f"Batch metrics request failed: {response.status_code}")
+        
+        results = response.json().get('results', {})
+        return {
+            unquote(urn): {
+                'likes': data.get('likesSummary', {}).get('totalLikes', 0),
+                'comments': data.get('commentsSummary', {}).get('aggregatedTotalComments', 0)
+            }
+            for urn, data in results.items()
+        }
+    
+    async def send_connection_request(self, profile_id: str, message: str = None) -> dict:
+        """Send a connection invitation to a member"""
+        try:
+            if not self.access_token:
+                return {'success': False, 'error': 'Not authenticated'}
+            
+            invitation = {'invitee': profile_id if profile_id.startswith('urn:') else f"urn:li:person:{profile_id}"}
+            if message:
+                invitation['message'] = message[:300]  # LinkedIn caps invitation notes at 300 characters
+            
+            response = await self.async_http.post(
+                f"{self.api_base}/invitations",
+                headers=self._auth_headers(),
+                json=invitation,
+                endpoint='POST /v2/invitations'
+            )
+            
+            if response.status_code in (200, 201):
+                return {'success': True, 'message': 'Connection request sent'}
+            
+            if response.status_code == 401:
+                self.invalidate_author_urn()
+            
+            error_data = response.json() if response.content else {}
+            error = error_data.get('message', f'Invitation failed: {response.status_code}')
+            if response.status_code == 429:
+                return rate_limited_result(retry_after_seconds(response.headers, time.time()), error)
+            return {
+                'success': False,
+                'status_code': response.status_code,
+                'error': error
+            }
+            
+        except RateLimitExceeded as e:
+            return rate_limited_result(e.wait, str(e))
+        except Exception as e:
+            self.logger.error(f"Error sending connection request: {str(e)}")
+            return {'success': False, 'error': str(e)}
+    
     def post_to_linkedin(self, content: str, image_url: str = None) -> dict:
         """Legacy method for backward compatibility"""
         return self.create_post(content, image_url)
@@ -279,15 +664,58 @@ class LinkedInService:
             }
     
     def get_connection_status(self) -> dict:
-        """Get LinkedIn connection status and profile info"""
+        """Get LinkedIn connection status, served from memory and refreshed in the background once stale"""
+        if not self.access_token:
+            return {
+                'connected': False,
+                'profile': None,
+                'auth_url': self.get_authorization_url()
+            }
+        
+        fingerprint = self._token_fingerprint(self.access_token)
+        cached = self._status_cache.get(fingerprint)
+        if cached:
+            status, fetched_at = cached
+            age = time.monotonic() - fetched_at
+            if age < (STATUS_TTL if status['connected'] else STATUS_ERROR_TTL):
+                return status
+            if status['connected'] and age < STATUS_STALE_TTL:
+                self._refresh_status_in_background(fingerprint)
+                return status
+        
+        return self._refresh_connection_status(fingerprint)
+    
+    def _refresh_status_in_background(self, fingerprint: str):
+        """Start one background refresh per token; callers keep getting the cached status meanwhile"""
+        with self._status_lock:
+            if fingerprint in self._status_refreshing:
+                return
+            self._status_refreshing.add(fingerprint)
+        
+        from flask import current_app
+        app = current_app._get_current_object()
+        
+        def refresh():
+            try:
+                with app.app_context():
+                    self._refresh_connection_status(fingerprint)
+            finally:
+                with self._status_lock:
+                    self._status_refreshing.discard(fingerprint)
+        
+        threading.Thread(target=refresh, name='linkedin-status-refresh', daemon=True).start()
+    
+    def _refresh_connection_status(self, fingerprint: str) -> dict:
+        """Fetch the connection status from LinkedIn and cache it for the token"""
+        status = self._fetch_connection_status()
+        if self.access_token and self._token_fingerprint(self.access_token) == fingerprint:
+            with self._status_lock:
+                self._status_cache = {fingerprint: (status, time.monotonic())}
+        return status
+    
+    def _fetch_connection_status(self) -> dict:
+        """Verify the token with a profile fetch"""
         try:
-            if not self.access_token:
-                return {
-                    'connected': False,
-                    'profile': None,
-                    'auth_url': self.get_authorization_url()
-                }
-            
             # Verify token is still valid
             profile_result = self.get_user_profile()
             
@@ -0,0 +1,387 @@
+"""
+Local LinkedIn API simulator for benchmarks and integration tests.
+
+Point the services at it with LINKEDIN_API_BASE=http://127.0.0.1:8765/v2 and
+LINKEDIN_OAUTH_BASE=http://127.0.0.1:8765/oauth/v2, then run:
+
+    python linkedin_simulator.py --port 8765 --latency-ms 120 --error-rate 0.02 --rate-limit 100
+"""
+
+import math
+import time
+import random
+import hashlib
+import logging
+import argparse
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+from urllib.parse import unquote
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server, WSGIRequestHandler
+
+logger = logging.getLogger(__name__)
+
+TITLES = ['CEO', 'Founder', 'CTO', 'VP Marketing', 'Director of Sales', 'Software Engineer',
+          'Product Manager', 'Head of Growth', 'Partner', 'Marketing Specialist', 'Data Scientist', 'Consultant']
+COMPANIES = ['TechCorp', 'StartupXYZ', 'Acme Analytics', 'Globex', 'Initech', 'Umbrella Ventures', 'Hooli', 'Stark Industries']
+INDUSTRIES = ['Technology', 'Software', 'Marketing', 'Financial Services', 'Venture Capital', 'Healthcare', 'Retail']
+LOCATIONS = ['San Francisco', 'New York', 'London', 'Berlin', 'Austin', 'Toronto', 'Singapore']
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn']
+LAST_NAMES = ['Lee', 'Patel', 'Garcia', 'Kim', 'Nguyen', 'Smith', 'Müller', 'Rossi', 'Cohen', 'Okafor']
+TOPICS = ['AI', 'machine learning', 'marketing automation', 'B2B sales', 'product-led growth', 'cloud costs',
+          'data engineering', 'leadership', 'remote work', 'fundraising']
+
+@dataclass
+class SimulatorConfig:
+    """Latency, rate limiting and failure injection settings"""
+    latency_ms: float = 80.0  # Median response latency
+    latency_sigma: float = 0.5  # Log-normal spread; 0 gives constant latency
+    endpoint_latency_ms: Dict[str, float] = field(default_factory=dict)  # Per-endpoint median overrides
+    error_rate: float = 0.0  # Probability of a 500/502/503 response
+    timeout_rate: float = 0.0  # Probability of stalling for hang_seconds before answering
+    hang_seconds: float = 30.0
+    rate_limit: int = 0  # Requests per endpoint per window; 0 disables rate limiting
+    rate_window_seconds: float = 60.0
+    seed: Optional[int] = None
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Request handler without per-request access logs (in-process runs share the app's log)"""
+    
+    def log_request(self, *args, **kwargs):
+        pass
+
+class LinkedInSimulator:
+    """In-memory LinkedIn API with realistic latency, rate-limit headers and injected failures"""
+    
+    def __init__(self, config: SimulatorConfig = None):
+        self.config = config or SimulatorConfig()
+        self.random = random.Random(self.config.seed)
+        self.lock = threading.Lock()
+        self.windows: Dict[str, List[float]] = {}  # endpoint -> [window start, count]
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.posts: Dict[str, Dict] = {}
+        self.invitations: Dict[str, Dict] = {}
+        self.follows: set = set()
+        self.assets: Dict[str, int] = {}  # asset URN -> uploaded bytes (None until uploaded)
+        self.next_id = 1
+        self.app = self._create_app()
+    
+    # Simulation mechanics
+    
+    def _new_id(self) -> int:
+        with self.lock:
+            value = self.next_id
+            self.next_id += 1
+            return value
+    
+    def _latency(self, endpoint: str) -> float:
+        median = self.config.endpoint_latency_ms.get(endpoint, self.config.latency_ms) / 1000
+        if self.config.latency_sigma <= 0:
+            return median
+        return self.random.lognormvariate(math.log(max(median, 1e-6)), self.config.latency_sigma)
+    
+    def _rate_limit_state(self, endpoint: str):
+        """Count the request against the endpoint's window; returns (limit, remaining, reset_seconds)"""
+        now = time.time()
+        with self.lock:
+            window = self.windows.get(endpoint)
+            if window is None or now - window[0] >= self.config.rate_window_seconds:
+                window = self.windows[endpoint] = [now, 0]
+            window[1] += 1
+            reset = max(0, int(window[0] + self.config.rate_window_seconds - now) + 1)
+            return self.config.rate_limit, self.config.rate_limit - window[1], reset
+    
+    def _record(self, endpoint: str, status: int):
+        with self.lock:
+            counts = self.stats.setdefault(endpoint, {})
+            counts[str(status)] = counts.get(str(status), 0) + 1
+    
+    def _simulate(self, endpoint: str, handler):
+        """Apply latency, rate limiting and failure injection around an endpoint handler"""
+        time.sleep(self._latency(endpoint))
+        headers = {}
+        
+        if self.config.rate_limit:
+            limit, remaining, reset = self._rate_limit_state(endpoint)
+            headers = {
+                'X-RateLimit-Limit': str(limit),
+                'X-RateLimit-Remaining': str(max(remaining, 0)),
+                'X-RateLimit-Reset': str(reset)
+            }
+            if remaining < 0:
+                headers['Retry-After'] = str(reset)
+                self._record(endpoint, 429)
+                return jsonify({'status': 429, 'message': 'Resource level throttle limit reached'}), 429, headers
+        
+        if not request.headers.get('Authorization', '').startswith('Bearer ') and endpoint != 'accessToken':
+            self._record(endpoint, 401)
+            return jsonify({'status': 401, 'message': 'Empty oauth2 access token'}), 401, headers
+        if request.headers.get('Authorization') == 'Bearer expired':
+            self._record(endpoint, 401)
+            return jsonify({'status': 401, 'message': 'The token used in the request has expired'}), 401, headers
+        
+        roll = self.random.random()
+        if roll < self.config.timeout_rate:
+            time.sleep(self.config.hang_seconds)
+        elif roll < self.config.timeout_rate + self.config.error_rate:
+            status = self.random.choice([500, 502, 503])
+            self._record(endpoint, status)
+            return jsonify({'status': status, 'message': 'Simulated server error'}), status, headers
+        
+        body, status, extra_headers = handler()
+        headers.update(extra_headers)
+        self._record(endpoint, status)
+        return jsonify(body), status, headers
+    
+    # Generated data
+    
+    def _profile(self, seed: str) -> Dict:
+        digest = int(hashlib.sha256(seed.encode()).hexdigest(), 16)
+        pick = lambda options, shift: options[(digest >> shift) % len(options)]
+        title = pick(TITLES, 0)
+        company = pick(COMPANIES, 8)
+        return {
+            'id': f"sim{digest % 10 ** 10:010d}",
+            'name': f"{pick(FIRST_NAMES, 16)} {pick(LAST_NAMES, 24)}",
+            'headline': f"{title} at {company}",
+            'title': title,
+            'company': company,
+            'company_size': [10, 50, 200, 1000, 10000][(digest >> 32) % 5],
+            'industry': pick(INDUSTRIES, 40),
+            'location': pick(LOCATIONS, 48)
+        }
+    
+    def _search_profiles(self):
+        keywords = request.args.get('keywords', '')
+        count = min(request.args.get('count', 25, type=int), 100)
+        start = request.args.get('start', 0, type=int)
+        elements = [self._profile(f"{keywords}:{start + i}") for i in range(count)]
+        return {'elements': elements, 'paging': {'start': start, 'count': count}}, 200, {}
+    
+    def _search_posts(self):
+        keywords = [keyword for keyword in request.args.get('keywords', '').split(',') if keyword]
+        count = min(request.args.get('count', 25, type=int), 100)
+        start = request.args.get('start', 0, type=int)
+        elements = []
+        for i in range(start, start + count):
+            author = self._profile(f"post-author:{i}")
+            topic = keywords[i % len(keywords)] if keywords else TOPICS[i % len(TOPICS)]
+            elements.append({
+                'id': f"urn:li:share:{7000000000 + i}",
+                'author': author['name'],
+                'author_id': author['id'],
+                'content': f"{author['name']} on {topic}: what we learned about {TOPICS[(i * 7) % len(TOPICS)]} this quarter."
+            })
+        return {'elements': elements, 'paging': {'start': start, 'count': count}}, 200, {}
+    
+    def _pending_invitations(self):
+        count = min(request.args.get('count', 10, type=int), 100)
+        elements = []
+        for i in range(count):
+            invitation_id = f"inv{self._new_id()}"
+            sender = self._profile(invitation_id)
+            invitation = {
+                'id': invitation_id,
+                'from_profile': sender['id'],
+                'from_name': sender['name'],
+                'message': "Hello! Let's connect"
+            }
+            self.invitations[invitation_id] = invitation
+            elements.append(invitation)
+        return {'elements': elements}, 200, {}
+    
+    def _create_app(self) -> Flask:
+        app = Flask(__name__)
+        simulate = self._simulate
+        
+        @app.route('/oauth/v2/accessToken', methods=['POST'])
+        def access_token():
+            return simulate('accessToken', lambda: (
+                {'access_token': f"sim-token-{self._new_id()}", 'expires_in': 5184000}, 200, {}
+            ))
+        
+        @app.route('/v2/people/<path:projection>', methods=['GET'])
+        def people(projection):
+            def handler():
+                token = request.headers.get('Authorization', '')
+                profile = self._profile(token)
+                return {
+                    'id': profile['id'],
+                    'firstName': {'localized': {'en_US': profile['name'].split()[0]}},
+                    'lastName': {'localized': {'en_US': profile['name'].split()[-1]}},
+                    'headline': {'localized': {'en_US': profile['headline']}},
+                    'industry': {'localized': {'en_US': profile['industry']}},
+                    'location': {'name': profile['location']},
+                    'publicProfileUrl': f"https://www.linkedin.com/in/{profile['id']}"
+                }, 200, {}
+            return simulate('people', handler)
+        
+        @app.route('/v2/ugcPosts', methods=['POST'])
+        def ugc_posts():
+            def handler():
+                post_urn = f"urn:li:share:{self._new_id()}"
+                self.posts[post_urn] = {'likes': 0, 'comments': 0, 'body': request.get_json(silent=True)}
+                return {'id': post_urn}, 201, {'x-linkedin-id': post_urn}
+            return simulate('ugcPosts', handler)
+        
+        @app.route('/v2/assets', methods=['POST'])
+        def register_upload():
+            def handler():
+                if request.args.get('action') != 'registerUpload':
+                    return {'status': 400, 'message': 'Unsupported action'}, 400, {}
+                asset_id = f"sim{self._new_id()}"
+                self.assets[f"urn:li:digitalmediaAsset:{asset_id}"] = None
+                return {'value': {
+                    'asset': f"urn:li:digitalmediaAsset:{asset_id}",
+                    'uploadMechanism': {'com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest': {
+                        'uploadUrl': f"{request.host_url}mediaUpload/{asset_id}",
+                        'headers': {'media-type-family': 'STILLIMAGE'}
+                    }}
+                }}, 200, {}
+            return simulate('assets.registerUpload', handler)
+        
+        @app.route('/mediaUpload/<asset_id>', methods=['PUT', 'POST'])
+        def media_upload(asset_id):
+            def handler():
+                urn = f"urn:li:digitalmediaAsset:{asset_id}"
+                if urn not in self.assets:
+                    return {'status': 404, 'message': 'Unknown upload'}, 404, {}
+                received = 0
+                for chunk in iter(lambda: request.stream.read(64 * 1024), b''):
+                    received += len(chunk)
+                self.assets[urn] = received
+                return {}, 201, {}
+            return simulate('mediaUpload', handler)
+        
+        def social_summary(urn: str) -> Dict:
+            post = self.posts.get(urn)
+            digest = int(hashlib.sha256(urn.encode()).hexdigest(), 16)
+            likes = post['likes'] if post else digest % 500
+            comments = post['comments'] if post else (digest >> 16) % 60
+            return {
+                'target': urn,
+                'likesSummary': {'totalLikes': likes},
+                'commentsSummary': {'aggregatedTotalComments': comments}
+            }
+        
+        @app.route('/v2/socialActions', methods=['GET'])
+        def social_actions_batch():
+            def handler():
+                raw_ids = request.args.get('ids', '')
+                if not (raw_ids.startswith('List(') and raw_ids.endswith(')')):
+                    return {'status': 400, 'message': 'ids must be List(...)'}, 400, {}
+                urns = [unquote(urn) for urn in raw_ids[5:-1].split(',') if urn]
+                return {'results': {urn: social_summary(urn) for urn in urns}, 'errors': {}}, 200, {}
+            return simulate('socialActions.batch', handler)
+        
+        @app.route('/v2/socialActions/<path:urn>/likes', methods=['POST'])
+        def like(urn):
+            def handler():
+                if urn in self.posts:
+                    self.posts[urn]['likes'] += 1
+                return {'object': urn}, 201, {}
+            return simulate('socialActions.likes', handler)
+        
+        @app.route('/v2/socialActions/<path:urn>/comments', methods=['POST'])
+        def comment(urn):
+            def handler():
+                if urn in self.posts:
+                    self.posts[urn]['comments'] += 1
+                return {'object': urn, 'id': str(self._new_id())}, 201, {}
+            return simulate('socialActions.comments', handler)
+        
+        @app.route('/v2/socialActions/<path:urn>', methods=['GET'])
+        def social_actions(urn):
+            return simulate('socialActions', lambda: (social_summary(urn), 200, {}))
+        
+        @app.route('/v2/search/people', methods=['GET'])
+        def search_people():
+            return simulate('search.people', self._search_profiles)
+        
+        @app.route('/v2/search/posts', methods=['GET'])
+        def search_posts():
+            return simulate('search.posts', self._search_posts)
+        
+        @app.route('/v2/invitations', methods=['GET', 'POST'])
+        def invitations():
+            if request.method == 'GET':
+                return simulate('invitations', self._pending_invitations)
+            return simulate('invitations.create', lambda: ({'id': f"inv{self._new_id()}"}, 201, {}))
+        
+        @app.route('/v2/invitations/<invitation_id>', methods=['POST'])
+        def invitation_action(invitation_id):
+            def handler():
+                if invitation_id not in self.invitations:
+                    return {'status': 404, 'message': 'Invitation not found'}, 404, {}
+                self.invitations.pop(invitation_id)
+                return {'id': invitation_id, 'action': request.args.get('action', 'accept')}, 200, {}
+            return simulate('invitations.action', handler)
+        
+        @app.route('/v2/follows', methods=['POST'])
+        def follows():
+            def handler():
+                followee = (request.get_json(silent=True) or {}).get('followee')
+                if not followee:
+                    return {'status': 400, 'message': 'followee is required'}, 400, {}
+                self.follows.add(followee)
+                return {'followee': followee}, 201, {}
+            return simulate('follows', handler)
+        
+        @app.route('/_simulator/stats', methods=['GET'])
+        def simulator_stats():
+            with self.lock:
+                return jsonify({'config': asdict(self.config), 'responses': self.stats})
+        
+        @app.route('/_simulator/config', methods=['POST'])
+        def simulator_config():
+            for key, value in (request.get_json(silent=True) or {}).items():
+                if hasattr(self.config, key):
+                    setattr(self.config, key, value)
+            return jsonify({'config': asdict(self.config)})
+        
+        return app
+    
+    # Server lifecycle
+    
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Serve in a background thread; returns the base URL (port 0 picks a free port)"""
+        self.server = make_server(host, port, self.app, threaded=True, request_handler=QuietRequestHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name='linkedin-simulator', daemon=True)
+        self.thread.start()
+        return f"http://{host}:{self.server.server_port}"
+    
+    def stop(self):
+        self.server.shutdown()
+        self.thread.join(timeout=5)
+
+def main():
+    parser = argparse.ArgumentParser(description='Local LinkedIn API simulator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=80.0)
+    parser.add_argument('--latency-sigma', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=0, help='Requests per endpoint per window (0 = unlimited)')
+    parser.add_argument('--rate-window', type=float, default=60.0)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    
+    simulator = LinkedInSimulator(SimulatorConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        rate_limit=args.rate_limit,
+        rate_window_seconds=args.rate_window,
+        seed=args.seed
+    ))
+    
+    print(f"LinkedIn simulator listening on http://{args.host}:{args.port}")
+    print(f"  LINKEDIN_API_BASE=http://{args.host}:{args.port}/v2")
+    print(f"  LINKEDIN_OAUTH_BASE=http://{args.host}:{args.port}/oauth/v2")
+    make_server(args.host, args.port, simulator.app, threaded=True).serve_forever()
+
+if __name__ == '__main__':
+    main()
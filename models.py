@@ -1,6 +1,6 @@
 from extensions import db
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean, JSON, ForeignKey, Float, Index, UniqueConstraint, inspect, text
 from sqlalchemy.orm import relationship
 import json
 
@@ -22,6 +22,8 @@ class User(db.Model):
     linkedin_access_token = Column(String(500))
     linkedin_refresh_token = Column(String(500))
     linkedin_token_expires_at = Column(DateTime)
+    linkedin_member_urn = Column(String(100))  # Author URN resolved for the current access token
+    linkedin_urn_token_hash = Column(String(64))  # SHA-256 of the token linkedin_member_urn was resolved with
     
     # Settings and preferences
     settings = Column(JSON)  # Store user preferences as JSON
@@ -130,6 +132,7 @@ class UploadedFile(db.Model):
     file_size = Column(Integer)
     mime_type = Column(String(100))
     file_type = Column(String(50))  # 'pdf', 'image', 'document', etc.
+    content_hash = Column(String(64), index=True)  # SHA-256 of the file contents
     extracted_text = Column(Text)
     summary = Column(Text)
     keywords = Column(JSON)  # Extracted keywords
@@ -137,6 +140,8 @@ class UploadedFile(db.Model):
     processed = Column(Boolean, default=False)
     processing_status = Column(String(20), default='pending')  # 'pending', 'processing', 'completed', 'failed'
     processing_error = Column(Text)
+    processing_progress = Column(JSON)  # {'stage': ..., 'unit': ..., 'chunks_processed': ..., 'total_chunks': ...}
+    heartbeat_at = Column(DateTime)  # Last progress commit; stale 'processing' uploads are picked up again on startup
 
     def to_dict(self):
         return {
@@ -147,12 +152,14 @@ class UploadedFile(db.Model):
             'file_size': self.file_size,
             'mime_type': self.mime_type,
             'file_type': self.file_type,
+            'content_hash': self.content_hash,
             'summary': self.summary,
             'keywords': self.keywords or [],
             'created_at': self.created_at.isoformat(),
             'processed': self.processed,
             'processing_status': self.processing_status,
-            'processing_error': self.processing_error
+            'processing_error': self.processing_error,
+            'processing_progress': self.processing_progress or {}
         }
 
 class AutomationRule(db.Model):
@@ -261,6 +268,7 @@ class LinkedInProfile(db.Model):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_sync = Column(DateTime)
+    payload_hash = Column(String(64))  # SHA-256 of the last synced API payload
 
     def to_dict(self):
         return {
@@ -282,9 +290,56 @@ class LinkedInProfile(db.Model):
             'last_sync': self.last_sync.isoformat() if self.last_sync else None
         }
 
+class LinkedInMediaAsset(db.Model):
+    """Image asset uploaded to LinkedIn, reused when the same file is posted again"""
+    __tablename__ = 'linkedin_media_assets'
+    __table_args__ = (UniqueConstraint('owner_urn', 'content_hash'),)
+    
+    id = Column(Integer, primary_key=True)
+    owner_urn = Column(String(100), nullable=False)  # Assets belong to the member that registered them
+    content_hash = Column(String(64), nullable=False)  # SHA-256 of the file contents
+    asset_urn = Column(String(200), nullable=False)
+    file_size = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class AutomationJob(db.Model):
+    """Queued automation run executed in the background by automation_jobs.AutomationJobExecutor"""
+    __tablename__ = 'automation_jobs'
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    job_type = Column(String(50), nullable=False)  # 'accept_connections', 'send_connections', 'follow_successful', 'engage_posts'
+    params = Column(JSON)
+    status = Column(String(20), default='queued', index=True)  # 'queued', 'running', 'paused', 'completed', 'failed', 'cancelled'
+    progress = Column(JSON)  # {'processed': ..., 'total': ...}
+    cursor = Column(JSON)  # {'targets': [...], 'position': ...}; a resumed job continues from here
+    result = Column(JSON)  # Counts accumulated across runs
+    error = Column(Text)
+    cancel_requested = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)  # Last checkpoint; stale 'running' jobs are picked up again on startup
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'params': self.params or {},
+            'status': self.status,
+            'progress': self.progress or {},
+            'result': self.result or {},
+            'error': self.error,
+            'cancel_requested': self.cancel_requested,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
 class ActionLog(db.Model):
     """Log of automation actions"""
     __tablename__ = 'action_logs'
+    __table_args__ = (Index('ix_action_logs_user_action_target', 'user_id', 'action_type', 'target_profile_id'),)
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -310,3 +365,47 @@ class ActionLog(db.Model):
             'error_message': self.error_message,
             'created_at': self.created_at.isoformat()
         }
+
+class DailyActionCounter(db.Model):
+    """Per-day action totals maintained alongside ActionLog writes, so limit checks read one row"""
+    __tablename__ = 'daily_action_counters'
+    __table_args__ = (UniqueConstraint('user_id', 'action_type', 'date', 'status'),)
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    action_type = Column(String(50), nullable=False)
+    date = Column(Date, nullable=False)  # UTC day
+    status = Column(String(20), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+class DailyActionBudget(db.Model):
+    """Units of a daily action limit taken by workers; reserved with conditional UPDATEs so concurrent workers cannot overshoot"""
+    __tablename__ = 'daily_action_budgets'
+    __table_args__ = (UniqueConstraint('user_id', 'action_type', 'date'),)
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    action_type = Column(String(50), nullable=False)
+    date = Column(Date, nullable=False)  # UTC day
+    used = Column(Integer, nullable=False, default=0)  # Successful actions plus units reserved by actions in flight
+
+def upgrade_schema():
+    """Add nullable columns and indexes introduced after a table was first created (create_all only creates tables)"""
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns or not column.nullable:
+                continue
+            
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as connection:
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+        
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
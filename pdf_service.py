@@ -1,80 +1,134 @@
 import os
-import logging
-from werkzeug.utils import secure_filename
+import math
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Optional, Tuple
 import PyPDF2
-from gemini_service import summarize_text
 
 # Ensure all API keys and tokens are loaded from environment variables as set in .env
 
 ALLOWED_EXTENSIONS = {'pdf'}
 
+# Pages extracted per document; document_service caps the characters
+PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 500))
+
+# Parallel extraction: documents with at least PDF_PARALLEL_MIN_PAGES pages are split
+# into page ranges and extracted across PDF_EXTRACT_WORKERS processes
+PDF_EXTRACT_WORKERS = int(os.environ.get('PDF_EXTRACT_WORKERS', os.cpu_count() or 1))
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 50))
+
+# Extraction always runs serially on a single CPU, whatever PDF_EXTRACT_WORKERS says
+CPU_COUNT = os.cpu_count() or 1
+
+# Pool processes are started fresh rather than forked, since forking the multithreaded web/ingestion process can deadlock
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+_executor = None
+_executor_lock = threading.Lock()
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text content from PDF file"""
-    try:
-        text = ""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n"
-        
-        return text.strip()
-    
-    except Exception as e:
-        logging.error(f"Error extracting text from PDF: {str(e)}")
-        raise Exception(f"Failed to extract text from PDF: {str(e)}")
-
-def process_pdf_file(file, upload_folder: str) -> dict:
-    """Process uploaded PDF file and extract content"""
-    try:
-        if not file or file.filename == '':
-            raise Exception("No file selected")
-        
-        if not allowed_file(file.filename):
-            raise Exception("Invalid file type. Only PDF files are allowed.")
-        
-        # Secure the filename
-        filename = secure_filename(file.filename)
-        if not filename:
-            filename = "upload.pdf"
-        
-        # Save the file
-        file_path = os.path.join(upload_folder, filename)
-        file.save(file_path)
+def _iter_reader_pages(pdf_reader: PyPDF2.PdfReader, max_pages: Optional[int] = None,
+                       max_chars: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """Yield (page_number, text) from an open reader, stopping early at the page/char limits"""
+    total_chars = 0
+    for page_num, page in enumerate(pdf_reader.pages):
+        if max_pages is not None and page_num >= max_pages:
+            break
         
-        # Extract text from PDF
-        extracted_text = extract_text_from_pdf(file_path)
+        text = page.extract_text() or ""
         
-        if not extracted_text.strip():
-            raise Exception("No text content found in the PDF")
+        if max_chars is not None:
+            remaining = max_chars - total_chars
+            if remaining <= 0:
+                break
+            text = text[:remaining]
         
-        # Generate summary using Gemini
-        summary = summarize_text(extracted_text)
-        
-        # Get file size
-        file_size = os.path.getsize(file_path)
-        
-        return {
-            'success': True,
-            'filename': filename,
-            'original_filename': file.filename,
-            'file_path': file_path,
-            'file_size': file_size,
-            'extracted_text': extracted_text,
-            'summary': summary,
-            'message': 'PDF processed successfully'
-        }
-        
-    except Exception as e:
-        logging.error(f"Error processing PDF: {str(e)}")
-        return {
-            'success': False,
-            'error': str(e),
-            'message': f'Failed to process PDF: {str(e)}'
-        }
+        total_chars += len(text)
+        yield page_num + 1, text
+
+def count_pdf_pages(file_path: str) -> int:
+    """Return the number of pages in a PDF"""
+    with open(file_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract pages [start, stop) in a worker process"""
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Process pool shared by all extractions, created on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context(START_METHOD)
+            )
+        return _executor
+
+def _discard_executor(executor: ProcessPoolExecutor):
+    """Drop a broken pool so the next extraction starts a new one"""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def iter_pdf_pages_parallel(file_path: str, workers: Optional[int] = None, max_pages: Optional[int] = None,
+                            max_chars: Optional[int] = None, page_count: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """Yield (page_number, text) like _iter_reader_pages, but extract page ranges across the shared process pool; page order is preserved"""
+    workers = workers or PDF_EXTRACT_WORKERS
+    if page_count is None:
+        page_count = count_pdf_pages(file_path)
+    if max_pages is not None:
+        page_count = min(page_count, max_pages)
+    if not page_count:
+        return
+    
+    # Two ranges per worker keeps the pool busy without re-parsing the file too often
+    pages_per_range = max(1, math.ceil(page_count / (workers * 2)))
+    starts = list(range(0, page_count, pages_per_range))
+    
+    total_chars = 0
+    executor = _get_executor()
+    futures = [executor.submit(_extract_page_range, file_path, start, min(start + pages_per_range, page_count))
+               for start in starts]
+    try:
+        # Futures are read in submission order, whatever order the workers finish in
+        for start, future in zip(starts, futures):
+            for offset, text in enumerate(future.result()):
+                if max_chars is not None:
+                    remaining = max_chars - total_chars
+                    if remaining <= 0:
+                        return
+                    text = text[:remaining]
+                
+                total_chars += len(text)
+                yield start + offset + 1, text
+    except BrokenProcessPool:
+        _discard_executor(executor)
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+
+def iter_pdf_text(file_path: str, max_pages: Optional[int] = None, max_chars: Optional[int] = None,
+                  workers: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """Pick sequential or parallel page extraction based on document size, worker count and CPUs"""
+    workers = workers or PDF_EXTRACT_WORKERS
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        page_count = len(pdf_reader.pages)
+        if workers <= 1 or CPU_COUNT <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+            yield from _iter_reader_pages(pdf_reader, max_pages, max_chars)
+            return
+    
+    yield from iter_pdf_pages_parallel(file_path, workers, max_pages, max_chars, page_count=page_count)
@@ -0,0 +1,138 @@
+import re
+import numpy as np
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Score columns, in weight-vector order
+FEATURES = ('title', 'industry', 'company_size', 'keywords')
+
+# Relative importance of each feature; features without criteria are dropped and the rest renormalized to sum to 1
+DEFAULT_WEIGHTS = np.array([0.4, 0.2, 0.15, 0.25])
+
+# Distinct keyword hits that earn the full keyword score
+KEYWORD_SATURATION = 2
+
+# Titles that mark a decision maker when no job_titles are given
+SUCCESS_TITLES = ('CEO', 'Founder', 'CTO', 'VP', 'Director', 'Partner', 'President', 'Owner', 'Chief', 'Head of', 'Lead')
+
+# Profile fields searched for each text feature; titles come from the headline, or the title when there is none
+TITLE_FIELDS = ('headline', 'title')
+KEYWORD_FIELDS = ('headline', 'summary', 'company', 'industry')
+
+SEPARATOR = '\x00'  # Joins profile texts so one regex pass covers a batch; no term contains it
+NUMBER_PATTERN = re.compile(r'\d[\d,]*')
+
+def criteria_terms(criteria: Dict, *keys: str) -> Tuple[str, ...]:
+    """Criteria values under any of the keys, as a de-duplicated tuple of strings"""
+    terms = []
+    for key in keys:
+        value = criteria.get(key) or ()
+        terms.extend([value] if isinstance(value, str) else value)
+    return tuple(dict.fromkeys(str(term).strip() for term in terms if str(term).strip()))
+
+@lru_cache(maxsize=256)
+def compile_terms(terms: Tuple[str, ...]) -> Optional[re.Pattern]:
+    """One alternation for all terms, matched whole-word against lower-cased text, longest first so 'vp marketing' wins over 'vp'"""
+    if not terms:
+        return None
+    
+    terms = sorted({term.lower() for term in terms}, key=len, reverse=True)
+    alternation = '|'.join(re.escape(term) for term in terms)
+    if all(re.match(r'\w', term[0]) and re.match(r'\w', term[-1]) for term in terms):
+        return re.compile(rf'\b(?:{alternation})\b')  # \b is markedly faster than lookarounds in re
+    return re.compile(rf'(?<!\w)(?:{alternation})(?!\w)')
+
+def _size_ranges(values: Iterable) -> np.ndarray:
+    """Company size criteria ('51-200', '10000+', 500) as (low, high) rows"""
+    ranges = []
+    for value in values:
+        numbers = [float(number.replace(',', '')) for number in NUMBER_PATTERN.findall(str(value))]
+        if not numbers:
+            continue
+        if str(value).strip().endswith('+'):
+            ranges.append((numbers[0], np.inf))
+        else:
+            ranges.append((numbers[0], numbers[-1]))
+    return np.array(ranges, dtype=float).reshape(-1, 2)
+
+def _company_size(value) -> float:
+    """Head count as a number: the lower bound of a range, NaN when unknown"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    numbers = NUMBER_PATTERN.findall(str(value or ''))
+    return float(numbers[0].replace(',', '')) if numbers else np.nan
+
+def _match_counts(pattern: re.Pattern, texts: List[str]) -> np.ndarray:
+    """Distinct terms matched per text, from a single scan of the joined batch"""
+    lowered = [text.lower() for text in texts]  # lower() can change the length ('İ' becomes 2 code points)
+    joined = SEPARATOR.join(lowered)
+    starts = np.cumsum([0] + [len(text) + len(SEPARATOR) for text in lowered[:-1]])
+    matches = [(match.start(), match.group()) for match in pattern.finditer(joined)]
+    if not matches:
+        return np.zeros(len(texts))
+    
+    owners = np.searchsorted(starts, [position for position, _ in matches], side='right') - 1
+    distinct = set(zip(owners.tolist(), (term for _, term in matches)))
+    return np.bincount([owner for owner, _ in distinct], minlength=len(texts)).astype(float)
+
+class ProfileScorer:
+    """Criteria compiled once into per-feature matchers and a weight vector, then applied to whole batches of profiles"""
+    
+    def __init__(self, criteria: Dict, weights: Dict[str, float] = None):
+        criteria = criteria or {}
+        self.title_pattern = compile_terms(criteria_terms(criteria, 'job_titles', 'title'))
+        self.industry_pattern = compile_terms(criteria_terms(criteria, 'industries', 'industry'))
+        self.keyword_pattern = compile_terms(criteria_terms(criteria, 'keywords'))
+        self.size_ranges = _size_ranges(criteria.get('company_size') or ())
+        
+        base = DEFAULT_WEIGHTS if weights is None else np.array([weights.get(feature, 0.0) for feature in FEATURES])
+        active = np.array([
+            self.title_pattern is not None,
+            self.industry_pattern is not None,
+            len(self.size_ranges) > 0,
+            self.keyword_pattern is not None
+        ])
+        total = (base * active).sum()
+        self.weights = base * active / total if total else base * 0
+    
+    def features(self, profiles: List[Dict]) -> np.ndarray:
+        """(len(profiles), len(FEATURES)) matrix of feature scores in [0, 1]"""
+        matrix = np.zeros((len(profiles), len(FEATURES)))
+        if not profiles:
+            return matrix
+        
+        text = lambda profile, fields: ' '.join(str(profile.get(field) or '') for field in fields)
+        if self.title_pattern is not None:
+            titles = [str(profile.get(TITLE_FIELDS[0]) or profile.get(TITLE_FIELDS[1]) or '') for profile in profiles]
+            matrix[:, 0] = _match_counts(self.title_pattern, titles) > 0
+        if self.industry_pattern is not None:
+            matrix[:, 1] = _match_counts(self.industry_pattern, [str(profile.get('industry') or '') for profile in profiles]) > 0
+        if len(self.size_ranges):
+            sizes = np.array([_company_size(profile.get('company_size')) for profile in profiles])[:, None]
+            matrix[:, 2] = ((sizes >= self.size_ranges[:, 0]) & (sizes <= self.size_ranges[:, 1])).any(axis=1)
+        if self.keyword_pattern is not None:
+            counts = _match_counts(self.keyword_pattern, [text(profile, KEYWORD_FIELDS) for profile in profiles])
+            matrix[:, 3] = np.minimum(counts, KEYWORD_SATURATION) / KEYWORD_SATURATION
+        return matrix
+    
+    def score(self, profiles: List[Dict]) -> np.ndarray:
+        """Weighted score in [0, 1] per profile"""
+        return self.features(profiles) @ self.weights
+    
+    def top_k(self, profiles: List[Dict], k: int = None, min_score: float = 0.0,
+              require: Iterable[str] = ()) -> List[Dict]:
+        """Best-scoring profiles above min_score (and matching every required feature), highest first"""
+        if not profiles:
+            return []
+        
+        matrix = self.features(profiles)
+        scores = matrix @ self.weights
+        eligible = scores > min_score
+        for feature in require:
+            eligible &= matrix[:, FEATURES.index(feature)] > 0
+        
+        candidates = np.flatnonzero(eligible)
+        if k is not None and k < len(candidates):
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        ranked = candidates[np.lexsort((candidates, -scores[candidates]))]  # ties keep search order
+        return [profiles[index] for index in ranked]
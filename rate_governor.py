@@ -0,0 +1,290 @@
+import os
+import json
+import time
+import hashlib
+import asyncio
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from flask import has_request_context
+
+try:
+    import fcntl
+except ImportError:  # Windows: the governor is shared between threads only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Shared by every worker process on the host
+STATE_FILE = os.environ.get('LINKEDIN_RATE_STATE_FILE', os.path.join(tempfile.gettempdir(), 'linkedin_rate_limits.json'))
+
+# Requests per minute per member (access token) and endpoint; writes are paced well below LinkedIn's commercial-use thresholds.
+# Override with LINKEDIN_RATE_BUDGETS='{"POST /v2/invitations": 4}'
+DEFAULT_BUDGET = 300
+ENDPOINT_BUDGETS = {
+    'POST /v2/invitations': 2,
+    'POST /v2/follows': 20,
+    'POST /v2/socialActions/{id}/likes': 20,
+    'POST /v2/socialActions/{id}/comments': 10,
+    'POST /v2/ugcPosts': 30,
+    **json.loads(os.environ.get('LINKEDIN_RATE_BUDGETS', '{}'))
+}
+
+# Requests per minute per endpoint for the whole application, across all members.
+# Override with LINKEDIN_APP_RATE_BUDGETS='{"POST /v2/invitations": 100}'
+DEFAULT_APP_BUDGET = float(os.environ.get('LINKEDIN_APP_RATE_DEFAULT_BUDGET', 3000))
+APP_ENDPOINT_BUDGETS = json.loads(os.environ.get('LINKEDIN_APP_RATE_BUDGETS', '{}'))
+
+# State key prefix of the application-wide buckets
+APP_KEY = 'app'
+
+# Backoff after a 429 without Retry-After: 2s, 4s, 8s ... capped
+BACKOFF_BASE = 2.0
+MAX_BACKOFF = 900.0
+
+# Longest a caller waits for a permit before RateLimitExceeded
+MAX_WAIT = float(os.environ.get('LINKEDIN_RATE_MAX_WAIT', 300))
+
+# Longest wait while serving a web request, well inside the web server's worker timeout; background jobs use MAX_WAIT
+REQUEST_MAX_WAIT = float(os.environ.get('LINKEDIN_RATE_REQUEST_MAX_WAIT', 10))
+
+# Waiters re-check at least this often, since other processes may learn new limits meanwhile
+POLL_INTERVAL = 5.0
+
+class RateLimitExceeded(Exception):
+    """No permit could be granted within the caller's wait limit"""
+    
+    def __init__(self, endpoint: str, wait: float):
+        super().__init__(f"Rate limit for {endpoint}: next permit in {wait:.0f}s")
+        self.endpoint = endpoint
+        self.wait = wait
+
+def _header_number(headers, name: str) -> Optional[float]:
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+def retry_after_seconds(headers, now: float) -> Optional[float]:
+    """Retry-After as delay-seconds or HTTP-date"""
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+    except (TypeError, ValueError):
+        return None
+
+def member_key(headers) -> Optional[str]:
+    """Short hash of the request's bearer token, naming the member's buckets without storing the token"""
+    authorization = (headers or {}).get('Authorization')
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode()).hexdigest()[:16]
+
+def rate_limited_result(retry_after: Optional[float], error: str) -> Dict:
+    """Result for an action refused by the governor or a 429: callers stop and retry later instead of recording a failure"""
+    return {'success': False, 'rate_limited': True, 'retry_after': retry_after, 'error': error}
+
+class RateLimitGovernor:
+    """Token buckets per (member, endpoint) plus an app-wide bucket per endpoint, and server-reported limits,
+    kept in a file-locked JSON state shared across processes. Requests without a member share the endpoint's bucket."""
+    
+    def __init__(self, state_path: str = STATE_FILE, budgets: Dict[str, float] = None, max_wait: float = MAX_WAIT,
+                 request_max_wait: float = REQUEST_MAX_WAIT, app_budgets: Dict[str, float] = None):
+        self.state_path = state_path
+        self.lock_path = f"{state_path}.lock"
+        self.budgets = dict(ENDPOINT_BUDGETS if budgets is None else budgets)
+        self.app_budgets = dict(APP_ENDPOINT_BUDGETS if app_budgets is None else app_budgets)
+        self.max_wait = max_wait
+        self.request_max_wait = request_max_wait
+        self.lock = threading.Lock()
+        self._state = {}
+        self._state_stamp = None  # (mtime_ns, size) of the file _state was read from
+    
+    def budget(self, endpoint: str) -> float:
+        return self.budgets.get(endpoint, DEFAULT_BUDGET)
+    
+    def app_budget(self, endpoint: str) -> float:
+        return self.app_budgets.get(endpoint, DEFAULT_APP_BUDGET)
+    
+    def _key_budget(self, key: str) -> float:
+        endpoint = key.split('|')[-1]
+        return self.app_budget(endpoint) if key.startswith(f"{APP_KEY}|") else self.budget(endpoint)
+    
+    def _keys(self, endpoint: str, member: Optional[str]):
+        """State keys of the caller's bucket and the app-wide bucket, with their budgets"""
+        own_key = f"{member}|{endpoint}" if member else endpoint
+        return [(own_key, self.budget(endpoint)), (f"{APP_KEY}|{endpoint}", self.app_budget(endpoint))]
+    
+    # Shared state
+    
+    def _read_state(self) -> Dict:
+        try:
+            stat = os.stat(self.state_path)
+        except FileNotFoundError:
+            return {}
+        
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._state_stamp:
+            try:
+                with open(self.state_path) as f:
+                    self._state = json.load(f)
+            except ValueError:
+                self._state = {}
+            self._state_stamp = stamp
+        return self._state
+    
+    def _write_state(self, state: Dict):
+        temp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.state_path)
+        stat = os.stat(self.state_path)
+        self._state, self._state_stamp = state, (stat.st_mtime_ns, stat.st_size)
+    
+    @contextmanager
+    def _locked_state(self):
+        """Read-modify-write the shared state under the thread lock and, where available, an exclusive flock"""
+        with self.lock:
+            if fcntl is None:
+                yield self._state
+                return
+            
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    state = self._read_state()
+                    yield state
+                    self._write_state(state)
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    # Permits
+    
+    def _bucket_wait(self, state: Dict, key: str, budget: float, now: float) -> float:
+        """Refill one bucket; return the seconds until it has a permit (0 if it has one now)"""
+        per_second = budget / 60
+        capacity = max(1.0, budget / 10)
+        entry = state.setdefault(key, {'tokens': capacity, 'updated': now, 'blocked_until': 0, 'strikes': 0})
+        
+        entry['tokens'] = min(capacity, entry['tokens'] + (now - entry['updated']) * per_second)
+        entry['updated'] = now
+        
+        if entry.get('reset_at') and entry['reset_at'] <= now:
+            entry['remaining'] = entry['reset_at'] = None
+        
+        wait = entry['blocked_until'] - now
+        if entry.get('remaining') is not None and entry['remaining'] <= 0:
+            wait = max(wait, entry['reset_at'] - now)
+        if entry['tokens'] < 1:
+            wait = max(wait, (1 - entry['tokens']) / per_second)
+        return max(wait, 0.0)
+    
+    def _reserve(self, state: Dict, endpoint: str, member: Optional[str], now: float) -> float:
+        """Take a permit from both the caller's and the app-wide bucket if both have one; otherwise return the seconds until they may"""
+        buckets = self._keys(endpoint, member)
+        wait = max(self._bucket_wait(state, key, budget, now) for key, budget in buckets)
+        if wait > 0:
+            return wait
+        
+        for key, _ in buckets:
+            entry = state[key]
+            entry['tokens'] -= 1
+            if entry.get('remaining') is not None:
+                entry['remaining'] -= 1
+        return 0.0
+    
+    def _next_wait(self, endpoint: str, member: Optional[str], waited: float, max_wait: Optional[float]) -> float:
+        with self._locked_state() as state:
+            wait = self._reserve(state, endpoint, member, time.time())
+        
+        limit = max_wait
+        if limit is None:
+            limit = self.request_max_wait if has_request_context() else self.max_wait
+        if wait > 0 and waited + wait > limit:
+            raise RateLimitExceeded(endpoint, wait)
+        return min(wait, POLL_INTERVAL)
+    
+    def acquire(self, endpoint: str, max_wait: float = None, member: str = None) -> float:
+        """Block until the member may call the endpoint, for at most max_wait seconds (default depends on request context); returns the seconds waited"""
+        waited = 0.0
+        while True:
+            wait = self._next_wait(endpoint, member, waited, max_wait)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+    
+    async def acquire_async(self, endpoint: str, max_wait: float = None, member: str = None) -> float:
+        """acquire without blocking the event loop"""
+        waited = 0.0
+        while True:
+            wait = self._next_wait(endpoint, member, waited, max_wait)
+            if wait <= 0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+    
+    def observe(self, endpoint: str, status_code: Optional[int], headers, member: str = None) -> None:
+        """Learn from a response: rate-limit headers update the member's budget, 429 blocks the endpoint for that member only"""
+        if status_code is None:
+            return
+        
+        now = time.time()
+        remaining = _header_number(headers, 'X-RateLimit-Remaining')
+        reset = _header_number(headers, 'X-RateLimit-Reset')
+        retry_after = retry_after_seconds(headers, now) if status_code == 429 else None
+        
+        with self._locked_state() as state:
+            key, budget = self._keys(endpoint, member)[0]
+            self._bucket_wait(state, key, budget, now)  # refills, or creates the bucket of a member not seen before
+            entry = state[key]
+            
+            if remaining is not None and reset is not None:
+                entry['remaining'] = remaining
+                entry['reset_at'] = reset if reset > 1e9 else now + reset  # epoch seconds or delta
+                entry['limit'] = _header_number(headers, 'X-RateLimit-Limit')
+            
+            if status_code == 429:
+                entry['strikes'] += 1
+                delay = retry_after if retry_after is not None else min(BACKOFF_BASE * 2 ** (entry['strikes'] - 1), MAX_BACKOFF)
+                entry['blocked_until'] = max(entry['blocked_until'], now + delay)
+                entry['tokens'] = 0
+                logger.warning(f"{endpoint} throttled by LinkedIn, pausing {delay:.0f}s")
+            elif status_code < 400:
+                entry['strikes'] = 0
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """Current budget and block state per bucket: 'endpoint', 'member|endpoint' or 'app|endpoint'"""
+        now = time.time()
+        with self._locked_state() as state:
+            return {
+                key: {
+                    'budget_per_minute': self._key_budget(key),
+                    'tokens': round(entry['tokens'], 2),
+                    'blocked_for_s': round(max(0.0, entry['blocked_until'] - now), 1),
+                    'remaining': entry.get('remaining'),
+                    'limit': entry.get('limit'),
+                    'strikes': entry['strikes']
+                }
+                for key, entry in state.items()
+            }
+    
+    def reset(self, endpoint: str = None):
+        """Forget learned limits for one endpoint (every member's and the app-wide bucket), or all"""
+        with self._locked_state() as state:
+            if endpoint:
+                for key in [key for key in state if key.split('|')[-1] == endpoint]:
+                    del state[key]
+            else:
+                state.clear()
+
+# Global governor shared by the HTTP clients
+rate_governor = RateLimitGovernor()
@@ -3,12 +3,19 @@ import logging
 from datetime import datetime
 from flask import render_template, request, jsonify, current_app, g, Blueprint, redirect, session
 from extensions import db, limiter
-from models import User, Post, UploadedFile, AutomationRule, MarketingCampaign, LinkedInProfile
+from models import User, Post, UploadedFile, AutomationRule, MarketingCampaign, LinkedInProfile, AutomationJob
 from gemini_service import generate_linkedin_post, generate_image_with_gemini
 from stability_service import generate_image_with_stability
-from pdf_service import process_pdf_file
+from document_service import save_uploaded_document, DOCUMENT_EXTENSIONS
+from ingestion_service import ingestion_worker
+from automation_jobs import automation_executor
 from linkedin_service import linkedin_service
 from linkedin_automation import linkedin_automation
+from rule_criteria import rule_criteria
+from http_client import http_client
+from asset_service import send_upload
+from search_service import search, SEARCH_TYPES
+from keyword_service import brief_for_upload, brief_for_text
 
 logger = logging.getLogger(__name__)
 
@@ -163,8 +170,9 @@ def register_routes(app):
             }), 500
 
     @app.route('/api/upload-pdf', methods=['POST'])
+    @app.route('/api/upload-document', methods=['POST'])
     def upload_pdf():
-        """Handle PDF file upload and processing"""
+        """Accept a PDF, DOCX, XLSX or TXT upload and queue it for background processing"""
         try:
             if 'file' not in request.files:
                 return jsonify({'success': False, 'error': 'No file uploaded'}), 400
@@ -173,41 +181,90 @@ def register_routes(app):
             if file.filename == '':
                 return jsonify({'success': False, 'error': 'No file selected'}), 400
             
-            # Process the PDF
-            result = process_pdf_file(file, current_app.config['UPLOAD_FOLDER'])
-            
-            if result['success']:
-                # Save to database
-                uploaded_file = UploadedFile()
-                uploaded_file.filename = result['filename']
-                uploaded_file.original_filename = result['original_filename']
-                uploaded_file.file_path = result['file_path']
-                uploaded_file.file_size = result['file_size']
-                uploaded_file.mime_type = 'application/pdf'
-                uploaded_file.extracted_text = result['extracted_text']
-                uploaded_file.summary = result['summary']
-                uploaded_file.processed = True
-                
-                db.session.add(uploaded_file)
-                db.session.commit()
-                
+            # Save the document; extraction and summarization run in the ingestion worker
+            allowed_extensions = DOCUMENT_EXTENSIONS & current_app.config['ALLOWED_EXTENSIONS']
+            try:
+                saved = save_uploaded_document(file, current_app.config['UPLOAD_FOLDER'], allowed_extensions)
+            except Exception as e:
+                return jsonify({'success': False, 'error': str(e), 'message': f'Failed to upload document: {str(e)}'}), 400
+            
+            # Identical content already uploaded: reuse its text, summary and keywords
+            existing = UploadedFile.query.filter(
+                UploadedFile.user_id == g.current_user.id,
+                UploadedFile.content_hash == saved['content_hash'],
+                UploadedFile.processing_status != 'failed'
+            ).order_by(UploadedFile.id).first()
+            
+            if existing:
+                completed = existing.processing_status == 'completed'
                 return jsonify({
                     'success': True,
-                    'file_id': uploaded_file.id,
-                    'summary': result['summary'],
-                    'message': result['message']
-                })
-            else:
-                return jsonify(result), 400
+                    'file_id': existing.id,
+                    'duplicate': True,
+                    'processing_status': existing.processing_status,
+                    'status_url': f'/api/uploads/{existing.id}/status',
+                    'summary': existing.summary if completed else None,
+                    'message': 'Identical document already uploaded, reusing its results'
+                }), 200 if completed else 202
+            
+            uploaded_file = UploadedFile(
+                user_id=g.current_user.id,
+                filename=saved['filename'],
+                original_filename=saved['original_filename'],
+                file_path=saved['file_path'],
+                file_size=saved['file_size'],
+                mime_type=saved['mime_type'],
+                file_type=saved['file_type'],
+                content_hash=saved['content_hash'],
+                processed=False,
+                processing_status='pending'
+            )
+            
+            db.session.add(uploaded_file)
+            db.session.commit()
+            
+            ingestion_worker.enqueue(uploaded_file.id)
+            
+            return jsonify({
+                'success': True,
+                'file_id': uploaded_file.id,
+                'duplicate': False,
+                'processing_status': uploaded_file.processing_status,
+                'status_url': f'/api/uploads/{uploaded_file.id}/status',
+                'message': 'Document uploaded, processing started'
+            }), 202
                 
         except Exception as e:
             logging.error(f"Error in upload_pdf: {str(e)}")
             return jsonify({
                 'success': False,
                 'error': str(e),
-                'message': 'Failed to process PDF'
+                'message': 'Failed to process document'
             }), 500
 
+    @app.route('/api/uploads/<int:file_id>/status', methods=['GET'])
+    def upload_status(file_id):
+        """Report processing status and progress for an uploaded file"""
+        try:
+            uploaded_file = UploadedFile.query.filter_by(id=file_id, user_id=g.current_user.id).first()
+            if not uploaded_file:
+                return jsonify({'success': False, 'error': 'File not found'}), 404
+            
+            return jsonify({
+                'success': True,
+                'file_id': uploaded_file.id,
+                'duplicate': 'reused_from' in (uploaded_file.processing_progress or {}),
+                'processing_status': uploaded_file.processing_status,
+                'progress': uploaded_file.processing_progress or {},
+                'error': uploaded_file.processing_error,
+                'summary': uploaded_file.summary if uploaded_file.processing_status == 'completed' else None,
+                'keywords': uploaded_file.keywords or []
+            })
+            
+        except Exception as e:
+            logger.error(f"Error fetching upload status: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
     # Post Management Routes
     @app.route('/api/create-post', methods=['POST'])
     @limiter.limit("30 per hour")
@@ -321,6 +378,33 @@ def register_routes(app):
                 'message': 'Failed to fetch posts'
             }), 500
 
+    @app.route('/api/search', methods=['GET'])
+    def search_content():
+        """Full-text search over posts and uploaded documents"""
+        try:
+            query = request.args.get('q', '').strip()
+            search_type = request.args.get('type', 'all')
+            limit = min(request.args.get('limit', 20, type=int), 100)
+            
+            if not query:
+                return jsonify({'success': False, 'error': 'Search query is required'}), 400
+            
+            if search_type not in SEARCH_TYPES:
+                return jsonify({'success': False, 'error': f'type must be one of: {", ".join(sorted(SEARCH_TYPES))}'}), 400
+            
+            result = search(g.current_user.id, query, search_type, limit)
+            
+            return jsonify({
+                'success': True,
+                'query': query,
+                'results': result['results'],
+                'took_ms': result['took_ms']
+            })
+            
+        except Exception as e:
+            logger.error(f"Error in search_content: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
     @app.route('/api/stats', methods=['GET'])
     def get_stats():
         """Get posting statistics"""
@@ -350,18 +434,27 @@ def register_routes(app):
 
     @app.route('/static/uploads/<filename>')
     def uploaded_file(filename):
-        """Serve uploaded files"""
-        from flask import send_from_directory
-        return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
+        """Serve uploaded files with caching, conditional GET and range support"""
+        return send_upload(current_app.config['UPLOAD_FOLDER'], filename)
 
 # Automation API Endpoints
 
+    def queue_automation_job(job_type, params=None):
+        """Queue an automation job and answer 202 with where to poll it"""
+        job = automation_executor.submit(g.current_user.id, job_type, params)
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': f'/api/automation/jobs/{job.id}',
+            'message': 'Automation job queued'
+        }), 202
+
     @app.route('/api/automation/accept-connections', methods=['POST'])
     def auto_accept_connections():
         """Auto-accept all pending connection requests"""
         try:
-            result = linkedin_automation.auto_accept_connections()
-            return jsonify(result)
+            return queue_automation_job('accept_connections')
         except Exception as e:
             logging.error(f"Error in auto_accept_connections: {str(e)}")
             return jsonify({'success': False, 'error': str(e)}), 500
@@ -374,8 +467,7 @@ def register_routes(app):
             target_profiles = data.get('target_profiles', [])
             message = data.get('message', '')
             
-            result = linkedin_automation.auto_send_connections(target_profiles, message)
-            return jsonify(result)
+            return queue_automation_job('send_connections', {'target_profiles': target_profiles, 'message': message})
         except Exception as e:
             logging.error(f"Error in auto_send_connections: {str(e)}")
             return jsonify({'success': False, 'error': str(e)}), 500
@@ -387,8 +479,7 @@ def register_routes(app):
             data = request.get_json()
             criteria = data.get('criteria', {})
             
-            result = linkedin_automation.auto_follow_successful_people(criteria)
-            return jsonify(result)
+            return queue_automation_job('follow_successful', {'criteria': criteria})
         except Exception as e:
             logging.error(f"Error in auto_follow_successful: {str(e)}")
             return jsonify({'success': False, 'error': str(e)}), 500
@@ -400,12 +491,56 @@ def register_routes(app):
             data = request.get_json()
             keywords = data.get('keywords', [])
             
-            result = linkedin_automation.auto_engage_with_posts(keywords)
-            return jsonify(result)
+            return queue_automation_job('engage_posts', {'keywords': keywords})
         except Exception as e:
             logging.error(f"Error in auto_engage_posts: {str(e)}")
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @app.route('/api/automation/jobs', methods=['GET'])
+    def list_automation_jobs():
+        """Most recent automation jobs"""
+        try:
+            limit = min(request.args.get('limit', 20, type=int), 100)
+            jobs = AutomationJob.query.filter_by(user_id=g.current_user.id).order_by(
+                AutomationJob.id.desc()
+            ).limit(limit).all()
+            return jsonify({'success': True, 'jobs': [job.to_dict() for job in jobs]})
+        except Exception as e:
+            logging.error(f"Error listing automation jobs: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/automation/jobs/<int:job_id>', methods=['GET'])
+    def automation_job_status(job_id):
+        """Progress and result of an automation job"""
+        job = AutomationJob.query.filter_by(id=job_id, user_id=g.current_user.id).first()
+        if not job:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({'success': True, 'job': job.to_dict()})
+
+    @app.route('/api/automation/jobs/<int:job_id>/cancel', methods=['POST'])
+    def cancel_automation_job(job_id):
+        """Cancel a queued or paused job, or stop a running one after its current target"""
+        job = AutomationJob.query.filter_by(id=job_id, user_id=g.current_user.id).first()
+        if not job:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        if job.status not in ('queued', 'running', 'paused'):
+            return jsonify({'success': False, 'error': f'Job is already {job.status}'}), 409
+        
+        job = automation_executor.cancel(job)
+        return jsonify({'success': True, 'job': job.to_dict()})
+
+    @app.route('/api/automation/jobs/<int:job_id>/resume', methods=['POST'])
+    def resume_automation_job(job_id):
+        """Requeue a cancelled, failed or rate-limit paused job from where it stopped"""
+        job = AutomationJob.query.filter_by(id=job_id, user_id=g.current_user.id).first()
+        if not job:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        if job.status not in ('cancelled', 'failed', 'paused'):
+            return jsonify({'success': False, 'error': f'Job is {job.status}'}), 409
+        
+        job = automation_executor.resume(job)
+        return jsonify({'success': True, 'job': job.to_dict(), 'status_url': f'/api/automation/jobs/{job.id}'}), 202
+
     @app.route('/api/marketing/create-campaign', methods=['POST'])
     def create_marketing_campaign():
         """Create a marketing campaign from PDF content"""
@@ -421,17 +556,22 @@ def register_routes(app):
             
             # Get PDF content if provided
             pdf_content = ""
+            pdf_keywords = None
             if pdf_id:
-                pdf_file = UploadedFile.query.get(pdf_id)
+                pdf_file = UploadedFile.query.filter_by(id=pdf_id, user_id=g.current_user.id).first()
                 if not pdf_file:
                     return jsonify({'success': False, 'error': 'PDF not found'}), 404
-                pdf_content = pdf_file.extracted_text or pdf_file.summary or ""
+                # Keyphrases and summary instead of the full extracted text
+                pdf_content = brief_for_upload(pdf_file)
+                pdf_keywords = pdf_file.keywords
             else:
                 # Use product info for content generation
                 pdf_content = f"Product: {product_info.get('name', '')}. Keywords: {', '.join(target_keywords)}"
             
             # Create marketing campaign
             campaign = MarketingCampaign()
+            campaign.user_id = g.current_user.id
+            campaign.name = campaign_name
             campaign.campaign_name = campaign_name
             campaign.product_name = product_info.get('name', '')
             campaign.source_pdf_id = pdf_id
@@ -444,13 +584,15 @@ def register_routes(app):
             # Schedule marketing posts
             result = linkedin_automation.schedule_marketing_campaign(
                 pdf_content, 
-                product_info
+                product_info,
+                keywords=pdf_keywords
             )
             
             if result['success']:
                 # Create scheduled posts
                 for post_data in result['posts']:
                     post = Post()
+                    post.user_id = g.current_user.id
                     post.content = post_data['content']
                     post.schedule_time = post_data['schedule_time']
                     post.status = 'scheduled'
@@ -590,6 +732,20 @@ def register_routes(app):
                 'error': str(e)
             }), 500
     
+    @app.route('/api/system/http-metrics', methods=['GET'])
+    def http_metrics():
+        """Per-endpoint latency and rate-limit state of outbound API calls"""
+        try:
+            return jsonify({
+                'success': True,
+                'endpoints': http_client.get_metrics(),
+                'rate_limits': http_client.governor.snapshot() if http_client.governor else {}
+            })
+            
+        except Exception as e:
+            logger.error(f"Error getting HTTP metrics: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+    
     # Marketing Manager Routes
     @app.route('/api/marketing/manager/dashboard', methods=['GET'])
     def marketing_manager_dashboard():
@@ -635,7 +791,7 @@ def register_routes(app):
                         'total': total_reach,
                         'average': total_reach / max(total_campaigns, 1)
                     },
-                    'automation': automation_stats.get('data', {}) if automation_stats['success'] else {},
+                    'automation': automation_stats if automation_stats['success'] else {},
                     'recent_campaigns': [campaign.to_dict() for campaign in recent_campaigns]
                 }
             })
@@ -768,14 +924,22 @@ def register_routes(app):
                 return jsonify({'success': False, 'error': 'Campaign not found'}), 404
             
             data = request.get_json()
-            pdf_content = data.get('pdf_content', '')
+            pdf_content = brief_for_text(data.get('pdf_content', ''))
             product_info = data.get('product_info', {})
+            pdf_keywords = None
+            
+            if not pdf_content and data.get('pdf_id'):
+                pdf_file = UploadedFile.query.filter_by(id=data['pdf_id'], user_id=user_id).first()
+                if pdf_file:
+                    pdf_content = brief_for_upload(pdf_file)
+                    pdf_keywords = pdf_file.keywords
             
             # Generate campaign posts
             result = linkedin_automation.schedule_marketing_campaign(
                 pdf_content, 
                 product_info,
-                campaign_id
+                campaign_id,
+                keywords=pdf_keywords
             )
             
             if result['success']:
@@ -846,6 +1010,7 @@ def register_routes(app):
                 
                 db.session.add(rule)
                 db.session.commit()
+                linkedin_automation.invalidate_statistics()
                 
                 return jsonify({
                     'success': True,
@@ -884,6 +1049,8 @@ def register_routes(app):
                 
                 rule.updated_at = datetime.utcnow()
                 db.session.commit()
+                rule_criteria.invalidate(rule_id)
+                linkedin_automation.invalidate_statistics()
                 
                 return jsonify({
                     'success': True,
@@ -894,6 +1061,8 @@ def register_routes(app):
             elif request.method == 'DELETE':
                 db.session.delete(rule)
                 db.session.commit()
+                rule_criteria.invalidate(rule_id)
+                linkedin_automation.invalidate_statistics()
                 
                 return jsonify({
                     'success': True,
@@ -918,38 +1087,31 @@ def register_routes(app):
                     return jsonify({'success': False, 'error': 'Rule not found or inactive'}), 404
                 
                 if rule.rule_type == 'auto_connect':
-                    target_profiles = data.get('target_profiles', [])
-                    result = linkedin_automation.auto_send_connections(
-                        target_profiles, 
-                        rule.action_template,
-                        rule_id
-                    )
+                    return queue_automation_job('send_connections', {
+                        'target_profiles': data.get('target_profiles', []),
+                        'message': rule.action_template,
+                        'automation_rule_id': rule_id
+                    })
                 elif rule.rule_type == 'auto_follow':
-                    result = linkedin_automation.auto_follow_successful_people(
-                        rule.target_criteria,
-                        rule_id
-                    )
+                    return queue_automation_job('follow_successful', {
+                        'criteria': rule.target_criteria,
+                        'automation_rule_id': rule_id
+                    })
                 elif rule.rule_type == 'auto_like' or rule.rule_type == 'auto_comment':
-                    keywords = rule.target_criteria.get('keywords', [])
-                    result = linkedin_automation.auto_engage_with_posts(
-                        keywords,
-                        rule_id
-                    )
+                    return queue_automation_job('engage_posts', {
+                        'keywords': list(rule_criteria.get(rule).post_terms),
+                        'automation_rule_id': rule_id
+                    })
                 else:
                     return jsonify({'success': False, 'error': 'Unknown rule type'}), 400
-                
-                return jsonify(result)
             
             elif rule_type == 'accept_connections':
-                result = linkedin_automation.auto_accept_connections()
+                return queue_automation_job('accept_connections')
             elif rule_type == 'auto_engage':
-                keywords = data.get('keywords', [])
-                result = linkedin_automation.auto_engage_with_posts(keywords)
+                return queue_automation_job('engage_posts', {'keywords': data.get('keywords', [])})
             else:
                 return jsonify({'success': False, 'error': 'Rule type or rule_id required'}), 400
             
-            return jsonify(result)
-            
         except Exception as e:
             logger.error(f"Error executing automation: {str(e)}")
             return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,81 @@
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List
+from profile_scoring import ProfileScorer, criteria_terms
+
+# Rules whose compiled criteria are kept in memory
+MAX_COMPILED_RULES = 256
+
+# People-search parameters and the criteria keys they are built from
+SEARCH_PARAMS = {
+    'keywords': ('keywords',),
+    'title': ('job_titles', 'title'),
+    'industry': ('industries', 'industry'),
+    'location': ('locations', 'location')
+}
+
+class CompiledCriteria:
+    """A target_criteria blob parsed once into the search parameters, terms and profile scorer automation uses"""
+    
+    def __init__(self, criteria: Dict):
+        self.source = dict(criteria or {})
+        self.keywords = criteria_terms(self.source, 'keywords')
+        self.hashtags = criteria_terms(self.source, 'hashtags')
+        self.post_terms = tuple(dict.fromkeys(self.keywords + self.hashtags))
+        self.profile_scorer = ProfileScorer(self.source)
+        
+        self.search_params = {}
+        for param, keys in SEARCH_PARAMS.items():
+            terms = criteria_terms(self.source, *keys)
+            if terms:
+                self.search_params[param] = ','.join(terms)
+    
+    def rank_profiles(self, profiles: List[Dict], k: int = None, require=()) -> List[Dict]:
+        return self.profile_scorer.top_k(profiles, k, require=require)
+
+@lru_cache(maxsize=512)
+def _compile_json(criteria_json: str) -> CompiledCriteria:
+    return CompiledCriteria(json.loads(criteria_json))
+
+def compile_criteria(criteria: Dict) -> CompiledCriteria:
+    """Compiled criteria for an ad-hoc blob, shared by every caller passing equal criteria"""
+    return _compile_json(json.dumps(criteria or {}, sort_keys=True, default=str))
+
+class RuleCriteriaCache:
+    """Compiled target_criteria per rule id, reused until the rule's updated_at moves"""
+    
+    def __init__(self, max_rules: int = MAX_COMPILED_RULES):
+        self.max_rules = max_rules
+        self.entries = OrderedDict()  # rule id -> (updated_at, CompiledCriteria)
+        self.lock = threading.Lock()
+    
+    def get(self, rule) -> CompiledCriteria:
+        with self.lock:
+            entry = self.entries.get(rule.id)
+            if entry and entry[0] == rule.updated_at:
+                self.entries.move_to_end(rule.id)
+                return entry[1]
+        
+        # updated_at also moves when only run statistics change; keep the compiled object if the criteria did not
+        criteria = rule.target_criteria or {}
+        compiled = entry[1] if entry and entry[1].source == criteria else compile_criteria(criteria)
+        
+        with self.lock:
+            self.entries[rule.id] = (rule.updated_at, compiled)
+            self.entries.move_to_end(rule.id)
+            while len(self.entries) > self.max_rules:
+                self.entries.popitem(last=False)
+        return compiled
+    
+    def invalidate(self, rule_id: int = None):
+        """Forget one rule's compiled criteria, or all"""
+        with self.lock:
+            if rule_id is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(rule_id, None)
+
+# Global compiled rule criteria cache
+rule_criteria = RuleCriteriaCache()
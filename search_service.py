@@ -0,0 +1,231 @@
+import re
+import html
+import time
+import logging
+from typing import Dict, List
+from sqlalchemy import text
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TYPES = {'all', 'posts', 'documents'}
+
+# Private-use code points mark matches in snippets, so <mark> is only added after the user's text is escaped
+MARK_START, MARK_STOP = '\ue000', '\ue001'
+
+# Postgres caps a tsvector at 1MB, so documents are indexed on a bounded prefix
+PG_DOCUMENT_TEXT_CHARS = 500000
+
+PG_POST_VECTOR = "to_tsvector('english', coalesce(content, ''))"
+PG_DOCUMENT_VECTOR = (
+    "to_tsvector('english', coalesce(original_filename, '') || ' ' || coalesce(summary, '') || ' ' || "
+    f"left(coalesce(extracted_text, ''), {PG_DOCUMENT_TEXT_CHARS}))"
+)
+
+SQLITE_SCHEMA = [
+    # External-content FTS5 tables: rowid is the source row id, text lives only in the source table
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "content, content='posts', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS uploaded_files_fts USING fts5("
+    "original_filename, summary, extracted_text, content='uploaded_files', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, content) VALUES (new.id, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF content ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "INSERT INTO posts_fts(rowid, content) VALUES (new.id, new.content); END",
+    
+    "CREATE TRIGGER IF NOT EXISTS uploaded_files_fts_insert AFTER INSERT ON uploaded_files BEGIN "
+    "INSERT INTO uploaded_files_fts(rowid, original_filename, summary, extracted_text) "
+    "VALUES (new.id, new.original_filename, new.summary, new.extracted_text); END",
+    "CREATE TRIGGER IF NOT EXISTS uploaded_files_fts_delete AFTER DELETE ON uploaded_files BEGIN "
+    "INSERT INTO uploaded_files_fts(uploaded_files_fts, rowid, original_filename, summary, extracted_text) "
+    "VALUES ('delete', old.id, old.original_filename, old.summary, old.extracted_text); END",
+    "CREATE TRIGGER IF NOT EXISTS uploaded_files_fts_update "
+    "AFTER UPDATE OF original_filename, summary, extracted_text ON uploaded_files BEGIN "
+    "INSERT INTO uploaded_files_fts(uploaded_files_fts, rowid, original_filename, summary, extracted_text) "
+    "VALUES ('delete', old.id, old.original_filename, old.summary, old.extracted_text); "
+    "INSERT INTO uploaded_files_fts(rowid, original_filename, summary, extracted_text) "
+    "VALUES (new.id, new.original_filename, new.summary, new.extracted_text); END"
+]
+
+POSTGRES_SCHEMA = [
+    f"CREATE INDEX IF NOT EXISTS ix_posts_content_fts ON posts USING GIN ({PG_POST_VECTOR})",
+    f"CREATE INDEX IF NOT EXISTS ix_uploaded_files_text_fts ON uploaded_files USING GIN ({PG_DOCUMENT_VECTOR})"
+]
+
+def init_search_index():
+    """Create the full-text index for the current database and backfill it on first creation"""
+    dialect = db.engine.dialect.name
+    
+    try:
+        with db.engine.begin() as connection:
+            if dialect == 'sqlite':
+                existing = connection.execute(
+                    text("SELECT name FROM sqlite_master WHERE name IN ('posts_fts', 'uploaded_files_fts')")
+                ).scalars().all()
+                
+                for statement in SQLITE_SCHEMA:
+                    connection.execute(text(statement))
+                
+                # Index rows written before the FTS tables existed
+                if 'posts_fts' not in existing:
+                    connection.execute(text("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')"))
+                if 'uploaded_files_fts' not in existing:
+                    connection.execute(text("INSERT INTO uploaded_files_fts(uploaded_files_fts) VALUES ('rebuild')"))
+            
+            elif dialect == 'postgresql':
+                for statement in POSTGRES_SCHEMA:
+                    connection.execute(text(statement))
+    
+    except Exception as e:
+        logger.error(f"Error initializing search index: {str(e)}")
+
+def _highlight(fragment: str) -> str:
+    """HTML-escape a snippet, then turn its match markers into <mark> tags"""
+    return html.escape(fragment or '').replace(MARK_START, '<mark>').replace(MARK_STOP, '</mark>')
+
+def _fts5_query(query: str) -> str:
+    """Turn free text into a safe FTS5 query: every term quoted, all terms required, last term prefix-matched"""
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return ''
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+def _search_sqlite(user_id: int, query: str, search_type: str, limit: int) -> List[Dict]:
+    match = _fts5_query(query)
+    if not match:
+        return []
+    
+    results = []
+    if search_type in ('all', 'posts'):
+        rows = db.session.execute(text(
+            "SELECT p.id, p.status, snippet(posts_fts, 0, :mark_start, :mark_stop, '…', 16) AS snippet, "
+            "bm25(posts_fts) AS rank "
+            "FROM posts_fts JOIN posts p ON p.id = posts_fts.rowid "
+            "WHERE posts_fts MATCH :match AND p.user_id = :user_id "
+            "ORDER BY rank LIMIT :limit"
+        ), {'match': match, 'user_id': user_id, 'limit': limit, 'mark_start': MARK_START, 'mark_stop': MARK_STOP})
+        
+        results.extend({
+            'type': 'post',
+            'id': row.id,
+            'title': f"Post #{row.id} ({row.status})",
+            'snippet': _highlight(row.snippet),
+            'score': -row.rank  # bm25() is lower-is-better
+        } for row in rows)
+    
+    if search_type in ('all', 'documents'):
+        rows = db.session.execute(text(
+            "SELECT f.id, f.original_filename, "
+            "snippet(uploaded_files_fts, -1, :mark_start, :mark_stop, '…', 16) AS snippet, "
+            "bm25(uploaded_files_fts, 5.0, 2.0, 1.0) AS rank "
+            "FROM uploaded_files_fts JOIN uploaded_files f ON f.id = uploaded_files_fts.rowid "
+            "WHERE uploaded_files_fts MATCH :match AND f.user_id = :user_id "
+            "ORDER BY rank LIMIT :limit"
+        ), {'match': match, 'user_id': user_id, 'limit': limit, 'mark_start': MARK_START, 'mark_stop': MARK_STOP})
+        
+        results.extend({
+            'type': 'document',
+            'id': row.id,
+            'title': row.original_filename,
+            'snippet': _highlight(row.snippet),
+            'score': -row.rank
+        } for row in rows)
+    
+    return results
+
+def _search_postgres(user_id: int, query: str, search_type: str, limit: int) -> List[Dict]:
+    params = {
+        'query': query, 'user_id': user_id, 'limit': limit,
+        'headline_options': f'StartSel={MARK_START}, StopSel={MARK_STOP}, MaxWords=24, MinWords=8'
+    }
+    results = []
+    
+    if search_type in ('all', 'posts'):
+        rows = db.session.execute(text(
+            f"SELECT id, status, ts_headline('english', content, q, :headline_options) AS snippet, "
+            f"ts_rank_cd({PG_POST_VECTOR}, q) AS rank "
+            f"FROM posts, websearch_to_tsquery('english', :query) q "
+            f"WHERE {PG_POST_VECTOR} @@ q AND user_id = :user_id "
+            f"ORDER BY rank DESC LIMIT :limit"
+        ), params)
+        
+        results.extend({
+            'type': 'post',
+            'id': row.id,
+            'title': f"Post #{row.id} ({row.status})",
+            'snippet': _highlight(row.snippet),
+            'score': float(row.rank)
+        } for row in rows)
+    
+    if search_type in ('all', 'documents'):
+        rows = db.session.execute(text(
+            f"SELECT id, original_filename, "
+            f"ts_headline('english', coalesce(summary, '') || ' ' || left(coalesce(extracted_text, ''), 20000), "
+            f"q, :headline_options) AS snippet, "
+            f"ts_rank_cd({PG_DOCUMENT_VECTOR}, q) AS rank "
+            f"FROM uploaded_files, websearch_to_tsquery('english', :query) q "
+            f"WHERE {PG_DOCUMENT_VECTOR} @@ q AND user_id = :user_id "
+            f"ORDER BY rank DESC LIMIT :limit"
+        ), params)
+        
+        results.extend({
+            'type': 'document',
+            'id': row.id,
+            'title': row.original_filename,
+            'snippet': _highlight(row.snippet),
+            'score': float(row.rank)
+        } for row in rows)
+    
+    return results
+
+def _search_like(user_id: int, query: str, search_type: str, limit: int) -> List[Dict]:
+    """Unranked fallback for databases without a full-text backend"""
+    from models import Post, UploadedFile
+    
+    pattern = f"%{query}%"
+    results = []
+    
+    if search_type in ('all', 'posts'):
+        posts = Post.query.filter(Post.user_id == user_id, Post.content.ilike(pattern)).limit(limit).all()
+        results.extend({
+            'type': 'post', 'id': post.id, 'title': f"Post #{post.id} ({post.status})",
+            'snippet': html.escape(post.content[:200]), 'score': 0.0
+        } for post in posts)
+    
+    if search_type in ('all', 'documents'):
+        files = UploadedFile.query.filter(
+            UploadedFile.user_id == user_id, UploadedFile.extracted_text.ilike(pattern)
+        ).limit(limit).all()
+        results.extend({
+            'type': 'document', 'id': uploaded.id, 'title': uploaded.original_filename,
+            'snippet': html.escape((uploaded.summary or '')[:200]), 'score': 0.0
+        } for uploaded in files)
+    
+    return results
+
+def search(user_id: int, query: str, search_type: str = 'all', limit: int = 20) -> Dict:
+    """Full-text search over the user's posts and uploaded documents, best matches first"""
+    started = time.perf_counter()
+    query = (query or '').strip()
+    dialect = db.engine.dialect.name
+    
+    if dialect == 'sqlite':
+        results = _search_sqlite(user_id, query, search_type, limit)
+    elif dialect == 'postgresql':
+        results = _search_postgres(user_id, query, search_type, limit)
+    else:
+        results = _search_like(user_id, query, search_type, limit)
+    
+    results.sort(key=lambda result: result['score'], reverse=True)
+    
+    return {
+        'results': results[:limit],
+        'took_ms': round((time.perf_counter() - started) * 1000, 2)
+    }
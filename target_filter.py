@@ -0,0 +1,143 @@
+import os
+import math
+import hashlib
+import logging
+import threading
+import numpy as np
+from typing import Callable, Iterable, List, Optional
+from sqlalchemy import select
+from extensions import db
+from action_log_writer import action_log_writer
+from models import ActionLog
+
+logger = logging.getLogger(__name__)
+
+# Distinct (user, action, target) keys the filter is sized for; it is rebuilt twice as large when outgrown
+CAPACITY = int(os.environ.get('ACTIONED_FILTER_CAPACITY', 1000000))
+
+# Share of never-actioned targets that fall through to the database check
+ERROR_RATE = float(os.environ.get('ACTIONED_FILTER_ERROR_RATE', 0.01))
+
+# Rows streamed per batch when loading action logs; targets per IN (...) when confirming in the database
+LOAD_BATCH = 10000
+QUERY_BATCH = 500
+
+# Action types that each mean "a connection request was sent"; auto_follow rules send connection requests
+CONNECTION_ACTIONS = ('connections', 'auto_follow')
+FOLLOW_ACTIONS = ('follows',)
+
+def _key(user_id: int, action_type: str, target: str) -> bytes:
+    return f"{user_id}\x1f{action_type}\x1f{target}".encode()
+
+class BloomFilter:
+    """Fixed-size Bloom filter over a packed NumPy bit array, probed with double hashing"""
+    
+    def __init__(self, capacity: int, error_rate: float = ERROR_RATE):
+        self.capacity = capacity
+        self.num_bits = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+        self.count = 0
+        self._probes = np.arange(self.num_hashes, dtype=np.uint64)
+    
+    def _positions(self, keys: List[bytes]) -> np.ndarray:
+        """(len(keys), num_hashes) bit positions: h1 + i * h2 mod m, from one 128-bit digest per key"""
+        digests = b''.join(hashlib.blake2b(key, digest_size=16).digest() for key in keys)
+        halves = np.frombuffer(digests, dtype='<u8').reshape(-1, 2)
+        return (halves[:, :1] + self._probes * halves[:, 1:]) % np.uint64(self.num_bits)
+    
+    def add(self, keys: List[bytes]):
+        if not keys:
+            return
+        positions = self._positions(keys).ravel()
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+        self.count += len(keys)
+    
+    def contains(self, keys: List[bytes]) -> np.ndarray:
+        """Boolean array: False means definitely absent, True means probably present"""
+        if not keys:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(keys)
+        return ((self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1).all(axis=1)
+
+class ActionedTargetFilter:
+    """Drops candidates the user has already acted on (succeeded or rejected), so automation does not spend limits on repeats.
+    Throttled attempts (governor refusals, 429s) are never logged, so those targets stay eligible."""
+    
+    def __init__(self, capacity: int = CAPACITY):
+        self.capacity = capacity
+        self.bloom = BloomFilter(capacity)
+        self.last_id = 0  # Highest ActionLog id loaded; rows written later (by any process) are picked up incrementally
+        self.lock = threading.Lock()
+    
+    def init_app(self, app):
+        """Build the filter from the action log on startup"""
+        with app.app_context():
+            try:
+                self.rebuild()
+            except Exception as e:
+                logger.error(f"Error building actioned target filter: {str(e)}")
+    
+    def rebuild(self, capacity: int = None):
+        """Reload every logged target into a fresh filter sized for at least twice the current log"""
+        total = db.session.query(db.func.count(ActionLog.id)).scalar() or 0
+        with self.lock:
+            self.capacity = max(capacity or self.capacity, 2 * total)
+            self.bloom = BloomFilter(self.capacity)
+            self.last_id = 0
+            self._load_new_rows()
+        logger.info(f"Actioned target filter built from {self.bloom.count} logged targets")
+    
+    def _load_new_rows(self):
+        """Stream action log rows written since the last load into the Bloom filter"""
+        result = db.session.execute(
+            select(ActionLog.id, ActionLog.user_id, ActionLog.action_type, ActionLog.target_profile_id)
+            .where(ActionLog.id > self.last_id, ActionLog.target_profile_id.isnot(None))
+            .order_by(ActionLog.id)
+            .execution_options(yield_per=LOAD_BATCH)
+        )
+        for rows in result.partitions():
+            self.bloom.add([_key(user_id, action_type, target) for _, user_id, action_type, target in rows])
+            self.last_id = rows[-1][0]
+    
+    def filter_new(self, user_id: int, action_types: Iterable[str], candidates: List,
+                   key: Optional[Callable] = None) -> List:
+        """Candidates not yet targeted by any of the action types, in their original order"""
+        action_types = tuple(action_types)
+        key = key or (lambda candidate: candidate)
+        targets = [str(key(candidate)) for candidate in candidates]
+        if not targets:
+            return []
+        
+        with self.lock:
+            self._load_new_rows()
+            if self.bloom.count > self.capacity:
+                outgrown = True
+            else:
+                outgrown = False
+                hits = np.zeros(len(targets), dtype=bool)
+                for action_type in action_types:
+                    hits |= self.bloom.contains([_key(user_id, action_type, target) for target in targets])
+        if outgrown:
+            self.rebuild(self.capacity * 2)
+            return self.filter_new(user_id, action_types, candidates, key)
+        
+        # Only probable hits reach the (user_id, action_type, target_profile_id) index
+        actioned = {str(target) for target in action_log_writer.pending_targets(user_id, action_types)}
+        maybe = sorted({target for target, hit in zip(targets, hits) if hit} - actioned)
+        for start in range(0, len(maybe), QUERY_BATCH):
+            actioned.update(
+                target for (target,) in db.session.query(ActionLog.target_profile_id).filter(
+                    ActionLog.user_id == user_id,
+                    ActionLog.action_type.in_(action_types),
+                    ActionLog.target_profile_id.in_(maybe[start:start + QUERY_BATCH])
+                ).distinct()
+            )
+        
+        fresh = [candidate for candidate, target in zip(candidates, targets) if target not in actioned]
+        if len(fresh) < len(candidates):
+            logger.info(f"Skipped {len(candidates) - len(fresh)} already-actioned targets for {'/'.join(action_types)}")
+        return fresh
+
+# Global actioned target filter instance
+actioned_targets = ActionedTargetFilter()
@@ -5,15 +5,22 @@ import schedule
 import time
 from datetime import datetime, timedelta
 from threading import Thread
+from flask import current_app
 from typing import Dict, List, Any
+from sqlalchemy import update
 from extensions import db
 from models import User, Post, MarketingCampaign, AutomationRule
 from automation_engine import automation_engine
+from action_budget import action_budget
 from linkedin_service import linkedin_service
+from http_client import async_http_client
 from app import create_app
 
 logger = logging.getLogger(__name__)
 
+# Post URNs per socialActions batch-get request (bounded by URL length)
+METRICS_BATCH_SIZE = int(os.environ.get('METRICS_BATCH_SIZE', 50))
+
 class TaskScheduler:
     """Comprehensive task scheduler for LinkedIn automation"""
     
@@ -105,43 +112,59 @@ class TaskScheduler:
                 ).all()
                 
                 logger.info(f"Found {len(scheduled_posts)} posts ready for publishing")
+                if not scheduled_posts:
+                    return
                 
+                # Claim the posts in one commit before any request goes out
+                post_ids = [post.id for post in scheduled_posts]
                 for post in scheduled_posts:
-                    asyncio.run(self._publish_scheduled_post(post))
+                    post.status = 'publishing'
+                db.session.commit()
+                
+                # Publish concurrently on one event loop; the async client bounds in-flight requests
+                asyncio.run(self._gather(self._publish_scheduled_post(post_id) for post_id in post_ids))
                     
         except Exception as e:
             logger.error(f"Error checking scheduled posts: {str(e)}")
     
-    async def _publish_scheduled_post(self, post: Post):
-        """Publish a scheduled post"""
+    async def _gather(self, coroutines):
+        """Run coroutines concurrently on the current event loop, then close the loop's HTTP client"""
         try:
-            post.status = 'publishing'
-            db.session.commit()
-            
-            # Attempt to publish to LinkedIn
-            linkedin_result = await linkedin_service.create_post_async(
-                content=post.content,
-                image_url=post.image_url,
-                video_url=post.video_url
-            )
-            
-            if linkedin_result.get('success'):
-                post.status = 'published'
-                post.published_at = datetime.utcnow()
-                post.linkedin_url = linkedin_result.get('post_url')
-                logger.info(f"Successfully published post {post.id}")
-            else:
+            return await asyncio.gather(*coroutines, return_exceptions=True)
+        finally:
+            await async_http_client.aclose()
+    
+    async def _publish_scheduled_post(self, post_id: int):
+        """Publish a claimed post; each task pushes its own app context, so it gets its own database session"""
+        with current_app.app_context():
+            post = db.session.get(Post, post_id)
+            try:
+                # Attempt to publish to LinkedIn
+                linkedin_result = await linkedin_service.create_post_async(
+                    content=post.content,
+                    image_url=post.image_url,
+                    video_url=post.video_url
+                )
+                
+                if linkedin_result.get('success'):
+                    post.status = 'published'
+                    post.published_at = datetime.utcnow()
+                    post.linkedin_url = linkedin_result.get('post_url')
+                    post.linkedin_post_id = linkedin_result.get('post_id')
+                    logger.info(f"Successfully published post {post.id}")
+                else:
+                    post.status = 'failed'
+                    post.error_message = linkedin_result.get('error', 'Unknown error')
+                    logger.error(f"Failed to publish post {post.id}: {post.error_message}")
+                
+                db.session.commit()
+                
+            except Exception as e:
+                logger.error(f"Error publishing scheduled post {post_id}: {str(e)}")
+                db.session.rollback()
                 post.status = 'failed'
-                post.error_message = linkedin_result.get('error', 'Unknown error')
-                logger.error(f"Failed to publish post {post.id}: {post.error_message}")
-            
-            db.session.commit()
-            
-        except Exception as e:
-            logger.error(f"Error publishing scheduled post {post.id}: {str(e)}")
-            post.status = 'failed'
-            post.error_message = str(e)
-            db.session.commit()
+                post.error_message = str(e)
+                db.session.commit()
     
     def _manage_active_campaigns(self):
         """Manage active marketing campaigns"""
@@ -243,12 +266,9 @@ class TaskScheduler:
                 logger.info(f"Running auto-follow for {len(active_rules)} rules")
                 
                 for rule in active_rules:
-                    # Check daily limits
-                    today_actions = automation_engine._get_today_action_count(
-                        rule.user_id, 'auto_follow'
-                    )
-                    
-                    if today_actions < rule.daily_limit:
+                    # Check daily limits: the rule's own and the account's invitation budget
+                    if min(action_budget.available(rule.user_id, 'auto_follow', rule.daily_limit),
+                           action_budget.available(rule.user_id, 'connections')) > 0:
                         # Run auto-follow for this rule
                         asyncio.create_task(
                             automation_engine._run_auto_follow_automation(rule.id, rule.user_id)
@@ -292,14 +312,8 @@ class TaskScheduler:
         """Update metrics for posts and campaigns"""
         try:
             with self.app.app_context():
-                # Update post metrics
-                recent_posts = Post.query.filter(
-                    Post.status == 'published',
-                    Post.published_at >= datetime.utcnow() - timedelta(days=7)
-                ).all()
-                
-                for post in recent_posts:
-                    asyncio.run(self._update_post_metrics(post))
+                # Update post metrics in batches
+                self._update_post_metrics_batched()
                 
                 # Update campaign metrics
                 active_campaigns = MarketingCampaign.query.filter_by(status='active').all()
@@ -309,26 +323,74 @@ class TaskScheduler:
         except Exception as e:
             logger.error(f"Error updating metrics: {str(e)}")
     
-    async def _update_post_metrics(self, post: Post):
-        """Update metrics for a single post"""
+    def _update_post_metrics_batched(self) -> List[Dict]:
+        """Refresh metrics for last week's posts with one batch-get call and one bulk UPDATE per batch"""
         try:
-            if not post.linkedin_url:
-                return
+            recent_posts = db.session.query(Post.id, Post.linkedin_post_id, Post.linkedin_url).filter(
+                Post.status == 'published',
+                Post.published_at >= datetime.utcnow() - timedelta(days=7)
+            ).all()
             
-            # Get metrics from LinkedIn API
-            metrics = await linkedin_service.get_post_metrics(post.linkedin_url)
+            post_ids_by_urn = {}
+            for post_id, linkedin_post_id, linkedin_url in recent_posts:
+                post_ref = linkedin_post_id or linkedin_url
+                if post_ref:
+                    post_ids_by_urn.setdefault(linkedin_service.post_urn(post_ref), []).append(post_id)
+            
+            urns = list(post_ids_by_urn)
+            batches = [urns[i:i + METRICS_BATCH_SIZE] for i in range(0, len(urns), METRICS_BATCH_SIZE)]
+            
+            # Batches are fetched concurrently; the database is only touched here, once the event loop is done
+            fetched = asyncio.run(self._gather(self._fetch_metrics_batch(batch) for batch in batches))
+            
+            timings = []
+            for number, (batch, result) in enumerate(zip(batches, fetched), 1):
+                if isinstance(result, BaseException):
+                    logger.error(f"Error fetching metrics batch {number}: {str(result)}")
+                    continue
+                metrics_by_urn, fetch_ms = result
+                timings.append(self._apply_metrics_batch(number, batch, metrics_by_urn, post_ids_by_urn, fetch_ms))
+            
+            logger.info(
+                f"Updated metrics for {sum(t['updated'] for t in timings)} of {len(recent_posts)} posts "
+                f"in {len(batches)} batches"
+            )
+            return timings
             
-            if metrics:
-                post.likes_count = metrics.get('likes', 0)
-                post.comments_count = metrics.get('comments', 0)
-                post.shares_count = metrics.get('shares', 0)
-                post.impressions_count = metrics.get('impressions', 0)
-                post.last_metrics_update = datetime.utcnow()
-                
-                db.session.commit()
-                
         except Exception as e:
-            logger.error(f"Error updating post metrics for {post.id}: {str(e)}")
+            db.session.rollback()
+            logger.error(f"Error updating post metrics: {str(e)}")
+            return []
+    
+    async def _fetch_metrics_batch(self, urns: List[str]):
+        """One batch-get of post metrics; returns (metrics by URN, milliseconds taken)"""
+        started = time.perf_counter()
+        metrics_by_urn = await linkedin_service.get_posts_metrics_batch(urns)
+        return metrics_by_urn, round((time.perf_counter() - started) * 1000, 1)
+    
+    def _apply_metrics_batch(self, number: int, urns: List[str], metrics_by_urn: Dict[str, dict],
+                             post_ids_by_urn: Dict[str, List[int]], fetch_ms: float) -> Dict:
+        """Write one batch of post metrics in a single executemany UPDATE"""
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        rows = [
+            {'id': post_id, 'likes_count': metrics['likes'], 'comments_count': metrics['comments'], 'last_metrics_update': now}
+            for urn, metrics in metrics_by_urn.items()
+            for post_id in post_ids_by_urn.get(urn, [])
+        ]
+        if rows:
+            db.session.execute(update(Post), rows)
+            db.session.commit()
+        
+        timing = {
+            'batch': number,
+            'posts': len(urns),
+            'updated': len(rows),
+            'fetch_ms': fetch_ms,
+            'update_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+        logger.info(f"Metrics batch {number}: {timing}")
+        return timing
     
     async def _update_campaign_metrics(self, campaign: MarketingCampaign):
         """Update metrics for a campaign"""
@@ -384,15 +446,23 @@ class TaskScheduler:
                 for campaign in old_campaigns:
                     campaign.status = 'archived'
                 
-                # Clean up old action logs (older than 60 days)
-                from models import ActionLog
+                # Clean up old action logs and their daily counters (older than 60 days), and past daily budgets
+                from models import ActionLog, DailyActionCounter, DailyActionBudget
+                cutoff = datetime.utcnow() - timedelta(days=60)
                 old_logs = ActionLog.query.filter(
-                    ActionLog.created_at < datetime.utcnow() - timedelta(days=60)
+                    ActionLog.created_at < cutoff
                 ).all()
                 
                 for log in old_logs:
                     db.session.delete(log)
                 
+                DailyActionCounter.query.filter(
+                    DailyActionCounter.date < cutoff.date()
+                ).delete(synchronize_session=False)
+                DailyActionBudget.query.filter(
+                    DailyActionBudget.date < datetime.utcnow().date() - timedelta(days=1)
+                ).delete(synchronize_session=False)
+                
                 db.session.commit()
                 logger.info("Database cleanup completed")
                 
@@ -8,6 +8,8 @@ import sys
 import asyncio
 import json
 import time
+import tempfile
+import zipfile
 from datetime import datetime, timedelta
 
 # Add the project root to Python path
@@ -15,7 +17,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app
 from extensions import db
-from models import User, Post, MarketingCampaign, AutomationRule
+from models import User, Post, MarketingCampaign, AutomationRule, ActionLog, AutomationJob, DailyActionCounter, DailyActionBudget
 from automation_engine import automation_engine, CampaignConfig, AutoFollowConfig, TargetCategory
 from image_generation_service import image_service
 from task_scheduler import task_scheduler
@@ -47,6 +49,33 @@ class FeatureTester:
                 self.test_auto_follow_system()
                 self.test_engagement_optimization()
                 self.test_task_scheduler()
+                self.test_upload_asset_delivery()
+                self.test_parallel_pdf_extraction()
+                self.test_streaming_document_extraction()
+                self.test_document_extractors()
+                self.test_async_upload_processing()
+                self.test_stale_upload_recovery()
+                self.test_upload_result_reuse()
+                self.test_document_keywords()
+                self.test_full_text_search()
+                self.test_linkedin_simulator()
+                self.test_rate_governor_members()
+                self.test_http_client_retries()
+                self.test_image_asset_upload()
+                self.test_author_urn_cache()
+                self.test_connection_status_cache()
+                self.test_async_linkedin_client()
+                self.test_batched_post_metrics()
+                self.test_automation_jobs()
+                self.test_rate_limited_job_pause()
+                self.test_buffered_action_log()
+                self.test_automation_statistics()
+                self.test_actioned_target_filter()
+                self.test_profile_scoring()
+                self.test_rule_criteria_cache()
+                self.test_keyword_matcher()
+                self.test_action_budget()
+                self.test_auto_follow_invitation_budget()
                 
                 # Print results
                 self.print_test_results()
@@ -87,7 +116,13 @@ class FeatureTester:
             # Delete test data
             if self.test_user:
                 # Delete related records first
+                from action_log_writer import action_log_writer
+                action_log_writer.flush()
                 Post.query.filter_by(user_id=self.test_user.id).delete()
+                ActionLog.query.filter_by(user_id=self.test_user.id).delete()
+                DailyActionCounter.query.filter_by(user_id=self.test_user.id).delete()
+                DailyActionBudget.query.filter_by(user_id=self.test_user.id).delete()
+                AutomationJob.query.filter_by(user_id=self.test_user.id).delete()
                 MarketingCampaign.query.filter_by(user_id=self.test_user.id).delete()
                 AutomationRule.query.filter_by(user_id=self.test_user.id).delete()
                 
@@ -338,6 +373,1383 @@ class FeatureTester:
         except Exception as e:
             self.record_test_result("Task Scheduler", False, str(e))
     
+    def test_upload_asset_delivery(self):
+        """Test caching, conditional GET and range handling for uploads"""
+        print("\n📦 Testing Upload Asset Delivery...")
+        
+        filename = 'a1b2c3d4e5f60718_delivery_test.txt'
+        file_path = os.path.join(self.app.config['UPLOAD_FOLDER'], filename)
+        
+        try:
+            with open(file_path, 'wb') as f:
+                f.write(b'0123456789' * 100)
+            
+            client = self.app.test_client()
+            
+            response = client.get(f'/static/uploads/{filename}')
+            assert response.status_code == 200, f"Unexpected status {response.status_code}"
+            etag = response.headers.get('ETag')
+            assert etag and not etag.startswith('W/'), "Strong ETag not set"
+            assert 'immutable' in response.headers.get('Cache-Control', ''), "Hashed asset not immutable"
+            
+            response = client.get(f'/static/uploads/{filename}', headers={'If-None-Match': etag})
+            assert response.status_code == 304, "Conditional GET did not return 304"
+            
+            response = client.get(f'/static/uploads/{filename}', headers={'Range': 'bytes=10-19'})
+            assert response.status_code == 206, "Range request did not return 206"
+            assert response.data == b'0123456789', "Range body incorrect"
+            
+            self.record_test_result("Upload Asset Delivery", True, f"ETag {etag} with 304 and 206 handling")
+            
+        except Exception as e:
+            self.record_test_result("Upload Asset Delivery", False, str(e))
+        
+        finally:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+    
+    def test_parallel_pdf_extraction(self):
+        """Benchmark sequential vs multi-process extraction on a synthetic 300-page PDF and check the shared pool"""
+        print("\n📄 Testing Parallel PDF Extraction...")
+        
+        try:
+            import pdf_service
+            from pdf_service import iter_pdf_text, iter_pdf_pages_parallel, PDF_EXTRACT_WORKERS
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                pdf_path = os.path.join(tmp_dir, 'synthetic.pdf')
+                build_synthetic_pdf(pdf_path, pages=300)
+                
+                start = time.perf_counter()
+                sequential_text = "\n".join(text for _, text in iter_pdf_text(pdf_path, workers=1))
+                sequential_time = time.perf_counter() - start
+                
+                workers = max(PDF_EXTRACT_WORKERS, 2)
+                start = time.perf_counter()
+                parallel_text = "\n".join(text for _, text in iter_pdf_pages_parallel(pdf_path, workers))
+                parallel_time = time.perf_counter() - start
+                
+                executor = pdf_service._executor
+                assert executor is not None, "Parallel extraction did not use the shared pool"
+                assert executor._mp_context.get_start_method() != 'fork', "Pool processes forked from the threaded parent"
+                truncated = list(iter_pdf_pages_parallel(pdf_path, workers, max_chars=100))
+                assert pdf_service._executor is executor, "Pool recreated for the next extraction"
+                assert sum(len(text) for _, text in truncated) == 100, "Character limit not applied"
+                
+                # A single CPU always extracts serially, without touching the pool
+                saved_cpu_count = pdf_service.CPU_COUNT
+                pdf_service.CPU_COUNT = 1
+                try:
+                    pdf_service._executor = None
+                    single_cpu_text = "\n".join(text for _, text in iter_pdf_text(pdf_path, workers=workers))
+                    assert pdf_service._executor is None, "Pool used on a single CPU"
+                finally:
+                    pdf_service.CPU_COUNT = saved_cpu_count
+                    pdf_service._executor = executor
+            
+            assert parallel_text == sequential_text == single_cpu_text, "Parallel extraction changed the text"
+            assert parallel_text.index('Page 2 line 1') < parallel_text.index('Page 300 line 1'), "Page order not preserved"
+            
+            speedup = sequential_time / parallel_time if parallel_time else 0
+            self.record_test_result(
+                "Parallel PDF Extraction", True,
+                f"300 pages: {sequential_time:.2f}s sequential, {parallel_time:.2f}s with {workers} workers "
+                f"({speedup:.2f}x on {os.cpu_count()} CPUs), pool reused"
+            )
+            
+        except Exception as e:
+            self.record_test_result("Parallel PDF Extraction", False, str(e))
+    
+    def test_streaming_document_extraction(self):
+        """Test that streamed extraction returns the full text and leaves no spooled text file behind"""
+        print("\n📝 Testing Streaming Document Extraction...")
+        
+        from document_service import extract_and_summarize, CHUNK_CHARS
+        
+        upload_folder = self.app.config['UPLOAD_FOLDER']
+        path = os.path.join(upload_folder, 'featuretest_streaming.txt')
+        try:
+            lines = [f"Line {i} of the featuretest streaming document" for i in range(2000)]
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(lines))
+            before = set(os.listdir(upload_folder))
+            
+            chunks = []
+            result = extract_and_summarize(path, 'txt', on_chunk=chunks.append)
+            
+            assert result['extracted_text'].split("\n") == lines, "Extracted text differs from the document"
+            assert result['chunk_count'] == len(chunks) > 1 and len(chunks) >= len("\n".join(lines)) // CHUNK_CHARS, "Not streamed in chunks"
+            assert result['summary'], "Summary missing"
+            assert set(os.listdir(upload_folder)) == before, f"Files left behind: {set(os.listdir(upload_folder)) - before}"
+            
+            self.record_test_result("Streaming Document Extraction", True, f"{len(lines)} lines in {result['chunk_count']} chunks, nothing spooled to uploads")
+            
+        except Exception as e:
+            self.record_test_result("Streaming Document Extraction", False, str(e))
+        
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def test_document_extractors(self):
+        """Test the DOCX, XLSX and TXT extractors, including tables, several sheets and flat memory on large sheets"""
+        print("\n📚 Testing Document Extractors...")
+        
+        import tracemalloc
+        from openpyxl import Workbook
+        from document_service import iter_docx_chunks, iter_xlsx_chunks, iter_txt_chunks, CHUNK_CHARS
+        
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                docx_path = os.path.join(tmp_dir, 'brief.docx')
+                build_docx(docx_path, ['Quarterly brief', 'Pipeline grew 40%'], [['Region', 'Deals'], ['EMEA', '12']])
+                text = "\n".join(iter_docx_chunks(docx_path))
+                assert text.split("\n") == ['Quarterly brief', 'Pipeline grew 40%', 'Region', 'Deals', 'EMEA', '12'], f"DOCX text {text!r}"
+                
+                xlsx_path = os.path.join(tmp_dir, 'leads.xlsx')
+                workbook = Workbook()
+                workbook.active.title = 'Leads'
+                workbook.active.append(['Name', 'Score', 'Joined', 'Active'])
+                workbook.active.append(['Ada', 3.5, datetime(2024, 5, 1, 9, 30), True])
+                workbook.active.append([None, None])
+                workbook.create_sheet('Deals').append(['Acme', 42])
+                workbook.save(xlsx_path)
+                text = "\n".join(iter_xlsx_chunks(xlsx_path))
+                expected = ['Sheet: Leads', 'Name\tScore\tJoined\tActive', 'Ada\t3.5\t2024-05-01 09:30:00\tTrue', 'Sheet: Deals', 'Acme\t42']
+                assert text.split("\n") == expected, f"XLSX text {text!r}"
+                
+                txt_path = os.path.join(tmp_dir, 'notes.txt')
+                content = "".join(f"Zeile {i}: Grüße aus der Featuretest-Datei\n" for i in range(1000))
+                with open(txt_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                chunks = list(iter_txt_chunks(txt_path))
+                assert "".join(chunks) == content, "TXT text changed"
+                assert len(chunks) > 1 and all(chunk.endswith("\n") and len(chunk) <= CHUNK_CHARS for chunk in chunks), "TXT not split on lines"
+                
+                # Lines longer than a chunk are cut at CHUNK_CHARS instead of growing the chunk
+                content = "".join(f"{'x' * int(CHUNK_CHARS * 1.7)}\n{'y' * 10}\n" for _ in range(4))
+                with open(txt_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                chunks = list(iter_txt_chunks(txt_path))
+                assert "".join(chunks) == content, "Long-line TXT text changed"
+                assert max(len(chunk) for chunk in chunks) <= CHUNK_CHARS, f"TXT chunk of {max(len(chunk) for chunk in chunks)} chars"
+                
+                # Peak memory while streaming a sheet does not grow with its row count
+                peaks = []
+                for rows in (2000, 16000):
+                    path = os.path.join(tmp_dir, f"rows{rows}.xlsx")
+                    workbook = Workbook(write_only=True)
+                    sheet = workbook.create_sheet('Rows')
+                    for i in range(rows):
+                        sheet.append([i, i * 1.5, f"region-{i % 50}", 'Featuretest widget'])
+                    workbook.save(path)
+                    
+                    tracemalloc.start()
+                    extracted = sum(len(chunk) for chunk in iter_xlsx_chunks(path))
+                    peaks.append(tracemalloc.get_traced_memory()[1])
+                    tracemalloc.stop()
+                assert peaks[1] < peaks[0] * 1.5, f"Peak memory grew from {peaks[0]} to {peaks[1]} bytes"
+            
+            self.record_test_result("Document Extractors", True, f"8x the rows, peak memory {peaks[0] // 1024}KB -> {peaks[1] // 1024}KB")
+            
+        except Exception as e:
+            self.record_test_result("Document Extractors", False, str(e))
+    
+    def test_async_upload_processing(self):
+        """Test that PDF uploads return immediately and finish in the ingestion worker"""
+        print("\n📥 Testing Async Upload Processing...")
+        
+        tmp_dir = tempfile.mkdtemp()
+        
+        try:
+            from ingestion_service import ingestion_worker
+            from models import UploadedFile
+            
+            pdf_path = os.path.join(tmp_dir, 'brochure.pdf')
+            build_synthetic_pdf(pdf_path, pages=5)
+            
+            client = self.app.test_client()
+            with open(pdf_path, 'rb') as f:
+                response = client.post(
+                    '/api/upload-pdf',
+                    data={'file': (f, 'feature_test_brochure.pdf')},
+                    content_type='multipart/form-data'
+                )
+            
+            assert response.status_code == 202, f"Upload returned {response.status_code}"
+            assert response.json['processing_status'] == 'pending', "Upload not queued as pending"
+            
+            assert ingestion_worker.wait(timeout=30), "Ingestion worker did not finish"
+            status = client.get(response.json['status_url']).json
+            
+            assert status['processing_status'] == 'completed', f"Processing ended as {status['processing_status']}"
+            assert status['progress']['chunks_processed'] == 5, "Progress not reported"
+            assert status['summary'], "Summary missing after processing"
+            assert 'synthetic brochure text' in status['keywords'], f"Expected keyphrase missing from {status['keywords']}"
+            assert status['duplicate'] is False, "Freshly processed upload reported as a duplicate"
+            uploaded = UploadedFile.query.get(status['file_id'])
+            assert not os.path.exists(f"{uploaded.file_path}.txt"), "Extracted text left next to the public upload"
+            
+            # Uploading identical content again reuses the processed row without new work
+            with open(pdf_path, 'rb') as f:
+                duplicate = client.post(
+                    '/api/upload-pdf',
+                    data={'file': (f, 'feature_test_brochure.pdf')},
+                    content_type='multipart/form-data'
+                )
+            
+            assert duplicate.status_code == 200, f"Duplicate upload returned {duplicate.status_code}"
+            assert duplicate.json['duplicate'], "Duplicate upload not detected"
+            assert duplicate.json['file_id'] == status['file_id'], "Duplicate did not reuse the processed file"
+            assert duplicate.json['summary'] == status['summary'], "Duplicate did not reuse the summary"
+            
+            self.record_test_result("Async Upload Processing", True, f"File {status['file_id']} processed in background, duplicate reused")
+            
+        except Exception as e:
+            self.record_test_result("Async Upload Processing", False, str(e))
+        
+        finally:
+            import shutil
+            from models import UploadedFile
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            for uploaded in UploadedFile.query.filter_by(original_filename='feature_test_brochure.pdf').all():
+                if os.path.exists(uploaded.file_path):
+                    os.remove(uploaded.file_path)
+                db.session.delete(uploaded)
+            db.session.commit()
+    
+    def test_stale_upload_recovery(self):
+        """Test that uploads orphaned in 'processing' by a dead worker are processed again on startup"""
+        print("\n🩺 Testing Stale Upload Recovery...")
+        
+        from ingestion_service import ingestion_worker, STALE_AFTER
+        from models import UploadedFile
+        
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'featuretest_stale.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("Quarterly featuretest report on stale upload recovery")
+            
+            def orphan(heartbeat_at):
+                uploaded = UploadedFile(
+                    user_id=self.test_user.id,
+                    filename='featuretest_stale.txt',
+                    original_filename='featuretest_stale.txt',
+                    file_path=path,
+                    file_type='txt',
+                    processing_status='processing',
+                    heartbeat_at=heartbeat_at
+                )
+                db.session.add(uploaded)
+                return uploaded
+            
+            stale = orphan(datetime.utcnow() - STALE_AFTER - timedelta(minutes=1))
+            unclaimed = orphan(None)
+            live = orphan(datetime.utcnow())
+            db.session.commit()
+            
+            ingestion_worker.init_app(self.app)
+            assert ingestion_worker.wait(timeout=30), "Ingestion worker did not finish"
+            db.session.expire_all()
+            
+            for uploaded in (stale, unclaimed):
+                assert uploaded.processing_status == 'completed', f"Orphaned upload ended as {uploaded.processing_status}"
+                assert uploaded.heartbeat_at, "Heartbeat not recorded while processing"
+            assert live.processing_status == 'processing', "Upload with a recent heartbeat was taken from its worker"
+            
+            self.record_test_result("Stale Upload Recovery", True, "Stale and unclaimed uploads reprocessed, live upload left alone")
+            
+        except Exception as e:
+            self.record_test_result("Stale Upload Recovery", False, str(e))
+        
+        finally:
+            import shutil
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            UploadedFile.query.filter_by(original_filename='featuretest_stale.txt').delete()
+            db.session.commit()
+    
+    def test_upload_result_reuse(self):
+        """Test that the ingestion worker reuses results only from the same user's identical upload"""
+        print("\n♻️ Testing Upload Result Reuse...")
+        
+        from ingestion_service import ingestion_worker
+        from models import UploadedFile
+        
+        other_user = User(username='featuretest_other_user')
+        db.session.add(other_user)
+        db.session.commit()
+        try:
+            def upload(user, status, summary=None):
+                uploaded = UploadedFile(
+                    user_id=user.id,
+                    filename='featuretest_reuse.txt',
+                    original_filename='featuretest_reuse.txt',
+                    file_path='/nonexistent/featuretest_reuse.txt',
+                    file_type='txt',
+                    content_hash='f' * 64,
+                    processing_status=status,
+                    summary=summary
+                )
+                db.session.add(uploaded)
+                db.session.commit()
+                return uploaded
+            
+            upload(other_user, 'completed', summary="Another user's summary")
+            own = upload(self.test_user, 'pending')
+            ingestion_worker.process(own.id)
+            assert own.processing_status == 'failed', "Results copied from another user's upload"
+            
+            upload(self.test_user, 'completed', summary="Own summary")
+            duplicate = upload(self.test_user, 'pending')
+            ingestion_worker.process(duplicate.id)
+            assert duplicate.processing_status == 'completed' and duplicate.summary == "Own summary", "Own identical upload not reused"
+            
+            status = self.app.test_client().get(f'/api/uploads/{duplicate.id}/status').json
+            assert status['duplicate'] is True, "Reused upload not reported as a duplicate"
+            
+            self.record_test_result("Upload Result Reuse", True, "Reused the same user's results only, reported as a duplicate")
+            
+        except Exception as e:
+            self.record_test_result("Upload Result Reuse", False, str(e))
+        
+        finally:
+            db.session.rollback()
+            UploadedFile.query.filter_by(original_filename='featuretest_reuse.txt').delete()
+            db.session.delete(other_user)
+            db.session.commit()
+    
+    def test_document_keywords(self):
+        """Test keyphrase extraction, phrase counting past the int64 key range and per-user document briefs"""
+        print("\n🔑 Testing Document Keywords...")
+        
+        import numpy as np
+        from keyword_service import extract_keywords, _count_phrases
+        from models import UploadedFile
+        
+        other_user = User(username='featuretest_keyword_user')
+        db.session.add(other_user)
+        db.session.commit()
+        try:
+            text = " ".join(
+                f"Our edge inference platform cuts cloud latency for retail analytics teams. Report {i} covers store traffic."
+                for i in range(30)
+            )
+            keywords = extract_keywords(text, top_k=5)
+            assert 'edge inference platform' in keywords, f"Expected keyphrase missing from {keywords}"
+            assert 'retail analytics teams' in keywords, f"Expected keyphrase missing from {keywords}"
+            
+            # Three-word phrases over a vocabulary past ~2.1M words no longer fit one int64 key
+            base = 3_000_001
+            windows = np.array([[base - 1, base - 2, 7], [base - 1, base - 2, 8], [base - 1, base - 2, 7], [5, 0, 0]], dtype=np.int64)
+            first, counts = _count_phrases(windows, base)
+            assert sorted(zip(first.tolist(), counts.tolist())) == [(0, 2), (1, 1), (3, 1)], "Phrases miscounted for a large vocabulary"
+            assert (_count_phrases(windows, 10)[1] == _count_phrases(windows, base)[1]).all(), "Counting paths disagree"
+            
+            foreign = UploadedFile(
+                user_id=other_user.id,
+                filename='featuretest_foreign.pdf',
+                original_filename='featuretest_foreign.pdf',
+                file_path='/nonexistent/featuretest_foreign.pdf',
+                processing_status='completed',
+                summary="Another user's private document"
+            )
+            db.session.add(foreign)
+            db.session.commit()
+            response = self.app.test_client().post('/api/marketing/create-campaign', json={
+                'campaign_name': 'Featuretest foreign PDF',
+                'pdf_id': foreign.id
+            })
+            assert response.status_code == 404, f"Another user's PDF was accepted ({response.status_code})"
+            
+            self.record_test_result("Document Keywords", True, f"Keyphrases {keywords[:2]}, large vocabularies counted exactly, PDFs scoped per user")
+            
+        except Exception as e:
+            self.record_test_result("Document Keywords", False, str(e))
+        
+        finally:
+            db.session.rollback()
+            UploadedFile.query.filter_by(user_id=other_user.id).delete()
+            db.session.delete(other_user)
+            db.session.commit()
+    
+    def test_full_text_search(self):
+        """Test that posts are searchable as soon as they are written and drop out when removed"""
+        print("\n🔎 Testing Full-Text Search...")
+        
+        post = None
+        try:
+            post = Post(user_id=self.test_user.id, content="Featuretest quarterly pipeline review for zeppelin logistics", status='draft')
+            db.session.add(post)
+            db.session.commit()
+            
+            client = self.app.test_client()
+            response = client.get('/api/search', query_string={'q': 'zeppelin logist', 'type': 'posts'})
+            ids = [result['id'] for result in response.json['results']]
+            assert post.id in ids, "New post not found by search"
+            assert '<mark>' in response.json['results'][0]['snippet'], "Snippet not highlighted"
+            
+            # User text is escaped; only the match highlighting is markup
+            post.content = 'Featuretest <script>alert(1)</script> zeppelin & <b>logistics</b>'
+            db.session.commit()
+            response = client.get('/api/search', query_string={'q': 'zeppelin', 'type': 'posts'})
+            snippet = response.json['results'][0]['snippet']
+            assert '<script>' not in snippet and '&lt;script&gt;' in snippet, f"Snippet not escaped: {snippet}"
+            assert '<mark>zeppelin</mark> &amp; &lt;b&gt;' in snippet, f"Unexpected snippet {snippet}"
+            
+            post.content = "Featuretest rewritten without the airship"
+            db.session.commit()
+            response = client.get('/api/search', query_string={'q': 'zeppelin', 'type': 'posts'})
+            assert post.id not in [result['id'] for result in response.json['results']], "Index not updated after edit"
+            
+            self.record_test_result("Full-Text Search", True, f"Post {post.id} indexed and re-indexed in {response.json['took_ms']}ms")
+            
+        except Exception as e:
+            self.record_test_result("Full-Text Search", False, str(e))
+        
+        finally:
+            if post is not None and post.id:
+                db.session.delete(post)
+                db.session.commit()
+    
+    def test_linkedin_simulator(self):
+        """Test the automation API calls end to end against the local LinkedIn simulator, paced by a private rate governor"""
+        print("\n🛰️ Testing LinkedIn Simulator...")
+        
+        from linkedin_simulator import LinkedInSimulator, SimulatorConfig
+        from linkedin_automation import linkedin_automation
+        from http_client import HTTPClient
+        from rate_governor import RateLimitGovernor, RateLimitExceeded
+        
+        tmp_dir = tempfile.mkdtemp()
+        governor = RateLimitGovernor(state_path=os.path.join(tmp_dir, 'rate_limits.json'), budgets={'POST /v2/follows': 6000})
+        simulator = LinkedInSimulator(SimulatorConfig(latency_ms=5, latency_sigma=0, rate_limit=3, rate_window_seconds=1, seed=7))
+        saved = (linkedin_automation.api_base, linkedin_automation.access_token, linkedin_automation.http)
+        try:
+            linkedin_automation.api_base = f"{simulator.start()}/v2"
+            linkedin_automation.access_token = 'simulator-token'
+            linkedin_automation.http = HTTPClient(governor=governor)
+            
+            profiles = linkedin_automation._search_profiles({'keywords': ['AI'], 'count': 5})
+            assert len(profiles) == 5 and all(profile['headline'] for profile in profiles), "Profile search failed"
+            assert linkedin_automation._like_post('urn:li:share:42')['success'], "Like failed"
+            
+            # The simulator allows 3 follows per window; the governor reads its headers and waits out the 4th
+            started = time.time()
+            results = [linkedin_automation._follow_profile(profiles[i]['id']) for i in range(4)]
+            waited = time.time() - started
+            assert all(result['success'] for result in results), f"Follow failed: {results}"
+            assert '429' not in simulator.stats.get('follows', {}), "Governor let a request hit the rate limit"
+            assert waited >= 0.5, "Governor did not wait for the rate-limit window"
+            
+            # Without a resolvable member there is no actor to like as; without a token nothing is sent
+            linkedin_automation.access_token = 'expired'
+            result = linkedin_automation._like_post('urn:li:share:43')
+            assert not result['success'] and result.get('error'), f"Like sent without an actor: {result}"
+            linkedin_automation.access_token = None
+            assert linkedin_automation._accept_invitation('inv1')['success'], "Demo invitation accept failed"
+            assert linkedin_automation._send_connection_request('prof_1', 'Hi')['success'], "Demo connection request failed"
+            assert simulator.stats['socialActions.likes'] == {'201': 1}, f"Unexpected likes {simulator.stats['socialActions.likes']}"
+            assert not any(endpoint.startswith('invitations') for endpoint in simulator.stats), "Demo mode called the API"
+            
+            # A long Retry-After fails a web request at once instead of outlasting the worker timeout
+            governor.observe('POST /v2/follows', 429, {'Retry-After': '120'})
+            started = time.time()
+            with self.app.test_request_context():
+                try:
+                    governor.acquire('POST /v2/follows')
+                    raise AssertionError("Permit granted while throttled")
+                except RateLimitExceeded:
+                    pass
+            assert time.time() - started < governor.request_max_wait, "Request waited for the throttled endpoint"
+            
+            self.record_test_result("LinkedIn Simulator", True, f"4 follows with no 429s, governor waited {waited:.1f}s for the window reset")
+            
+        except Exception as e:
+            self.record_test_result("LinkedIn Simulator", False, str(e))
+        
+        finally:
+            linkedin_automation.api_base, linkedin_automation.access_token, linkedin_automation.http = saved
+            simulator.stop()
+            import shutil
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    def test_rate_governor_members(self):
+        """Test that a 429 on one member's token throttles only that member, under a separate app-wide budget"""
+        print("\n🪣 Testing Per-Member Rate Buckets...")
+        
+        from http_client import HTTPClient
+        from rate_governor import RateLimitGovernor, RateLimitExceeded, member_key
+        
+        tmp_dir = tempfile.mkdtemp()
+        governor = RateLimitGovernor(state_path=os.path.join(tmp_dir, 'rate_limits.json'), budgets={'POST /v2/invitations': 600},
+                                     app_budgets={'POST /v2/invitations': 30}, max_wait=0)
+        server, base_url, hits = start_scripted_server({'/v2/invitations': [(429, {'Retry-After': '120'})]})
+        try:
+            client = HTTPClient(governor=governor)
+            alice, bob = {'Authorization': 'Bearer alice-token'}, {'Authorization': 'Bearer bob-token'}
+            
+            assert client.post(f"{base_url}/v2/invitations", headers=alice).status_code == 429, "Scripted 429 not served"
+            try:
+                client.post(f"{base_url}/v2/invitations", headers=alice)
+                raise AssertionError("Throttled member was granted a permit")
+            except RateLimitExceeded:
+                pass
+            assert client.post(f"{base_url}/v2/invitations", headers=bob).status_code == 200, "Other member throttled by a 429 on another token"
+            
+            snapshot = governor.snapshot()
+            assert snapshot[f"{member_key(alice)}|POST /v2/invitations"]['blocked_for_s'] > 100, "429 did not block the member's bucket"
+            assert snapshot[f"{member_key(bob)}|POST /v2/invitations"]['blocked_for_s'] == 0, "429 blocked another member's bucket"
+            assert 'alice-token' not in json.dumps(snapshot), "Token stored in the rate state"
+            
+            # The app-wide bucket (burst of 3 at 30/min) caps all members together
+            granted = 0
+            for token in ['carol', 'dave', 'erin', 'frank']:
+                try:
+                    client.post(f"{base_url}/v2/invitations", headers={'Authorization': f"Bearer {token}"})
+                    granted += 1
+                except RateLimitExceeded:
+                    pass
+            assert granted == 1, f"App-wide budget granted {granted} of its 1 remaining burst permit"
+            assert hits['/v2/invitations'] == 3, f"Unexpected request count {hits}"
+            
+            self.record_test_result("Per-Member Rate Buckets", True, "429 throttled one token only; app-wide burst capped all members")
+            
+        except Exception as e:
+            self.record_test_result("Per-Member Rate Buckets", False, str(e))
+        
+        finally:
+            server.shutdown()
+            import shutil
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    def test_http_client_retries(self):
+        """Test retries on 5xx, giving up at the retry limit, and the endpoint metrics of both HTTP clients"""
+        print("\n🔁 Testing HTTP Client Retries...")
+        
+        from http_client import HTTPClient, AsyncHTTPClient, EndpointMetrics
+        
+        script = {
+            '/v2/flaky': [503, 502],
+            '/v2/down': [500] * 10,
+            '/v2/create': [503],
+            '/v2/async-flaky': [502],
+            '/v2/async-down': [503] * 10,
+            '/v2/throttled': [(429, {'Retry-After': '30'})]
+        }
+        server, base_url, hits = start_scripted_server(script)
+        try:
+            client = HTTPClient(retries=2, backoff_factor=0)
+            
+            response = client.get(f"{base_url}/v2/flaky")
+            assert response.status_code == 200 and hits['/v2/flaky'] == 3, f"Flaky GET ended {response.status_code} after {hits['/v2/flaky']} attempts"
+            response = client.get(f"{base_url}/v2/down")
+            assert response.status_code == 500 and hits['/v2/down'] == 3, f"Failing GET made {hits['/v2/down']} attempts for 2 retries"
+            response = client.post(f"{base_url}/v2/create", json={})
+            assert response.status_code == 503 and hits['/v2/create'] == 1, "POST retried after the server answered"
+            
+            metrics = client.get_metrics()
+            assert metrics['GET /v2/flaky']['count'] == 1 and metrics['GET /v2/flaky']['statuses'] == {'200': 1}, f"Unexpected flaky metrics {metrics['GET /v2/flaky']}"
+            assert metrics['GET /v2/down']['errors'] == 1 and metrics['GET /v2/down']['statuses'] == {'500': 1}, f"Unexpected down metrics {metrics['GET /v2/down']}"
+            assert metrics['POST /v2/create']['errors'] == 1, "Failed POST not counted as an error"
+            
+            # A 429 is handed to the governor rather than slept on inside the session
+            started = time.perf_counter()
+            response = client.get(f"{base_url}/v2/throttled")
+            assert response.status_code == 429 and hits['/v2/throttled'] == 1, "429 retried inside the session"
+            assert time.perf_counter() - started < 5, "Session slept for Retry-After"
+            
+            async_metrics = EndpointMetrics()
+            async_client = AsyncHTTPClient(async_metrics, retries=2, backoff_factor=0)
+            
+            async def run_async():
+                try:
+                    return await async_client.get(f"{base_url}/v2/async-flaky"), await async_client.get(f"{base_url}/v2/async-down")
+                finally:
+                    await async_client.aclose()
+            
+            flaky, down = asyncio.run(run_async())
+            assert flaky.status_code == 200 and hits['/v2/async-flaky'] == 2, f"Async flaky GET ended {flaky.status_code} after {hits['/v2/async-flaky']} attempts"
+            assert down.status_code == 503 and hits['/v2/async-down'] == 3, f"Async failing GET made {hits['/v2/async-down']} attempts for 2 retries"
+            
+            metrics = async_metrics.snapshot()
+            assert metrics['GET /v2/async-flaky']['statuses'] == {'502': 1, '200': 1}, f"Unexpected async flaky metrics {metrics['GET /v2/async-flaky']}"
+            assert metrics['GET /v2/async-down']['count'] == 3 and metrics['GET /v2/async-down']['errors'] == 3, f"Unexpected async down metrics {metrics['GET /v2/async-down']}"
+            
+            self.record_test_result("HTTP Client Retries", True, "5xx retried to success, gave up after 2 retries, POST not retried, metrics counted")
+            
+        except Exception as e:
+            self.record_test_result("HTTP Client Retries", False, str(e))
+        
+        finally:
+            server.shutdown()
+            server.server_close()
+    
+    def test_image_asset_upload(self):
+        """Test that image posts register and stream the asset once per file contents"""
+        print("\n🖼️ Testing Image Asset Upload...")
+        
+        from linkedin_simulator import LinkedInSimulator, SimulatorConfig
+        from linkedin_service import linkedin_service
+        
+        simulator = LinkedInSimulator(SimulatorConfig(latency_ms=2, latency_sigma=0))
+        saved = (linkedin_service.api_base, linkedin_service.access_token)
+        path = os.path.join(self.app.config['UPLOAD_FOLDER'], 'featuretest_asset.png')
+        try:
+            with open(path, 'wb') as f:
+                f.write(os.urandom(3 * 1024 * 1024))
+            
+            linkedin_service.api_base = f"{simulator.start()}/v2"
+            linkedin_service.access_token = 'simulator-token'
+            linkedin_service.invalidate_author_urn()
+            
+            for attempt in range(2):
+                result = linkedin_service.create_post(f"Featuretest image post {attempt}", '/static/uploads/featuretest_asset.png')
+                assert result['success'], f"Image post failed: {result.get('error')}"
+            
+            assert len(simulator.assets) == 1, f"Expected one upload, got {len(simulator.assets)}"
+            uploaded = next(iter(simulator.assets.values()))
+            assert uploaded == os.path.getsize(path), "Uploaded size does not match the file"
+            media = [post['body']['specificContent']['com.linkedin.ugc.ShareContent']['media'][0]['media'] for post in simulator.posts.values()]
+            assert set(media) == set(simulator.assets), "Posts do not reference the uploaded asset"
+            
+            self.record_test_result("Image Asset Upload", True, f"Two posts, one {uploaded} byte upload")
+            
+        except Exception as e:
+            self.record_test_result("Image Asset Upload", False, str(e))
+        
+        finally:
+            linkedin_service.api_base, linkedin_service.access_token = saved
+            linkedin_service.invalidate_author_urn()
+            simulator.stop()
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def test_author_urn_cache(self):
+        """Test that the author URN is fetched once per token, survives a restart on the user row and is dropped on 401"""
+        print("\n🪪 Testing Author URN Cache...")
+        
+        import hashlib
+        from linkedin_simulator import LinkedInSimulator, SimulatorConfig
+        from linkedin_service import linkedin_service
+        from rate_governor import rate_governor
+        
+        simulator = LinkedInSimulator(SimulatorConfig(latency_ms=2, latency_sigma=0))
+        saved = (linkedin_service.api_base, linkedin_service.access_token, dict(rate_governor.budgets))
+        try:
+            linkedin_service.api_base = f"{simulator.start()}/v2"
+            linkedin_service.access_token = 'simulator-token-a'
+            linkedin_service.invalidate_author_urn()
+            rate_governor.budgets['POST /v2/ugcPosts'] = 6000
+            rate_governor.reset('POST /v2/ugcPosts')
+            profile_lookups = lambda: simulator.stats.get('people', {}).get('200', 0)
+            
+            for attempt in range(3):
+                assert linkedin_service.create_post(f"Featuretest URN post {attempt}")['success'], "Post failed"
+            assert profile_lookups() == 1, f"{profile_lookups()} profile lookups for 3 posts with one token"
+            
+            user = User.get_default_user()
+            first_urn = user.linkedin_member_urn
+            assert first_urn and first_urn.startswith('urn:li:person:'), "Author URN not stored on the user row"
+            assert user.linkedin_urn_token_hash == hashlib.sha256(b'simulator-token-a').hexdigest(), "URN not keyed by the token fingerprint"
+            
+            # A restart empties the in-memory cache; the user row still answers for the same token
+            linkedin_service._author_urns = {}
+            assert linkedin_service.create_post("Featuretest URN after restart")['success'], "Post after restart failed"
+            assert profile_lookups() == 1, "Profile fetched again although the user row held the URN"
+            
+            # A different token misses both caches and resolves its own URN
+            linkedin_service.access_token = 'simulator-token-b'
+            assert linkedin_service.create_post("Featuretest URN new token")['success'], "Post with new token failed"
+            assert profile_lookups() == 2, "New token reused the previous token's URN"
+            user = User.get_default_user()
+            assert user.linkedin_member_urn != first_urn, "User row kept the previous token's URN"
+            assert user.linkedin_urn_token_hash == hashlib.sha256(b'simulator-token-b').hexdigest(), "Fingerprint not updated"
+            
+            # A 401 from ugcPosts drops the cached URN everywhere
+            linkedin_service.access_token = 'expired'
+            linkedin_service._remember_author_urn('featuretest-expired')
+            assert not linkedin_service.create_post("Featuretest URN expired")['success'], "Post with an expired token succeeded"
+            assert simulator.stats['ugcPosts'].get('401') == 1, "Expired token did not reach ugcPosts"
+            assert linkedin_service._author_urns == {}, "In-memory URN kept after 401"
+            user = User.get_default_user()
+            assert user.linkedin_member_urn is None and user.linkedin_urn_token_hash is None, "User row URN kept after 401"
+            
+            self.record_test_result("Author URN Cache", True, "One profile lookup per token, reused after restart, invalidated on 401")
+            
+        except Exception as e:
+            self.record_test_result("Author URN Cache", False, str(e))
+        
+        finally:
+            linkedin_service.api_base, linkedin_service.access_token, rate_governor.budgets = saved
+            rate_governor.reset('POST /v2/ugcPosts')
+            linkedin_service.invalidate_author_urn()
+            simulator.stop()
+    
+    def test_connection_status_cache(self):
+        """Test the connection status TTL, stale-while-revalidate refresh, short-lived failures and unchanged-profile skip"""
+        print("\n📶 Testing Connection Status Cache...")
+        
+        import linkedin_service as service_module
+        from linkedin_simulator import LinkedInSimulator, SimulatorConfig
+        from linkedin_service import linkedin_service
+        from models import LinkedInProfile
+        
+        simulator = LinkedInSimulator(SimulatorConfig(latency_ms=150, latency_sigma=0))
+        saved = (linkedin_service.api_base, linkedin_service.access_token,
+                 service_module.STATUS_TTL, service_module.STATUS_STALE_TTL, service_module.STATUS_ERROR_TTL)
+        had_profile = LinkedInProfile.query.filter_by(user_id=self.test_user.id).first() is not None
+        try:
+            linkedin_service.api_base = f"{simulator.start()}/v2"
+            linkedin_service.access_token = 'simulator-token'
+            linkedin_service.invalidate_author_urn()
+            service_module.STATUS_TTL, service_module.STATUS_STALE_TTL, service_module.STATUS_ERROR_TTL = 0.5, 30, 0.3
+            lookups = lambda status: simulator.stats.get('people', {}).get(status, 0)
+            
+            status = linkedin_service.get_connection_status()
+            assert status['connected'], f"Not connected: {status}"
+            assert linkedin_service.get_connection_status() is status and lookups('200') == 1, "Fresh status fetched again"
+            last_sync = LinkedInProfile.query.filter_by(user_id=self.test_user.id).first().last_sync
+            
+            # Past the TTL the cached status is returned at once and refreshed in the background
+            time.sleep(0.6)
+            started = time.perf_counter()
+            assert linkedin_service.get_connection_status() is status, "Stale status not served while refreshing"
+            stale_ms = (time.perf_counter() - started) * 1000
+            assert stale_ms < 100, f"Stale read waited {stale_ms:.0f}ms for the refresh"
+            deadline = time.time() + 5
+            while lookups('200') < 2 or linkedin_service.get_connection_status() is status:
+                assert time.time() < deadline, "Background refresh did not run"
+                time.sleep(0.02)
+            assert lookups('200') == 2, "Refresh not single-flight"
+            db.session.expire_all()
+            assert LinkedInProfile.query.filter_by(user_id=self.test_user.id).first().last_sync == last_sync, "Unchanged profile rewritten"
+            
+            # A failed status is cached briefly and never served stale
+            linkedin_service.access_token = 'expired'
+            failed = linkedin_service.get_connection_status()
+            assert not failed['connected'] and lookups('401') == 1, f"Expired token reported {failed}"
+            assert linkedin_service.get_connection_status() is failed and lookups('401') == 1, "Failed status not cached"
+            time.sleep(0.35)
+            assert not linkedin_service.get_connection_status()['connected'] and lookups('401') == 2, "Failed status served past its TTL"
+            
+            self.record_test_result("Connection Status Cache", True, f"Stale status served in {stale_ms:.1f}ms, one background refresh, failures expire quickly")
+            
+        except Exception as e:
+            self.record_test_result("Connection Status Cache", False, str(e))
+        
+        finally:
+            (linkedin_service.api_base, linkedin_service.access_token,
+             service_module.STATUS_TTL, service_module.STATUS_STALE_TTL, service_module.STATUS_ERROR_TTL) = saved
+            linkedin_service.invalidate_author_urn()
+            simulator.stop()
+            if not had_profile:
+                LinkedInProfile.query.filter_by(user_id=self.test_user.id).delete()
+                db.session.commit()
+    
+    def test_async_linkedin_client(self):
+        """Test the async publish, metrics and invitation calls and the scheduler's concurrent publish path"""
+        print("\n⚡ Testing Async LinkedIn Client...")
+        
+        from linkedin_simulator import LinkedInSimulator, SimulatorConfig
+        from linkedin_service import linkedin_service
+        from rate_governor import rate_governor
+        
+        simulator = LinkedInSimulator(SimulatorConfig(latency_ms=100, latency_sigma=0))
+        saved = (linkedin_service.api_base, linkedin_service.access_token, task_scheduler.app, dict(rate_governor.budgets))
+        posts = []
+        try:
+            linkedin_service.api_base = f"{simulator.start()}/v2"
+            linkedin_service.access_token = 'simulator-token'
+            linkedin_service.invalidate_author_urn()
+            for endpoint in ('POST /v2/ugcPosts', 'POST /v2/invitations'):
+                rate_governor.budgets[endpoint] = 6000
+                rate_governor.reset(endpoint)
+            
+            published, invited = asyncio.run(task_scheduler._gather([
+                linkedin_service.create_post_async("Featuretest async post"),
+                linkedin_service.send_connection_request('featuretest-invitee', 'Hi ' * 200)
+            ]))
+            assert published['success'] and published['post_id'] in simulator.posts, f"Async post failed: {published}"
+            assert invited['success'], f"Invitation failed: {invited}"
+            assert simulator.stats['invitations.create'] == {'201': 1}, "Invitation not sent once"
+            
+            simulator.posts[published['post_id']]['likes'] = 3
+            metrics, = asyncio.run(task_scheduler._gather([linkedin_service.get_post_metrics(published['post_url'])]))
+            assert metrics == {'likes': 3, 'comments': 0}, f"Unexpected metrics {metrics}"
+            
+            linkedin_service.access_token = 'expired'
+            rejected, = asyncio.run(task_scheduler._gather([linkedin_service.send_connection_request('featuretest-invitee')]))
+            assert not rejected['success'] and rejected['status_code'] == 401, f"Expired token not reported: {rejected}"
+            linkedin_service.access_token = 'simulator-token'
+            
+            # The scheduler claims due posts, then publishes them concurrently, each task in its own session
+            for i in range(5):
+                posts.append(Post(user_id=self.test_user.id, content=f"Featuretest scheduled {i}", status='scheduled',
+                                  schedule_time=datetime.utcnow() - timedelta(minutes=1)))
+            db.session.add_all(posts)
+            db.session.commit()
+            
+            task_scheduler.app = self.app
+            started = time.perf_counter()
+            task_scheduler._check_scheduled_posts()
+            elapsed = time.perf_counter() - started
+            
+            db.session.expire_all()
+            statuses = {post.status for post in posts}
+            assert statuses == {'published'}, f"Scheduled posts ended as {statuses}"
+            assert {post.linkedin_post_id for post in posts} <= set(simulator.posts), "Post ids not stored"
+            assert elapsed < 5 * 0.1, f"Posts were not published concurrently ({elapsed:.2f}s)"
+            
+            self.record_test_result("Async LinkedIn Client", True, f"5 scheduled posts published in {elapsed * 1000:.0f}ms")
+            
+        except Exception as e:
+            self.record_test_result("Async LinkedIn Client", False, str(e))
+        
+        finally:
+            linkedin_service.api_base, linkedin_service.access_token, task_scheduler.app, rate_governor.budgets = saved
+            rate_governor.reset('POST /v2/ugcPosts')
+            rate_governor.reset('POST /v2/invitations')
+            linkedin_service.invalidate_author_urn()
+            simulator.stop()
+            for post in posts:
+                if post.id:
+                    db.session.delete(post)
+            db.session.commit()
+    
+    def test_batched_post_metrics(self):
+        """Test that post metrics are fetched in batch-get calls and written with one bulk UPDATE per batch"""
+        print("\n📊 Testing Batched Post Metrics...")
+        
+        import task_scheduler as scheduler_module
+        from linkedin_simulator import LinkedInSimulator, SimulatorConfig
+        from linkedin_service import linkedin_service
+        
+        simulator = LinkedInSimulator(SimulatorConfig(latency_ms=20, latency_sigma=0))
+        saved = (linkedin_service.api_base, linkedin_service.access_token, scheduler_module.METRICS_BATCH_SIZE)
+        posts = []
+        try:
+            linkedin_service.api_base = f"{simulator.start()}/v2"
+            linkedin_service.access_token = 'simulator-token'
+            scheduler_module.METRICS_BATCH_SIZE = 3
+            
+            for i in range(7):
+                urn = f"urn:li:share:featuretest{i}"
+                simulator.posts[urn] = {'likes': i * 10, 'comments': i, 'body': None}
+                posts.append(Post(user_id=self.test_user.id, content=f"Featuretest metrics {i}", status='published',
+                                  published_at=datetime.utcnow(), linkedin_post_id=urn if i % 2 else None,
+                                  linkedin_url=None if i % 2 else f"https://www.linkedin.com/feed/update/{urn}/"))
+            db.session.add_all(posts)
+            db.session.commit()
+            
+            timings = task_scheduler._update_post_metrics_batched()
+            
+            requests = simulator.stats['socialActions.batch']['200']
+            assert requests == len(timings) == 3, f"Expected 3 batch requests, made {requests}"
+            assert sum(timing['updated'] for timing in timings) == 7, f"Updated {[timing['updated'] for timing in timings]}"
+            
+            db.session.expire_all()
+            counts = [(post.likes_count, post.comments_count) for post in posts]
+            assert counts == [(i * 10, i) for i in range(7)], f"Unexpected counts {counts}"
+            assert all(post.last_metrics_update for post in posts), "Update time not set"
+            
+            self.record_test_result("Batched Post Metrics", True, f"7 posts refreshed in {requests} batch requests")
+            
+        except Exception as e:
+            self.record_test_result("Batched Post Metrics", False, str(e))
+        
+        finally:
+            linkedin_service.api_base, linkedin_service.access_token, scheduler_module.METRICS_BATCH_SIZE = saved
+            simulator.stop()
+            for post in posts:
+                if post.id:
+                    db.session.delete(post)
+            db.session.commit()
+    
+    def test_automation_jobs(self):
+        """Test that automation endpoints queue jobs that can be cancelled and resumed without repeating work"""
+        print("\n🧵 Testing Automation Jobs...")
+        
+        from linkedin_simulator import LinkedInSimulator, SimulatorConfig
+        from linkedin_automation import linkedin_automation
+        from automation_jobs import automation_executor
+        from rate_governor import rate_governor
+        
+        simulator = LinkedInSimulator(SimulatorConfig(latency_ms=40, latency_sigma=0))
+        saved = (linkedin_automation.api_base, linkedin_automation.access_token, dict(rate_governor.budgets))
+        try:
+            linkedin_automation.api_base = f"{simulator.start()}/v2"
+            linkedin_automation.access_token = 'simulator-token'
+            rate_governor.budgets['POST /v2/invitations'] = 6000
+            rate_governor.reset('POST /v2/invitations')
+            client = self.app.test_client()
+            targets = [f"featuretest{i}" for i in range(20)]
+            
+            started = time.perf_counter()
+            response = client.post('/api/automation/send-connections', json={'target_profiles': targets, 'message': 'Hi'})
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            assert response.status_code == 202, f"Expected 202, got {response.status_code}"
+            job_id = response.json['job_id']
+            
+            # Let a few requests go through, then cancel
+            deadline = time.time() + 10
+            while client.get(f'/api/automation/jobs/{job_id}').json['job']['progress'].get('processed', 0) < 3:
+                assert time.time() < deadline, "Job made no progress"
+                time.sleep(0.02)
+            client.post(f'/api/automation/jobs/{job_id}/cancel')
+            automation_executor.wait(timeout=10)
+            job = client.get(f'/api/automation/jobs/{job_id}').json['job']
+            assert job['status'] == 'cancelled', f"Expected cancelled, got {job['status']}"
+            stopped_at = job['progress']['processed']
+            assert stopped_at < len(targets), "Job finished before it could be cancelled"
+            
+            response = client.post(f'/api/automation/jobs/{job_id}/resume')
+            assert response.status_code == 202, "Resume was not accepted"
+            automation_executor.wait(timeout=30)
+            job = client.get(f'/api/automation/jobs/{job_id}').json['job']
+            assert job['status'] == 'completed', f"Expected completed, got {job['status']}: {job['error']}"
+            assert job['result']['sent_count'] == len(targets), f"Sent {job['result']['sent_count']} of {len(targets)}"
+            
+            invitations = simulator.stats['invitations.create']['201']
+            assert invitations == len(targets), f"Simulator received {invitations} invitations for {len(targets)} targets"
+            
+            self.record_test_result("Automation Jobs", True, f"Queued in {elapsed_ms:.1f}ms, cancelled at {stopped_at}/{len(targets)}, resumed without repeats")
+            
+        except Exception as e:
+            self.record_test_result("Automation Jobs", False, str(e))
+        
+        finally:
+            linkedin_automation.api_base, linkedin_automation.access_token, rate_governor.budgets = saved
+            rate_governor.reset('POST /v2/invitations')
+            simulator.stop()
+    
+    def test_rate_limited_job_pause(self):
+        """Test that a throttled automation job pauses before the throttled target without logging failures, then resumes"""
+        print("\n⏸️ Testing Rate-Limited Job Pause...")
+        
+        from linkedin_simulator import LinkedInSimulator, SimulatorConfig
+        from linkedin_automation import linkedin_automation
+        from automation_jobs import automation_executor
+        from action_log_writer import action_log_writer
+        from target_filter import actioned_targets, CONNECTION_ACTIONS
+        from http_client import HTTPClient
+        from rate_governor import RateLimitGovernor
+        
+        tmp_dir = tempfile.mkdtemp()
+        # Background jobs never wait here: a spent window raises RateLimitExceeded at once
+        governor = RateLimitGovernor(state_path=os.path.join(tmp_dir, 'rate_limits.json'),
+                                     budgets={'POST /v2/invitations': 6000}, max_wait=0)
+        simulator = LinkedInSimulator(SimulatorConfig(latency_ms=2, latency_sigma=0, rate_limit=3, rate_window_seconds=60))
+        saved = (linkedin_automation.api_base, linkedin_automation.access_token, linkedin_automation.http)
+        try:
+            linkedin_automation.api_base = f"{simulator.start()}/v2"
+            linkedin_automation.access_token = 'simulator-token'
+            linkedin_automation.http = HTTPClient(governor=governor)
+            client = self.app.test_client()
+            targets = [f"featuretest-throttled{i}" for i in range(6)]
+            
+            job_id = client.post('/api/automation/send-connections', json={'target_profiles': targets}).json['job_id']
+            automation_executor.wait(timeout=10)
+            job = client.get(f'/api/automation/jobs/{job_id}').json['job']
+            assert job['status'] == 'paused', f"Expected paused, got {job['status']}: {job['error']}"
+            assert job['progress']['processed'] == 3, f"Paused after {job['progress']['processed']} targets"
+            assert job['result']['failed_count'] == 0, "Throttled targets counted as failures"
+            
+            action_log_writer.flush()
+            failed = ActionLog.query.filter(ActionLog.target_profile_id.in_(targets), ActionLog.status != 'success').count()
+            assert failed == 0, f"{failed} throttled targets logged as failed"
+            remaining = actioned_targets.filter_new(self.test_user.id, CONNECTION_ACTIONS, list(targets))
+            assert remaining == targets[3:], f"Throttled targets filtered out: {remaining}"
+            
+            # Once the window resets the job continues from the throttled target
+            simulator.windows.clear()
+            governor.reset()
+            assert client.post(f'/api/automation/jobs/{job_id}/resume').status_code == 202, "Resume was not accepted"
+            automation_executor.wait(timeout=10)
+            job = client.get(f'/api/automation/jobs/{job_id}').json['job']
+            assert job['status'] == 'completed', f"Expected completed, got {job['status']}: {job['error']}"
+            assert job['result']['sent_count'] == len(targets), f"Sent {job['result']['sent_count']} of {len(targets)}"
+            assert simulator.stats['invitations.create'] == {'201': len(targets)}, f"Unexpected invitations {simulator.stats['invitations.create']}"
+            
+            self.record_test_result("Rate-Limited Job Pause", True, "Paused at 3/6 with nothing logged as failed, resumed to 6/6")
+            
+        except Exception as e:
+            self.record_test_result("Rate-Limited Job Pause", False, str(e))
+        
+        finally:
+            linkedin_automation.api_base, linkedin_automation.access_token, linkedin_automation.http = saved
+            simulator.stop()
+            import shutil
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    def test_buffered_action_log(self):
+        """Test that logged actions are buffered, counted before they are written and bulk-inserted with their daily counters"""
+        print("\n🗃️ Testing Buffered Action Logging...")
+        
+        from linkedin_automation import linkedin_automation
+        from action_log_writer import ActionLogWriter
+        
+        try:
+            writer = ActionLogWriter(flush_size=50, flush_interval=3600)
+            writer.init_app(self.app)
+            today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+            before_rows = ActionLog.query.filter_by(action_type='featuretest').count()
+            
+            for i in range(49):
+                writer.record(self.test_user.id, 'featuretest', f"target{i}", 'Featuretest Target')
+            
+            assert ActionLog.query.filter_by(action_type='featuretest').count() == before_rows, "Rows written before a flush"
+            assert writer.pending_count(self.test_user.id, 'featuretest', today) == 49, "Pending rows not counted"
+            
+            writer.record(self.test_user.id, 'featuretest', 'last', 'Featuretest Target')  # reaches flush_size
+            written = ActionLog.query.filter_by(action_type='featuretest').count() - before_rows
+            assert written == 50, f"Expected a bulk insert of 50, found {written}"
+            
+            # The daily counter is maintained in the same transaction
+            counted = writer.daily_count(self.test_user.id, 'featuretest')
+            logged = ActionLog.query.filter(ActionLog.action_type == 'featuretest', ActionLog.created_at >= today).count()
+            assert counted == logged, f"Daily counter {counted} does not match {logged} logged actions"
+            
+            # Limit checks include actions the shared writer has not flushed yet
+            count = linkedin_automation.get_daily_action_count('featuretest')
+            linkedin_automation.log_action('featuretest', 'limit-check', 'Featuretest Target')
+            assert linkedin_automation.get_daily_action_count('featuretest') == count + 1, "Buffered action not counted"
+            
+            self.record_test_result("Buffered Action Logging", True, f"{written} actions written in one flush")
+            
+        except Exception as e:
+            self.record_test_result("Buffered Action Logging", False, str(e))
+    
+    def test_automation_statistics(self):
+        """Test that automation statistics come from the daily counters and refresh when actions or rules change"""
+        print("\n📈 Testing Automation Statistics...")
+        
+        from linkedin_automation import linkedin_automation
+        
+        try:
+            stats = linkedin_automation.get_automation_statistics()
+            assert stats['success'], f"Statistics failed: {stats.get('error')}"
+            assert linkedin_automation.get_automation_statistics() is stats, "Unchanged statistics not served from cache"
+            
+            # A buffered action is visible immediately, and again once flushed into the counters
+            linkedin_automation.log_action('likes', 'stats-check', 'Stats Target')
+            refreshed = linkedin_automation.get_automation_statistics()
+            assert refreshed['today']['likes'] == stats['today']['likes'] + 1, "Buffered like not counted today"
+            assert refreshed['weekly']['likes'] == stats['weekly']['likes'] + 1, "Buffered like not counted this week"
+            
+            from action_log_writer import action_log_writer
+            action_log_writer.flush()
+            flushed = linkedin_automation.get_automation_statistics()
+            assert flushed['today']['likes'] == refreshed['today']['likes'], "Flushed like counted twice or lost"
+            
+            rule = AutomationRule(user_id=self.test_user.id, name='Stats Rule', rule_type='auto_like', daily_limit=10, is_active=True)
+            db.session.add(rule)
+            db.session.commit()
+            linkedin_automation.invalidate_statistics()
+            assert linkedin_automation.get_automation_statistics()['active_rules'] == flushed['active_rules'] + 1, "New rule not counted"
+            
+            self.record_test_result("Automation Statistics", True, f"{flushed['today']['likes']} likes today, cached between changes")
+            
+        except Exception as e:
+            self.record_test_result("Automation Statistics", False, str(e))
+    
+    def test_actioned_target_filter(self):
+        """Test that profiles already acted on are filtered out before any API call, and throttled ones are not"""
+        print("\n🚫 Testing Actioned Target Filter...")
+        
+        from action_log_writer import action_log_writer
+        from target_filter import ActionedTargetFilter, BloomFilter, CONNECTION_ACTIONS
+        from linkedin_simulator import LinkedInSimulator, SimulatorConfig
+        from linkedin_automation import linkedin_automation
+        from http_client import HTTPClient
+        
+        try:
+            assert 'ix_action_logs_user_action_target' in {index.name for index in ActionLog.__table__.indexes}, "Target index missing"
+            
+            for target in ('filter-a', 'filter-b'):
+                action_log_writer.record(self.test_user.id, 'connections', target, status='failed')
+            action_log_writer.record(self.test_user.id, 'follows', 'filter-c')
+            action_log_writer.flush()
+            
+            target_filter = ActionedTargetFilter(capacity=1000)
+            target_filter.rebuild()
+            candidates = ['filter-a', 'filter-b', 'filter-c', 'filter-d']
+            fresh = target_filter.filter_new(self.test_user.id, CONNECTION_ACTIONS, candidates)
+            assert fresh == ['filter-c', 'filter-d'], f"Unexpected connection targets {fresh}"
+            
+            # Rows still buffered, and rows written after the rebuild, are filtered too
+            action_log_writer.record(self.test_user.id, 'auto_follow', 'filter-d')
+            assert target_filter.filter_new(self.test_user.id, CONNECTION_ACTIONS, candidates) == ['filter-c'], "Buffered target not filtered"
+            action_log_writer.flush()
+            profiles = [{'id': 'filter-c'}, {'id': 'filter-e'}]
+            fresh = target_filter.filter_new(self.test_user.id, ('follows',), profiles, key=lambda profile: profile['id'])
+            assert fresh == [{'id': 'filter-e'}], f"Unexpected follow targets {fresh}"
+            
+            # A 429 is throttling, not a rejection: the target is not logged and stays eligible
+            simulator = LinkedInSimulator(SimulatorConfig(latency_ms=2, latency_sigma=0, rate_limit=1, rate_window_seconds=60))
+            saved = (linkedin_automation.api_base, linkedin_automation.access_token, linkedin_automation.http)
+            try:
+                linkedin_automation.api_base = f"{simulator.start()}/v2"
+                linkedin_automation.access_token = 'simulator-token'
+                linkedin_automation.http = HTTPClient()  # no governor, so the second request reaches the 429
+                throttled = ['filter-429a', 'filter-429b', 'filter-429c']
+                result = linkedin_automation.auto_send_connections(throttled)
+            finally:
+                linkedin_automation.api_base, linkedin_automation.access_token, linkedin_automation.http = saved
+                simulator.stop()
+            assert simulator.stats['invitations.create'] == {'201': 1, '429': 1}, f"Unexpected invitations {simulator.stats['invitations.create']}"
+            assert result['rate_limited'] and result['sent_count'] == 1 and result['failed_count'] == 0, f"Unexpected result {result}"
+            action_log_writer.flush()
+            fresh = target_filter.filter_new(self.test_user.id, CONNECTION_ACTIONS, throttled)
+            assert fresh == ['filter-429b', 'filter-429c'], f"Throttled target filtered out: {fresh}"
+            
+            bloom = BloomFilter(10000, 0.01)
+            bloom.add([f"seen{i}".encode() for i in range(10000)])
+            assert bloom.contains([f"seen{i}".encode() for i in range(10000)]).all(), "Bloom filter lost a key"
+            false_positives = bloom.contains([f"unseen{i}".encode() for i in range(10000)]).mean()
+            assert false_positives < 0.02, f"False positive rate {false_positives:.3f}"
+            
+            self.record_test_result("Actioned Target Filter", True, f"Repeats dropped, {false_positives:.2%} false positives at capacity")
+            
+        except Exception as e:
+            self.record_test_result("Actioned Target Filter", False, str(e))
+    
+    def test_profile_scoring(self):
+        """Test that category criteria rank whole batches of profiles"""
+        print("\n🎯 Testing Profile Scoring...")
+        
+        from profile_scoring import ProfileScorer, SUCCESS_TITLES
+        
+        try:
+            criteria = automation_engine._get_target_criteria_for_category(TargetCategory.BIG_CLIENTS)
+            profiles = [
+                {'id': 'p1', 'headline': 'Leadership coach', 'industry': 'Education', 'company_size': '11-50'},
+                {'id': 'p2', 'headline': 'VP Sales at a Fortune 500 enterprise', 'industry': 'Technology', 'company_size': '10,001+'},
+                {'id': 'p3', 'headline': 'Director of Operations', 'industry': 'Retail', 'company_size': 20},
+                {'id': 'p4', 'title': 'CEO', 'industry': 'Finance', 'company_size': 2000}
+            ]
+            
+            scorer = ProfileScorer(criteria)
+            scores = scorer.score(profiles)
+            assert scores[0] == 0, f"Unrelated profile scored {scores[0]}"
+            assert abs(scores[1] - 1.0) < 1e-9, f"Full match scored {scores[1]}"
+            
+            ranked = [profile['id'] for profile in scorer.top_k(profiles, 2)]
+            assert ranked == ['p2', 'p4'], f"Unexpected ranking {ranked}"
+            
+            # Whole words only: 'Lead' does not match 'Leadership'
+            successful = ProfileScorer({'job_titles': SUCCESS_TITLES}).top_k(profiles, require=('title',))
+            assert [profile['id'] for profile in successful] == ['p2', 'p3', 'p4'], "Success titles mismatched"
+            
+            # Lowercasing 'İ' adds a code point; matches stay with the profile they were found in
+            turkish = [{'id': 't1', 'headline': 'İİİİİİİİİİ CEO'}, {'id': 't2', 'headline': 'Designer'}]
+            scores = ProfileScorer({'job_titles': ['CEO']}).score(turkish)
+            assert scores[0] > 0 and scores[1] == 0, f"Match credited to the wrong profile: {scores}"
+            
+            batch = profiles * 1000
+            start = time.perf_counter()
+            scorer.top_k(batch, 50)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            
+            self.record_test_result("Profile Scoring", True, f"{len(batch)} profiles ranked in {elapsed_ms:.1f}ms")
+            
+        except Exception as e:
+            self.record_test_result("Profile Scoring", False, str(e))
+    
+    def test_rule_criteria_cache(self):
+        """Test that rule criteria are compiled once per rule version"""
+        print("\n🧩 Testing Rule Criteria Compilation...")
+        
+        from rule_criteria import RuleCriteriaCache, compile_criteria
+        
+        try:
+            rule = AutomationRule(
+                user_id=self.test_user.id,
+                name='Criteria Rule',
+                rule_type='auto_follow',
+                target_criteria={'job_titles': ['CTO'], 'industries': ['Software'], 'hashtags': ['#AI'], 'keywords': ['AI']},
+                daily_limit=5
+            )
+            db.session.add(rule)
+            db.session.commit()
+            
+            cache = RuleCriteriaCache()
+            compiled = cache.get(rule)
+            assert compiled.search_params == {'keywords': 'AI', 'title': 'CTO', 'industry': 'Software'}, f"Search params {compiled.search_params}"
+            assert compiled.post_terms == ('AI', '#AI'), f"Post terms {compiled.post_terms}"
+            assert compile_criteria(dict(rule.target_criteria)) is compiled, "Equal criteria compiled twice"
+            
+            # Statistics updates move updated_at but keep the compiled criteria
+            rule.total_actions = (rule.total_actions or 0) + 1
+            db.session.commit()
+            assert cache.get(rule) is compiled, "Recompiled after a statistics-only update"
+            
+            rule.target_criteria = {'job_titles': ['CEO']}
+            db.session.commit()
+            recompiled = cache.get(rule)
+            assert recompiled is not compiled and recompiled.search_params == {'title': 'CEO'}, "Criteria change not picked up"
+            
+            ranked = recompiled.rank_profiles([{'id': 'a', 'headline': 'CTO'}, {'id': 'b', 'headline': 'CEO at Hooli'}])
+            assert [profile['id'] for profile in ranked] == ['b'], "Compiled scorer mismatched"
+            
+            self.record_test_result("Rule Criteria Compilation", True, "Compiled once per criteria version")
+            
+        except Exception as e:
+            self.record_test_result("Rule Criteria Compilation", False, str(e))
+    
+    def test_keyword_matcher(self):
+        """Test multi-keyword post matching and prioritization"""
+        print("\n🔎 Testing Keyword Matcher...")
+        
+        from keyword_matcher import keyword_matcher
+        from linkedin_automation import linkedin_automation
+        
+        try:
+            matcher = keyword_matcher(['machine learning', 'learning', 'AI', '#marketing'])
+            assert keyword_matcher(['#marketing', 'AI', 'learning', 'machine learning']) is matcher, "Matcher not cached per keyword set"
+            
+            found = matcher.find('Machine learning and #AI for maintainers')
+            assert found == ['AI', 'learning', 'machine learning'], f"Unexpected matches {found}"
+            assert matcher.find('marketing tips') == [], "Hashtag keyword matched plain text"
+            assert matcher.find('more #Marketing') == ['#marketing'], "Hashtag keyword missed"
+            
+            batches = ([{'id': f"{batch}-{i}", 'content': text} for i, text in enumerate(['AI news', 'Machine learning for AI', 'Gardening'])] for batch in range(2))
+            ranked = matcher.rank(post for batch in batches for post in batch)
+            assert [post['id'] for post in ranked] == ['0-1', '1-1', '0-0', '1-0'], f"Unexpected ranking {[post['id'] for post in ranked]}"
+            assert ranked[0]['matched_keywords'] == ['AI', 'learning', 'machine learning'], "Matched keywords not reported"
+            
+            # Demo search results that do not mention the keywords are not engaged with
+            access_token, linkedin_automation.access_token = linkedin_automation.access_token, None
+            try:
+                result = linkedin_automation.auto_engage_with_posts(['AI'])
+            finally:
+                linkedin_automation.access_token = access_token
+            assert result['success'] and result['engaged_posts'] == 1, f"Unexpected engagement {result}"
+            
+            # Comments are generated only while the comment budget has units left
+            from action_budget import action_budget
+            generated = []
+            posts = [{'id': f"urn:li:share:featurecomment{i}", 'content': 'AI news', 'author': 'Test'} for i in range(4)]
+            saved_limit = action_budget.limits.get('comments')
+            linkedin_automation._search_posts = lambda keywords: list(posts)
+            linkedin_automation._generate_intelligent_comment = lambda content: generated.append(content) or 'Great point!'
+            access_token, linkedin_automation.access_token = linkedin_automation.access_token, None
+            try:
+                action_budget.limits['comments'] = action_budget.limit('comments') - action_budget.available(self.test_user.id, 'comments') + 1
+                result = linkedin_automation.auto_engage_with_posts(['AI'])
+            finally:
+                linkedin_automation.access_token = access_token
+                action_budget.limits['comments'] = saved_limit
+                del linkedin_automation._search_posts, linkedin_automation._generate_intelligent_comment
+            assert result['engaged_posts'] == len(posts), f"Unexpected engagement {result}"
+            assert len(generated) == 1, f"Generated {len(generated)} comments with budget for 1"
+            
+            self.record_test_result("Keyword Matcher", True, f"{len(ranked)} posts matched and ranked")
+            
+        except Exception as e:
+            self.record_test_result("Keyword Matcher", False, str(e))
+    
+    def test_action_budget(self):
+        """Test atomic daily budget reservations and their release"""
+        print("\n🎟️ Testing Daily Action Budget...")
+        
+        from action_log_writer import action_log_writer
+        from action_budget import ActionBudget
+        
+        try:
+            budget = ActionBudget(limits={'featurebudget': 5})
+            user_id = self.test_user.id
+            
+            # Successes logged before the budget existed count against it
+            for i in range(2):
+                action_log_writer.record(user_id, 'featurebudget', f"budget{i}")
+            action_log_writer.flush()
+            assert budget.available(user_id, 'featurebudget') == 3, "Logged actions not counted"
+            
+            # Only what is left is granted; unused units come back on close
+            with budget.reserve(user_id, 'featurebudget', 10) as reservation:
+                assert reservation.granted == 3, f"Granted {reservation.granted} of 3 available"
+                assert budget.reserve(user_id, 'featurebudget').granted == 0, "Limit overshot"
+                reservation.use(1)
+            assert budget.available(user_id, 'featurebudget') == 2, "Unused units not released"
+            
+            # A failing action gives its unit back
+            try:
+                with budget.reserve(user_id, 'featurebudget'):
+                    raise RuntimeError('LinkedIn API error')
+            except RuntimeError:
+                pass
+            assert budget.available(user_id, 'featurebudget') == 2, "Unit of failed action not released"
+            
+            granted = 0
+            for _ in range(10):
+                with budget.reserve(user_id, 'featurebudget') as reservation:
+                    if not reservation.granted:
+                        break
+                    reservation.use()
+                    granted += 1
+            assert granted == 2, f"Granted {granted} single units with 2 left"
+            
+            used = DailyActionBudget.query.filter_by(user_id=user_id, action_type='featurebudget').first().used
+            assert used == 5, f"Budget row shows {used} used"
+            
+            self.record_test_result("Daily Action Budget", True, "Reservations capped at the limit and released on failure")
+            
+        except Exception as e:
+            self.record_test_result("Daily Action Budget", False, str(e))
+    
+    def test_auto_follow_invitation_budget(self):
+        """Test that auto-follow invitations are charged to the account-wide connection budget"""
+        print("\n✉️ Testing Auto-Follow Invitation Budget...")
+        
+        from action_budget import action_budget
+        from linkedin_service import linkedin_service
+        
+        sent = []
+        
+        async def send_connection_request(profile_id, message=None):
+            sent.append((profile_id, message))
+            return {'success': True}
+        
+        async def find_target_profiles(criteria):
+            return [{'id': f"featuretest-af{i}", 'name': 'Ada Lovelace', 'headline': 'CTO at Analytical Engines'} for i in range(5)]
+        
+        saved_limits = action_budget.limits
+        try:
+            rule = AutomationRule(user_id=self.test_user.id, name='Invitation Budget Rule', rule_type='auto_follow',
+                                  target_criteria={'job_titles': ['CTO']}, action_template='Hi {first_name}!',
+                                  daily_limit=10, is_active=True)
+            db.session.add(rule)
+            db.session.commit()
+            
+            # Two invitations left today, although the rule itself would allow ten
+            used = saved_limits['connections'] - action_budget.available(self.test_user.id, 'connections')
+            rule_available = action_budget.available(self.test_user.id, 'auto_follow', rule.daily_limit)
+            action_budget.limits = dict(saved_limits, connections=used + 2)
+            linkedin_service.send_connection_request = send_connection_request
+            automation_engine._find_target_profiles = find_target_profiles
+            
+            try:
+                # One batch, then the loop sleeps for hours: stop it there
+                asyncio.run(asyncio.wait_for(automation_engine._run_auto_follow_automation(rule.id, self.test_user.id), timeout=2))
+            except asyncio.TimeoutError:
+                pass
+            
+            assert len(sent) == 2, f"Sent {len(sent)} invitations with 2 left in the connection budget"
+            assert sent[0][1] == 'Hi Ada!', f"Message not personalized: {sent[0][1]}"
+            assert action_budget.available(self.test_user.id, 'connections') == 0, "Invitations not charged to connections"
+            assert action_budget.available(self.test_user.id, 'auto_follow', rule.daily_limit) == rule_available - 2, "Rule budget not charged"
+            
+            self.record_test_result("Auto-Follow Invitation Budget", True, "Auto-follow stopped at the shared invitation limit")
+            
+        except Exception as e:
+            self.record_test_result("Auto-Follow Invitation Budget", False, str(e))
+        
+        finally:
+            action_budget.limits = saved_limits
+            vars(linkedin_service).pop('send_connection_request', None)
+            vars(automation_engine).pop('_find_target_profiles', None)
+    
     def record_test_result(self, test_name, passed, message):
         """Record a test result"""
         self.test_results.append({
@@ -391,6 +1803,90 @@ class FeatureTester:
         
         print(f"\n📄 Detailed results saved to test_results.json")
 
+def build_synthetic_pdf(path, pages, lines_per_page=40):
+    """Write a minimal multi-page text PDF for extraction benchmarks"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Page tree, filled in once the page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    page_ids = []
+    
+    for page in range(1, pages + 1):
+        stream = "\n".join(
+            f"BT /F1 10 Tf 40 {780 - line * 18} Td (Page {page} line {line + 1} synthetic brochure text) Tj ET"
+            for line in range(lines_per_page)
+        ).encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        page_ids.append(len(objects))
+    
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+    
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    
+    with open(path, 'wb') as f:
+        f.write(bytes(output))
+
+def build_docx(path, paragraphs, table_rows):
+    """Write a minimal DOCX with body paragraphs followed by a table"""
+    namespace = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+    paragraph = lambda text: f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>"
+    table = "<w:tbl>" + "".join(
+        "<w:tr>" + "".join(f"<w:tc>{paragraph(cell)}</w:tc>" for cell in row) + "</w:tr>" for row in table_rows
+    ) + "</w:tbl>"
+    document = f'<w:document xmlns:w="{namespace}"><w:body>{"".join(map(paragraph, paragraphs))}{table}</w:body></w:document>'
+    
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('word/document.xml', document)
+
+def start_scripted_server(script):
+    """Serve each path's scripted statuses, or (status, headers), in order (200 once exhausted) on a local port; returns (server, base_url, hits)"""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    hits = {}
+    lock = threading.Lock()
+    
+    class ScriptedHandler(BaseHTTPRequestHandler):
+        def respond(self):
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            with lock:
+                hits[self.path] = hits.get(self.path, 0) + 1
+                statuses = script.get(self.path) or []
+                status = statuses.pop(0) if statuses else 200
+            status, headers = status if isinstance(status, tuple) else (status, {})
+            body = json.dumps({'status': status}).encode()
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        do_GET = do_POST = respond
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ScriptedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", hits
+
 def main():
     """Main test function"""
     print("LinkedIn Marketing Agent - Feature Test Suite")